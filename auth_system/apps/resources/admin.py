@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from .models import Product
+
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    """Admin panel for Product model."""
+    list_display = ('name', 'owner', 'created_at', 'updated_at')
+    list_select_related = ('owner',)
+    search_fields = ('name', 'owner__email')
+    raw_id_fields = ('owner',)
@@ -0,0 +1,42 @@
+from itertools import cycle
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.resources.models import Product
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Generates products owned by the existing users, for benchmarking.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=1_000_000,
+            help='Number of products to create.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Number of products inserted per query.',
+        )
+
+    def handle(self, *args, **options):
+        owner_ids = list(User.objects.values_list('id', flat=True))
+        if not owner_ids:
+            raise CommandError('Create at least one user first.')
+
+        count, batch_size = options['count'], options['batch_size']
+        owners = cycle(owner_ids)
+        created = 0
+        while created < count:
+            size = min(batch_size, count - created)
+            Product.objects.bulk_create([
+                Product(name=f'Product {created + i + 1}', owner_id=next(owners)) for i in range(size)
+            ], batch_size=size)
+            created += size
+            self.stdout.write(f'Created {created}/{count} products.', ending='\r')
+
+        self.stdout.write(self.style.SUCCESS(f'Created {created} products for {len(owner_ids)} users.'))
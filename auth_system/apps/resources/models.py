@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from apps.users.models import TimestampedModel
+
+
+class Product(TimestampedModel):
+    """Product owned by a user."""
+
+    name = models.CharField(
+        max_length=255,
+        verbose_name=_('Name'),
+    )
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='products',
+        verbose_name=_('Owner'),
+        # Covered by product_owner_idx, which leads with the owner.
+        db_index=False,
+    )
+
+    def __str__(self) -> str:
+        """
+        Uses the model name.
+
+        Return:
+            String representation of Product model.
+        """
+        return self.name
+
+    class Meta:
+        verbose_name = _('Product')
+        verbose_name_plural = _('Products')
+        ordering = ('id',)
+        indexes = [
+            models.Index(fields=['owner', 'id'], name='product_owner_idx'),
+        ]
@@ -1,7 +1,10 @@
 from rest_framework import serializers
 
+from apps.resources.models import Product
 
-class ProductSerializer(serializers.Serializer):
-    id = serializers.IntegerField(read_only=True)
-    name = serializers.CharField()
-    owner = serializers.IntegerField(read_only=True)
+
+class ProductSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Product
+        fields = ('id', 'name', 'owner')
+        read_only_fields = ('owner',)
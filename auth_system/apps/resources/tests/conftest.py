@@ -1,7 +1,15 @@
 import pytest
 from rest_framework.test import APIClient
 
+from apps.resources.models import Product
 from apps.users.models import BusinessElement, AccessRoleRule, Role, User
+from apps.users.rbac import bump_rules_version
+
+
+@pytest.fixture(autouse=True)
+def reset_permission_matrix():
+    # Rows created by earlier tests are rolled back without signals.
+    bump_rules_version()
 
 
 @pytest.fixture
@@ -29,6 +37,15 @@ def users():
     return u1, u2, u3
 
 
+@pytest.fixture
+def products(users):
+    return [
+        Product.objects.create(name='Apple', owner=users[0]),
+        Product.objects.create(name='Orange', owner=users[2]),
+        Product.objects.create(name='Banana', owner=users[0]),
+    ]
+
+
 @pytest.fixture
 def access_rules(element):
     roles = Role.objects.all()
@@ -1,18 +1,19 @@
+import json
+from io import StringIO
+
 import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 
-from apps.resources.views import PRODUCTS
-
-
-@pytest.fixture(autouse=True)
-def reset_products(users):
-    PRODUCTS.clear()
-    PRODUCTS.extend([
-        {'id': 1, 'name': 'Apple', 'owner': users[0].id},
-        {'id': 2, 'name': 'Orange', 'owner': users[2].id},
-        {'id': 3, 'name': 'Banana', 'owner': users[0].id},
-    ])
+from apps.resources.models import Product
+from apps.resources.serializers import ProductSerializer
+from apps.resources.views import ProductListView
+from apps.users.models import Session
+from apps.users.pagination import KeysetPagination
+from apps.users.rbac import get_permission_matrix
 
 
 @pytest.mark.django_db
@@ -21,13 +22,66 @@ def reset_products(users):
     (1, 3),
     (2, 3),
 ])
-def test_product_list(api_client, access_rules, users, user_idx, expected_count):
+def test_product_list(api_client, access_rules, users, products, user_idx, expected_count):
     api_client.force_authenticate(user=users[user_idx])
 
     response = api_client.get(reverse('resources:products'))
 
     assert response.status_code == status.HTTP_200_OK
-    assert len(response.data) == expected_count
+    assert len(response.data['results']) == expected_count
+
+
+@pytest.mark.django_db
+def test_product_list_pages_only_own_products(api_client, access_rules, users, products):
+    Product.objects.bulk_create([Product(name=f'Other {i}', owner=users[2]) for i in range(5)])
+    api_client.force_authenticate(user=users[0])
+
+    first = api_client.get(reverse('resources:products'), {'page_size': 1})
+    second = api_client.get(first.data['next'])
+
+    assert [item['id'] for item in first.data['results'] + second.data['results']] == [products[0].id, products[2].id]
+    assert second.data['next'] is None
+
+
+@pytest.mark.django_db
+def test_product_list_max_page_size(api_client, access_rules, users, products, monkeypatch):
+    Product.objects.bulk_create([Product(name=f'Product {i}', owner=users[1]) for i in range(10)])
+    monkeypatch.setattr(KeysetPagination, 'max_page_size', 4)
+    api_client.force_authenticate(user=users[1])
+
+    response = api_client.get(reverse('resources:products'), {'page_size': 100})
+
+    assert len(response.data['results']) == 4
+    assert response.data['next']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('user_idx, expected_count', [
+    (0, 2),
+    (1, 3),
+])
+def test_product_list_stream(api_client, access_rules, users, products, user_idx, expected_count, monkeypatch):
+    monkeypatch.setattr(ProductListView, 'stream_chunk_size', 2)
+    api_client.force_authenticate(user=users[user_idx])
+
+    response = api_client.get(reverse('resources:products'), {'stream': '1'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    data = json.loads(b''.join(response.streaming_content))
+    assert data == ProductSerializer(
+        Product.objects.filter(id__in=[item['id'] for item in data]), many=True
+    ).data
+    assert len(data) == expected_count
+
+
+@pytest.mark.django_db
+def test_product_list_stream_empty(api_client, access_rules, users):
+    api_client.force_authenticate(user=users[0])
+
+    response = api_client.get(reverse('resources:products'), {'stream': '1'})
+
+    assert json.loads(b''.join(response.streaming_content)) == []
 
 
 @pytest.mark.django_db
@@ -50,30 +104,119 @@ def test_product_create(api_client, access_rules, users, user_idx, can_create):
 
 @pytest.mark.django_db
 @pytest.mark.parametrize('user_idx, target_product, expected_status', [
-    (0, 1, status.HTTP_200_OK),
-    (0, 2, status.HTTP_403_FORBIDDEN),
-    (1, 1, status.HTTP_200_OK),
-    (2, 1, status.HTTP_200_OK),
+    (0, 0, status.HTTP_200_OK),
+    (0, 1, status.HTTP_404_NOT_FOUND),
+    (1, 0, status.HTTP_200_OK),
+    (2, 0, status.HTTP_200_OK),
 ])
-def test_product_update(api_client, access_rules, users, user_idx, target_product, expected_status):
+def test_product_update(api_client, access_rules, users, products, user_idx, target_product, expected_status):
     api_client.force_authenticate(user=users[user_idx])
 
-    response = api_client.patch(reverse('resources:product-detail', args=[target_product]),
+    response = api_client.patch(reverse('resources:product-detail', args=[products[target_product].id]),
                                 data={'name': 'Updated'})
 
     assert response.status_code == expected_status
+    if expected_status == status.HTTP_200_OK:
+        products[target_product].refresh_from_db()
+        assert products[target_product].name == 'Updated'
 
 
 @pytest.mark.django_db
 @pytest.mark.parametrize('user_idx, target_product, expected_status', [
-    (0, 1, status.HTTP_204_NO_CONTENT),
-    (0, 2, status.HTTP_403_FORBIDDEN),
-    (1, 2, status.HTTP_204_NO_CONTENT),
-    (2, 2, status.HTTP_204_NO_CONTENT),
+    (0, 0, status.HTTP_204_NO_CONTENT),
+    (0, 1, status.HTTP_404_NOT_FOUND),
+    (1, 1, status.HTTP_204_NO_CONTENT),
+    (2, 1, status.HTTP_204_NO_CONTENT),
 ])
-def test_product_delete(api_client, access_rules, users, user_idx, target_product, expected_status):
+def test_product_delete(api_client, access_rules, users, products, user_idx, target_product, expected_status):
     api_client.force_authenticate(user=users[user_idx])
 
-    response = api_client.delete(reverse('resources:product-detail', args=[target_product]))
+    response = api_client.delete(reverse('resources:product-detail', args=[products[target_product].id]))
 
     assert response.status_code == expected_status
+    deleted = not Product.objects.filter(id=products[target_product].id).exists()
+    assert deleted == (expected_status == status.HTTP_204_NO_CONTENT)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('user_idx, target_product, expected_status', [
+    (0, 0, status.HTTP_200_OK),
+    (0, 1, status.HTTP_404_NOT_FOUND),
+    (1, 1, status.HTTP_200_OK),
+])
+def test_product_detail(api_client, access_rules, users, products, user_idx, target_product, expected_status):
+    api_client.force_authenticate(user=users[user_idx])
+
+    response = api_client.get(reverse('resources:product-detail', args=[products[target_product].id]))
+
+    assert response.status_code == expected_status
+
+
+@pytest.mark.django_db
+def test_product_detail_of_other_owner_is_filtered_in_sql(api_client, access_rules, users, products):
+    get_permission_matrix()
+    api_client.force_authenticate(user=users[0])
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(reverse('resources:product-detail', args=[products[1].id]))
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert len(queries) == 1
+    assert 'owner_id' in queries[0]['sql']
+
+
+@pytest.mark.django_db
+def test_product_detail_not_modified(api_client, access_rules, users, products, django_assert_num_queries):
+    get_permission_matrix()
+    api_client.force_authenticate(user=users[0])
+    url = reverse('resources:product-detail', args=[products[0].id])
+    response = api_client.get(url)
+
+    with django_assert_num_queries(1):
+        not_modified = api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    assert len(not_modified.content) == 0 < len(response.content)
+
+
+@pytest.mark.django_db
+def test_product_etag_of_other_owner_is_not_found(api_client, access_rules, users, products):
+    api_client.force_authenticate(user=users[0])
+    url = reverse('resources:product-detail', args=[products[1].id])
+
+    assert api_client.get(url, HTTP_IF_NONE_MATCH='*').status_code == status.HTTP_404_NOT_FOUND
+    assert api_client.patch(url, {'name': 'Updated'}, HTTP_IF_MATCH='*').status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_product_not_found(api_client, access_rules, users):
+    api_client.force_authenticate(user=users[1])
+
+    response = api_client.get(reverse('resources:product-detail', args=[1]))
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_product_list_query_count(api_client, access_rules, users, products, django_assert_num_queries):
+    session = Session.create_session(users[0])
+    api_client.cookies['session_key'] = session.session_key
+
+    api_client.get(reverse('resources:products'))
+
+    # The session lookup and the products, the permissions come from the cached matrix.
+    with django_assert_num_queries(2):
+        response = api_client.get(reverse('resources:products'))
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_generate_products_command(users):
+    out = StringIO()
+
+    call_command('generate_products', '--count', '25', '--batch-size', '10', stdout=out)
+
+    assert Product.objects.count() == 25
+    assert set(Product.objects.values_list('owner_id', flat=True)) == {user.id for user in users}
+    assert 'Created 25 products for 3 users.' in out.getvalue()
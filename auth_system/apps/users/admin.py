@@ -35,6 +35,7 @@ class AccessRoleRuleAdmin(admin.ModelAdmin):
     list_display = ('role', 'element', 'read_permission', 'read_all_permission', 'create_permission',
                     'update_permission', 'update_all_permission', 'delete_permission', 'delete_all_permission')
     list_filter = ('role', 'element')
+    list_select_related = ('role', 'element')
     search_fields = ('role__name', 'element__name')
     ordering = ('role__name', 'element__name')
 
@@ -6,3 +6,9 @@ class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.users'
     verbose_name = _('Personalization')
+
+    def ready(self):
+        from apps.users import signals  # noqa: F401
+        from apps.users.tokens import check_auth_mode
+
+        check_auth_mode()
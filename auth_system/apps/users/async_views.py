@@ -0,0 +1,106 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.utils.translation import gettext_lazy as _
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import status
+from rest_framework.exceptions import Throttled
+
+from apps.users.hashing import averify_user_password, get_hashing_pool
+from apps.users.models import User
+from apps.users.ratelimit import clear_failed_attempts, enforce_rate_limits
+from apps.users.serializers import UserCreateSerializer
+from apps.users.sessions import start_session
+from apps.users.views import login_response
+
+
+def _parse_body(request) -> dict:
+    """
+    Parses a JSON or form encoded request body.
+
+    Args:
+        request: The HTTP request object.
+    Returns:
+        Dictionary with the request data, empty if the body is malformed.
+    """
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+    return request.POST.dict()
+
+
+def _throttled_response(exc: Throttled) -> JsonResponse:
+    response = JsonResponse({'detail': exc.detail}, status=exc.status_code)
+    response['Retry-After'] = str(int(exc.wait))
+    return response
+
+
+@csrf_exempt
+@require_POST
+async def login(request):
+    """
+    Async version of UserLoginView for ASGI deployments.
+
+    The password is verified on the hashing pool without blocking the event loop.
+
+    Args:
+        request: The HTTP request object containing 'email' and 'password' in data.
+    Returns:
+        response: A success response with a session cookie or tokens, or an error response.
+    """
+    data = _parse_body(request)
+    try:
+        await sync_to_async(enforce_rate_limits)(request, data)
+    except Throttled as exc:
+        return _throttled_response(exc)
+
+    try:
+        user = await User.objects.aget(email=data.get('email'), is_active=True)
+    except User.DoesNotExist:
+        return JsonResponse({'detail': _('Invalid credentials.')}, status=401)
+
+    try:
+        valid = await averify_user_password(user, data.get('password'))
+    except Throttled as exc:
+        return _throttled_response(exc)
+    if not valid:
+        return JsonResponse({'detail': _('Invalid credentials.')}, status=401)
+
+    await sync_to_async(clear_failed_attempts)(request, data)
+    session = await sync_to_async(start_session)(user)
+    return await sync_to_async(login_response)(session, response_class=JsonResponse)
+
+
+@csrf_exempt
+@require_POST
+async def register(request):
+    """
+    Async version of UserRegistrationView for ASGI deployments.
+
+    Args:
+        request: The HTTP request object with the registration data.
+    Returns:
+        response: The created user data, or validation errors.
+    """
+    data = _parse_body(request)
+    try:
+        await sync_to_async(enforce_rate_limits)(request, data)
+    except Throttled as exc:
+        return _throttled_response(exc)
+
+    serializer = UserCreateSerializer(data=data)
+    if not await sync_to_async(serializer.is_valid)():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        encoded = await get_hashing_pool().amake_password(serializer.validated_data['password'])
+    except Throttled as exc:
+        return _throttled_response(exc)
+
+    await sync_to_async(serializer.save)(password_encoded=encoded)
+    return JsonResponse(serializer.data, status=status.HTTP_201_CREATED)
@@ -1,36 +1,74 @@
-from rest_framework.authentication import BaseAuthentication
+import jwt
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
 
-from apps.users.models import Session
+from apps.users.sessions import CachedSessionUser, resolve_session
+from apps.users.tokens import decode_access_token, get_denylist, is_jwt_mode
 
 
 class CookieSessionAuthentication(BaseAuthentication):
     """
-    Custom DRF authentication class that trusts 'request.user' set by CustomSessionMiddleware.
+    Custom DRF authentication class that trusts the session resolved by CustomSessionMiddleware.
+
+    In JWT mode the session cookie is ignored, so a refresh token cannot be used as a cookie.
     """
 
     def authenticate(self, request):
         """
         Custom DRF authentication class that authenticates users based on session cookies.
 
+        The session is resolved once per request and shared with CustomSessionMiddleware,
+        so no additional query is made when the middleware has already run.
+
         Args:
             request: The HTTP request object.
         Returns:
             A tuple of (user, None) if authenticated, else None.
         """
+        context = resolve_session(request._request)
+        if not context.is_authenticated:
+            return None
+        return context.user, None
+
+
+class JWTAuthentication(BaseAuthentication):
+    """
+    Custom DRF authentication class that verifies signed access tokens without database access.
 
-        session_key = request.COOKIES.get('session_key')
-        if not session_key:
+    Only active in JWT mode.
+    """
+
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        """
+        Authenticates users based on the access token from the Authorization header.
+
+        Args:
+            request: The HTTP request object.
+        Returns:
+            A tuple of (user, session snapshot) if authenticated, else None.
+        Raises:
+            AuthenticationFailed: If the token is invalid, expired or revoked.
+        """
+        if not is_jwt_mode():
             return None
+        header = get_authorization_header(request).split()
+        if not header or header[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(header) != 2:
+            raise exceptions.AuthenticationFailed(_('Invalid token header.'))
 
         try:
-            session = Session.objects.select_related('user').get(
-                session_key=session_key,
-                is_active=True
-            )
-            if session.is_expired() or not session.user.is_active:
-                session.is_active = False
-                session.save()
-                return None
-            return session.user, None
-        except Session.DoesNotExist:
-            return None
+            session = decode_access_token(header[1].decode())
+        except (jwt.InvalidTokenError, UnicodeError):
+            raise exceptions.AuthenticationFailed(_('Invalid or expired token.'))
+
+        if get_denylist().is_revoked(session.session_id):
+            raise exceptions.AuthenticationFailed(_('Invalid or expired token.'))
+
+        return CachedSessionUser(session), session
+
+    def authenticate_header(self, request):
+        return self.keyword
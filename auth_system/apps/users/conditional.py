@@ -0,0 +1,117 @@
+from datetime import UTC, datetime, timedelta
+from functools import reduce
+
+from django.db import transaction
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+
+
+class ConditionalObjectMixin:
+    """
+    Adds ETag, If-None-Match and If-Match handling to detail views.
+
+    The ETag is derived from the etag_field timestamp (updated_at of TimestampedModel), plus
+    the timestamps of related rows the representation includes (see get_etag_fields).
+    A GET with a matching If-None-Match is answered with 304 after a single lookup of those
+    fields, without loading or serializing the object. A PUT or PATCH whose If-Match does not
+    match the current ETag is rejected with 412, so concurrent edits are not lost.
+    """
+
+    etag_field = 'updated_at'
+
+    def get_etag_queryset(self):
+        """
+        Returns the queryset that contains only the object of the request.
+
+        Return:
+            QuerySet filtered by the lookup of the view.
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+
+    def get_etag_fields(self) -> list[str]:
+        """
+        Returns the timestamp fields the representation of the object depends on.
+
+        Views that nest related rows in the response add their timestamps, such as 'role__updated_at'.
+
+        Return:
+            List of field lookups, etag_field first.
+        """
+        return [self.etag_field]
+
+    @staticmethod
+    def make_etag(fields: list[str], values) -> str | None:
+        """
+        Builds a quoted ETag from the timestamp values.
+
+        Args:
+            fields: Field lookups returned by get_etag_fields().
+            values: Current values of the fields, None if the object does not exist.
+        Returns:
+            Quoted ETag, or None.
+        """
+        if values is None or values[0] is None:
+            return None
+        parts = []
+        for field, value in zip(fields, values):
+            microseconds = (value - datetime(1970, 1, 1, tzinfo=UTC)) // timedelta(microseconds=1)
+            # Related timestamps are tagged with their lookup, so every variant of the representation differs.
+            parts.append(format(microseconds, 'x') if field == fields[0] else f'{field}-{microseconds:x}')
+        return quote_etag('.'.join(parts))
+
+    def get_current_etag(self, lock: bool = False) -> str | None:
+        """
+        Looks up the ETag of the object without loading the object itself.
+
+        Args:
+            lock: Lock the row until the end of the transaction.
+        Returns:
+            Quoted ETag, or None if the object does not exist or is not visible.
+        """
+        queryset, fields = self.get_etag_queryset(), self.get_etag_fields()
+        if lock:
+            queryset = queryset.select_for_update(of=('self',))
+        return self.make_etag(fields, queryset.values_list(*fields).first())
+
+    def get_object(self):
+        obj = super().get_object()
+        self._etag_object = obj
+        return obj
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        obj = getattr(self, '_etag_object', None)
+        if obj is not None and response.status_code < 300 and request.method != 'DELETE':
+            fields = self.get_etag_fields()
+            values = [reduce(getattr, field.split('__'), obj) for field in fields]
+            response['ETag'] = self.make_etag(fields, values)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            etag = self.get_current_etag()
+            etags = parse_etags(if_none_match)
+            if etag is not None and ('*' in etags or etag in etags):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+                response['ETag'] = etag
+                return response
+        return super().retrieve(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        if_match = request.headers.get('If-Match')
+        if not if_match:
+            return super().update(request, *args, **kwargs)
+
+        with transaction.atomic():
+            etag = self.get_current_etag(lock=True)
+            if etag is None:
+                raise NotFound()
+            etags = parse_etags(if_match)
+            if '*' not in etags and etag not in etags:
+                return Response(status=status.HTTP_412_PRECONDITION_FAILED)
+            return super().update(request, *args, **kwargs)
@@ -0,0 +1,36 @@
+from rest_framework.filters import BaseFilterBackend
+
+from apps.users.permissions import ACCESS_ALL, ACCESS_OWN, RoleBasedPermission
+from apps.users.rbac import get_permissions
+
+
+class RBACFilterBackend(BaseFilterBackend):
+    """
+    Restricts the queryset to the rows the caller's access rule lets them touch.
+
+    Applies to every view that declares business_element_name. The rule for the request method
+    (read, update, delete, own or all) becomes a WHERE clause on the view's owner_field, so rows
+    of other users never leave the database and their detail lookups end in 404.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        """
+        Filters the queryset by the access rule of the user's role.
+
+        Args:
+            request: The HTTP request object.
+            queryset: The queryset of the view.
+            view: The view being accessed.
+        Returns:
+            The filtered queryset.
+        """
+        element_name = getattr(view, 'business_element_name', None)
+        if element_name is None:
+            return queryset
+
+        scope = RoleBasedPermission.get_scope(get_permissions(request.user, element_name), request.method)
+        if scope == ACCESS_ALL:
+            return queryset
+        if scope == ACCESS_OWN:
+            return queryset.filter(**{getattr(view, 'owner_field', 'owner'): request.user.id})
+        return queryset.none()
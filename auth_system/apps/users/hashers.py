@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.contrib.auth.hashers import BCryptSHA256PasswordHasher
+
+
+class ConfigurableBCryptSHA256PasswordHasher(BCryptSHA256PasswordHasher):
+    """
+    BCryptSHA256PasswordHasher with the work factor taken from settings.BCRYPT_ROUNDS.
+
+    Uses the same algorithm name, so existing hashes keep verifying. Hashes with a different
+    work factor are reported by must_update() and upgraded on the next successful login.
+    """
+
+    @property
+    def rounds(self) -> int:
+        return getattr(settings, 'BCRYPT_ROUNDS', BCryptSHA256PasswordHasher.rounds)
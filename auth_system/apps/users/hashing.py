@@ -0,0 +1,323 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth import get_user_model, hashers
+from django.db import close_old_connections
+from rest_framework.exceptions import Throttled
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker():
+    # Pool workers are spawned, so this module must stay importable before Django is set up.
+    import django
+
+    django.setup()
+
+
+class PasswordHashingPool:
+    """
+    Bounded process pool for password hashing and verification.
+
+    Keeps bcrypt off the request thread and caps the number of queued jobs. When the queue is full,
+    new jobs are rejected with Throttled (429 with a Retry-After header) instead of piling up.
+    With max_workers=0 jobs run inline on the calling thread.
+    """
+
+    def __init__(self, max_workers: int, queue_size: int, retry_after: int = 1):
+        self.max_workers = max_workers
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(max(max_workers, 1) + queue_size)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def submit(self, func, *args) -> Future:
+        """
+        Schedules the job on the pool.
+
+        Args:
+            func: Picklable callable to run.
+            args: Positional arguments of the callable.
+        Returns:
+            Future with the result of the call.
+        Raises:
+            Throttled: If the queue of the pool is full.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise Throttled(wait=self.retry_after)
+
+        try:
+            if self.max_workers:
+                future = self._submit(func, *args)
+            else:
+                future = Future()
+                try:
+                    future.set_result(func(*args))
+                except Exception as exc:
+                    future.set_exception(exc)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _submit(self, func, *args) -> Future:
+        try:
+            return self._get_executor().submit(func, *args)
+        except BrokenProcessPool:
+            with self._lock:
+                self._executor = None
+            return self._get_executor().submit(func, *args)
+
+    def check_password(self, password: str, encoded: str) -> bool:
+        """
+        Verifies the password against the encoded hash on the pool.
+
+        Args:
+            password: Raw password.
+            encoded: Encoded password hash.
+        Returns:
+            True if the password matches, False otherwise.
+        """
+        return self.submit(hashers.check_password, password, encoded).result()
+
+    def make_password(self, password: str) -> str:
+        """
+        Hashes the password on the pool.
+
+        Args:
+            password: Raw password.
+        Returns:
+            Encoded password hash.
+        """
+        return self.submit(hashers.make_password, password).result()
+
+    async def acheck_password(self, password: str, encoded: str) -> bool:
+        """Async version of check_password()."""
+        return await asyncio.wrap_future(self.submit(hashers.check_password, password, encoded))
+
+    async def amake_password(self, password: str) -> str:
+        """Async version of make_password()."""
+        return await asyncio.wrap_future(self.submit(hashers.make_password, password))
+
+
+_pool = None
+
+
+def get_hashing_pool() -> PasswordHashingPool:
+    """
+    Returns the process-wide hashing pool configured by the PASSWORD_HASHING_* settings.
+
+    Return:
+        PasswordHashingPool object.
+    """
+    global _pool
+    if _pool is None:
+        _pool = PasswordHashingPool(
+            max_workers=getattr(settings, 'PASSWORD_HASHING_WORKERS', 2),
+            queue_size=getattr(settings, 'PASSWORD_HASHING_QUEUE_SIZE', 16),
+            retry_after=getattr(settings, 'PASSWORD_HASHING_RETRY_AFTER', 1),
+        )
+    return _pool
+
+
+class VerificationCache:
+    """
+    Short-lived LRU cache of successful password checks.
+
+    Entries are keyed by HMAC(user_id, password_hash, password), so changing the password
+    invalidates them, and expire after ttl seconds.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    @staticmethod
+    def _key(user_id: int, password: str, encoded: str) -> bytes:
+        message = f'{user_id}:{encoded}:{password}'.encode()
+        return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).digest()
+
+    def contains(self, user_id: int, password: str, encoded: str) -> bool:
+        """
+        Checks if the password was verified for the user within the last ttl seconds.
+
+        Args:
+            user_id: Primary key of the user.
+            password: Raw password.
+            encoded: Current password hash of the user.
+        Returns:
+            True on a fresh cache hit, False otherwise.
+        """
+        if not self.enabled:
+            return False
+        key = self._key(user_id, password, encoded)
+        with self._lock:
+            expires_at = self._entries.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return False
+            self._entries.move_to_end(key)
+            return True
+
+    def add(self, user_id: int, password: str, encoded: str) -> None:
+        """
+        Remembers a successful password check, evicting the least recently used entry when full.
+
+        Args:
+            user_id: Primary key of the user.
+            password: Raw password.
+            encoded: Current password hash of the user.
+        """
+        if not self.enabled:
+            return
+        key = self._key(user_id, password, encoded)
+        with self._lock:
+            self._entries[key] = time.monotonic() + self.ttl
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+_verification_cache = None
+_rehash_executor = None
+# Ids of the users whose hash upgrade is queued or running.
+_rehash_pending = set()
+_rehash_lock = threading.Lock()
+
+
+def get_verification_cache() -> VerificationCache:
+    """
+    Returns the process-wide verification cache configured by the PASSWORD_VERIFY_CACHE_* settings.
+
+    Return:
+        VerificationCache object.
+    """
+    global _verification_cache
+    if _verification_cache is None:
+        _verification_cache = VerificationCache(
+            ttl=getattr(settings, 'PASSWORD_VERIFY_CACHE_TTL', 0),
+            max_size=getattr(settings, 'PASSWORD_VERIFY_CACHE_SIZE', 1024),
+        )
+    return _verification_cache
+
+
+def _rehash_password(user_id: int, password: str, encoded: str) -> bool:
+    try:
+        new_encoded = get_hashing_pool().make_password(password)
+        # Skip the update if the password was changed in the meantime.
+        return bool(get_user_model().objects.filter(pk=user_id, password=encoded).update(password=new_encoded))
+    except Throttled:
+        return False
+    except Exception:
+        logger.warning('Failed to upgrade the password hash of user %s.', user_id, exc_info=True)
+        return False
+    finally:
+        close_old_connections()
+
+
+def schedule_rehash(user, password: str) -> Future | None:
+    """
+    Upgrades the password hash of the user in the background if its cost is outdated.
+
+    At most one upgrade per user is queued, and at most PASSWORD_REHASH_QUEUE_SIZE in total,
+    so a login burst after a cost change does not queue a bcrypt run per request. Skipped
+    upgrades happen on a later login.
+
+    Args:
+        user: The user whose password has just been verified.
+        password: Raw password.
+    Returns:
+        Future of the background task, or None if the hash is up to date or the upgrade is skipped.
+    """
+    global _rehash_executor
+    try:
+        hasher = hashers.identify_hasher(user.password)
+    except ValueError:
+        return None
+    if not hasher.must_update(user.password):
+        return None
+    with _rehash_lock:
+        if user.id in _rehash_pending or len(_rehash_pending) >= getattr(settings, 'PASSWORD_REHASH_QUEUE_SIZE', 64):
+            return None
+        if _rehash_executor is None:
+            _rehash_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='password-rehash')
+        future = _rehash_executor.submit(_run_rehash, user.id, password, user.password)
+        _rehash_pending.add(user.id)
+    return future
+
+
+def _run_rehash(user_id: int, password: str, encoded: str) -> bool:
+    try:
+        return _rehash_password(user_id, password, encoded)
+    finally:
+        with _rehash_lock:
+            _rehash_pending.discard(user_id)
+
+
+def verify_user_password(user, password: str) -> bool:
+    """
+    Verifies the password of the user.
+
+    Checks the verification cache first, then runs the check on the hashing pool.
+    A successful check is cached and upgrades an outdated hash in the background.
+
+    Args:
+        user: The user who logs in.
+        password: Raw password.
+    Returns:
+        True if the password is correct, False otherwise.
+    Raises:
+        Throttled: If the hashing pool is full.
+    """
+    cache = get_verification_cache()
+    if cache.contains(user.id, password, user.password):
+        return True
+    if not get_hashing_pool().check_password(password, user.password):
+        return False
+    cache.add(user.id, password, user.password)
+    schedule_rehash(user, password)
+    return True
+
+
+async def averify_user_password(user, password: str) -> bool:
+    """Async version of verify_user_password()."""
+    cache = get_verification_cache()
+    if cache.contains(user.id, password, user.password):
+        return True
+    if not await get_hashing_pool().acheck_password(password, user.password):
+        return False
+    cache.add(user.id, password, user.password)
+    schedule_rehash(user, password)
+    return True
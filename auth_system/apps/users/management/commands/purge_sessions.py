@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.users.session_reaper import purge_sessions
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired and inactive sessions in bounded batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'SESSION_PURGE_BATCH_SIZE', 5000),
+            help='Maximum number of rows deleted per transaction.',
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            default=None,
+            help='Stop after this many batches.',
+        )
+
+    def handle(self, *args, **options):
+        stats = purge_sessions(options['batch_size'], options['max_batches'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {stats.deleted} sessions in {stats.batches} batches '
+            f'({stats.rows_per_second:.0f} rows/s, lock time max {stats.max_lock_time * 1000:.1f} ms, '
+            f'avg {stats.avg_lock_time * 1000:.1f} ms).'
+        ))
@@ -0,0 +1,160 @@
+import bisect
+import threading
+from collections import defaultdict
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+METRIC_HELP = {
+    'http_requests_total': ('counter', 'Number of handled requests.'),
+    'http_request_duration_seconds': ('histogram', 'Request latency.'),
+    'db_queries_total': ('counter', 'Number of executed database queries.'),
+    'db_query_duration_seconds_total': ('counter', 'Time spent executing database queries.'),
+    'cache_lookups_total': ('counter', 'Number of cache lookups by result.'),
+}
+
+
+class _ThreadMetrics:
+    """Counters owned by a single thread, so updates need no locking."""
+
+    __slots__ = ('counters', 'histograms')
+
+    def __init__(self):
+        self.counters = defaultdict(float)
+        self.histograms = {}
+
+
+class MetricsRegistry:
+    """
+    In-process metrics with per-thread counters.
+
+    Every thread writes only to its own counters; a scrape sums the counters of all threads.
+    Each worker process keeps its own registry.
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._local = threading.local()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def _metrics(self) -> _ThreadMetrics:
+        metrics = getattr(self._local, 'metrics', None)
+        if metrics is None:
+            metrics = _ThreadMetrics()
+            with self._lock:
+                self._threads.append(metrics)
+            self._local.metrics = metrics
+        return metrics
+
+    def inc(self, name: str, labels: tuple = (), value: float = 1.0) -> None:
+        """
+        Increments a counter.
+
+        Args:
+            name: Metric name.
+            labels: Tuple of (label, value) pairs.
+            value: Increment.
+        """
+        self._metrics().counters[(name, labels)] += value
+
+    def observe(self, name: str, labels: tuple, value: float) -> None:
+        """
+        Records a value in a histogram.
+
+        Args:
+            name: Metric name.
+            labels: Tuple of (label, value) pairs.
+            value: Observed value.
+        """
+        histograms = self._metrics().histograms
+        key = (name, labels)
+        histogram = histograms.get(key)
+        if histogram is None:
+            # One slot per bucket, one for +Inf, then the sum.
+            histogram = histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        histogram[bisect.bisect_left(self.buckets, value)] += 1
+        histogram[-1] += value
+
+    def collect(self) -> tuple[dict, dict]:
+        """
+        Sums the counters of every thread.
+
+        Return:
+            Tuple of the counters and the histograms keyed by (name, labels).
+        """
+        with self._lock:
+            threads = list(self._threads)
+
+        counters = defaultdict(float)
+        histograms = {}
+        for metrics in threads:
+            for key, value in metrics.counters.copy().items():
+                counters[key] += value
+            for key, histogram in metrics.histograms.copy().items():
+                total = histograms.setdefault(key, [0] * len(histogram))
+                for i, value in enumerate(list(histogram)):
+                    total[i] += value
+        return counters, histograms
+
+    def render(self) -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format.
+
+        Return:
+            Text of the scrape response.
+        """
+        counters, histograms = self.collect()
+        lines = []
+        names = sorted({name for name, _ in counters} | {name for name, _ in histograms})
+        for name in names:
+            kind, help_text = METRIC_HELP.get(name, ('counter', ''))
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+            for (metric, labels), histogram in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets + ('+Inf',), histogram[:-1]):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_format_labels(labels + (("le", str(bound)),))} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(histogram[-1])}')
+                lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self) -> None:
+        """Drops every recorded value."""
+        with self._lock:
+            for metrics in self._threads:
+                metrics.counters.clear()
+                metrics.histograms.clear()
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+registry = MetricsRegistry()
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """
+    Counts a lookup of an in-process or shared cache.
+
+    Args:
+        cache: Cache name, such as 'session' or 'rbac'.
+        hit: True on a cache hit, False on a miss.
+    """
+    registry.inc('cache_lookups_total', (('cache', cache), ('result', 'hit' if hit else 'miss')))
@@ -0,0 +1,33 @@
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+
+ADMIN_PATH_PREFIX = '/admin/'
+
+
+class AdminPathMixin:
+    """
+    Runs the wrapped Django middleware only for requests to the admin site.
+
+    API requests are authenticated by CustomSessionMiddleware alone, so they skip
+    Django's session, authentication and message stacks entirely.
+    """
+
+    path_prefix = ADMIN_PATH_PREFIX
+
+    def __call__(self, request):
+        if request.path.startswith(self.path_prefix):
+            return super().__call__(request)
+        return self.get_response(request)
+
+
+class AdminSessionMiddleware(AdminPathMixin, SessionMiddleware):
+    """Django SessionMiddleware limited to the admin site."""
+
+
+class AdminAuthenticationMiddleware(AdminPathMixin, AuthenticationMiddleware):
+    """Django AuthenticationMiddleware limited to the admin site."""
+
+
+class AdminMessageMiddleware(AdminPathMixin, MessageMiddleware):
+    """Django MessageMiddleware limited to the admin site."""
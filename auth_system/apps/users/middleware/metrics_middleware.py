@@ -0,0 +1,52 @@
+import time
+
+from django.db import connection
+
+from apps.users.metrics import registry
+
+
+class QueryCounter:
+    """Database execute wrapper counting queries and the time spent in them."""
+
+    __slots__ = ('count', 'duration')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """
+    Middleware recording request count, latency and database usage per URL name.
+
+    Requests that do not resolve to a view are recorded under the 'unmatched' label,
+    so scanners cannot blow up the number of series.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryCounter()
+        start = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        view = match.view_name if match is not None else 'unmatched'
+        labels = (('view', view), ('method', request.method))
+        registry.inc('http_requests_total', labels + (('status', response.status_code),))
+        registry.observe('http_request_duration_seconds', labels, duration)
+        if queries.count:
+            registry.inc('db_queries_total', labels, queries.count)
+            registry.inc('db_query_duration_seconds_total', labels, queries.duration)
+        return response
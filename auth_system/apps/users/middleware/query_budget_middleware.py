@@ -0,0 +1,32 @@
+import warnings
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from apps.users.query_budget import QueryBudgetWarning, QueryRecorder, check_query_budget
+
+
+class QueryBudgetMiddleware:
+    """
+    Middleware warning about views that exceed their max_queries budget or repeat a query.
+
+    Enabled with QUERY_BUDGET_WARNINGS, which defaults to DEBUG.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_BUDGET_WARNINGS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryRecorder()
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        if match is not None:
+            view_class = getattr(match.func, 'view_class', None)
+            for problem in check_query_budget(view_class, request.method, queries.queries):
+                warnings.warn(f'{request.path}: {problem}', QueryBudgetWarning, stacklevel=2)
+        return response
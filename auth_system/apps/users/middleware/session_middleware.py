@@ -1,6 +1,5 @@
-from django.contrib.auth.models import AnonymousUser
-
-from apps.users.models import Session
+from apps.users.middleware.admin_middleware import ADMIN_PATH_PREFIX
+from apps.users.sessions import SESSION_COOKIE_NAME, resolve_session, set_session_cookie
 
 
 class CustomSessionMiddleware:
@@ -10,31 +9,18 @@ class CustomSessionMiddleware:
         self.get_response = get_response
 
     def __call__(self, request):
-        if request.path.startswith('/admin/') or request.path.startswith('/static/'):
+        if request.path.startswith((ADMIN_PATH_PREFIX, '/static/')):
             return self.get_response(request)
 
-        session_key = request.COOKIES.get('session_key')
-        request.user = AnonymousUser()
-        expired_session = None
-
-        if session_key:
-            try:
-                session = Session.objects.select_related('user').get(
-                    session_key=session_key,
-                    is_active=True
-                )
-                if not session.is_expired() and session.user.is_active:
-                    request.user = session.user
-                else:
-                    session.is_active = False
-                    session.save()
-                    expired_session = session_key
-            except Session.DoesNotExist:
-                pass
+        context = resolve_session(request)
+        request.user = context.user
 
         response = self.get_response(request)
 
-        if expired_session:
-            response.delete_cookie('session_key')
+        # Any cookie that does not resolve to a live session is stale, drop it.
+        if context.expired:
+            response.delete_cookie(SESSION_COOKIE_NAME)
+        elif context.refreshed and SESSION_COOKIE_NAME not in response.cookies:
+            set_session_cookie(response, request.COOKIES[SESSION_COOKIE_NAME], context.session.expire_at)
 
         return response
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:49
+
+from django.db import migrations, models
+
+
+def create_rules_version(apps, schema_editor):
+    RulesVersion = apps.get_model('users', 'RulesVersion')
+    RulesVersion.objects.create(pk=1, version=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RulesVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0, verbose_name='Version')),
+            ],
+            options={
+                'verbose_name': 'Rules version',
+                'verbose_name_plural': 'Rules versions',
+            },
+        ),
+        migrations.RunPython(create_rules_version, migrations.RunPython.noop),
+    ]
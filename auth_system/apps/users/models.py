@@ -1,11 +1,15 @@
 from datetime import timedelta
 from secrets import token_urlsafe
 
+from django.conf import settings
+from django.contrib.auth import models as auth_models
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from apps.users.session_store import get_session_store
+
 
 class TimestampedModel(models.Model):
     """Abstract model with timestamps."""
@@ -25,6 +29,39 @@ class TimestampedModel(models.Model):
         abstract = True
 
 
+class UserQuerySet(models.QuerySet):
+    """
+    QuerySet of users that keeps the session cache in step with bulk updates.
+
+    save() is covered by the post_save signal; raw SQL bypasses both.
+    """
+
+    # Fields that authentication answers from cached sessions.
+    CACHED_FIELDS = frozenset({'is_active', 'role', 'role_id'})
+
+    def update(self, **kwargs) -> int:
+        """
+        Updates the users and drops their cached sessions if the activity flag or the role changes.
+
+        Args:
+            kwargs: Field values to set.
+        Returns:
+            Number of updated rows.
+        """
+        store = get_session_store()
+        if not store.enabled or self.CACHED_FIELDS.isdisjoint(kwargs):
+            return super().update(**kwargs)
+        user_ids = list(self.values_list('pk', flat=True))
+        updated = super().update(**kwargs)
+        for user_id in user_ids:
+            store.invalidate_user(user_id)
+        return updated
+
+
+class UserManager(auth_models.UserManager.from_queryset(UserQuerySet)):
+    """Manager of users with bulk updates that invalidate cached sessions."""
+
+
 class User(AbstractUser, TimestampedModel):
     """Custom user model with email field."""
 
@@ -48,6 +85,8 @@ class User(AbstractUser, TimestampedModel):
         verbose_name=_('Role'),
     )
 
+    objects = UserManager()
+
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
 
@@ -122,6 +161,19 @@ class BusinessElement(TimestampedModel):
         return self.name
 
 
+class AccessRoleRuleQuerySet(models.QuerySet):
+    """QuerySet of access rules."""
+
+    def with_relations(self) -> 'AccessRoleRuleQuerySet':
+        """
+        Joins the role and the business element, so rendering the rules takes no query per row.
+
+        Returns:
+            QuerySet with the related objects loaded.
+        """
+        return self.select_related('role', 'element')
+
+
 class AccessRoleRule(TimestampedModel):
     """Access rights for each role and business element."""
 
@@ -168,6 +220,8 @@ class AccessRoleRule(TimestampedModel):
         verbose_name=_('Delete all'),
     )
 
+    objects = AccessRoleRuleQuerySet.as_manager()
+
     def __str__(self) -> str:
         """
         Uses the Role and BusinessElement fields name.
@@ -183,6 +237,28 @@ class AccessRoleRule(TimestampedModel):
         unique_together = ('role', 'element')
 
 
+class RulesVersion(models.Model):
+    """Global version of the access rules, shared by every worker process."""
+
+    version = models.BigIntegerField(
+        default=0,
+        verbose_name=_('Version'),
+    )
+
+    def __str__(self) -> str:
+        """
+        Uses the model version field.
+
+        Return:
+            String representation of RulesVersion model.
+        """
+        return str(self.version)
+
+    class Meta:
+        verbose_name = _('Rules version')
+        verbose_name_plural = _('Rules versions')
+
+
 class Session(TimestampedModel):
     user = models.ForeignKey(
         'User',
@@ -201,6 +277,14 @@ class Session(TimestampedModel):
         verbose_name=_('Is active')
     )
 
+    class Meta:
+        indexes = [
+            # Live sessions of a user, newest expiry first, as read by the session rotation on login.
+            models.Index(fields=['user', '-expire_at'], condition=models.Q(is_active=True),
+                         name='session_user_live_idx'),
+            models.Index(fields=['expire_at'], name='session_expire_at_idx'),
+        ]
+
     def is_expired(self) -> bool:
         """
         Checks if the session has expired.
@@ -211,18 +295,35 @@ class Session(TimestampedModel):
         return (not self.is_active) or timezone.now() >= self.expire_at
 
     @classmethod
-    def create_session(cls, user: User, minutes: int = 60):
+    def build_session(cls, user: User, lifetime: int | None = None):
         """
-        Uses the model first_name, last_name and email fields.
+        Builds an unsaved session with a new random key.
 
         Args:
             user: The user instance for which the session is created.
-            minutes: Session lifetime in minutes. Default is 60.
+            lifetime: Session lifetime in seconds. Default is settings.SESSION_LIFETIME.
         Return:
-            Session object.
+            Unsaved Session object.
         """
-        return cls.objects.create(
+        if lifetime is None:
+            lifetime = settings.SESSION_LIFETIME
+        return cls(
             user=user,
             session_key=token_urlsafe(32),
-            expire_at=timezone.now() + timedelta(minutes=minutes),
+            expire_at=timezone.now() + timedelta(seconds=lifetime),
         )
+
+    @classmethod
+    def create_session(cls, user: User, lifetime: int | None = None):
+        """
+        Creates and saves a session with a new random key, without deactivating other sessions of the user.
+
+        Args:
+            user: The user instance for which the session is created.
+            lifetime: Session lifetime in seconds. Default is settings.SESSION_LIFETIME.
+        Return:
+            Session object.
+        """
+        session = cls.build_session(user, lifetime)
+        session.save(force_insert=True)
+        return session
@@ -0,0 +1,16 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination keyed on the primary key.
+
+    Every page is fetched with WHERE id > <last id> ORDER BY id LIMIT <page size>, so the cost
+    of a page does not depend on how deep it is. Cursors are opaque base64-encoded tokens.
+    """
+
+    ordering = 'id'
+    page_size = getattr(settings, 'API_PAGE_SIZE', 50)
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 500)
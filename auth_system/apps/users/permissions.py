@@ -1,5 +1,16 @@
 from rest_framework.permissions import BasePermission
-from .models import BusinessElement, AccessRoleRule
+from .rbac import get_permissions, has_flag
+
+ACCESS_ALL = 'all'
+ACCESS_OWN = 'own'
+
+# Actions accepted by the bulk permission check and the request methods they stand for
+ACTION_METHODS = {
+    'read': 'GET',
+    'create': 'POST',
+    'update': 'PATCH',
+    'delete': 'DELETE',
+}
 
 
 class RoleBasedPermission(BasePermission):
@@ -13,25 +24,6 @@ class RoleBasedPermission(BasePermission):
         'DELETE': ('delete_permission', 'delete_all_permission'),
     }
 
-    @staticmethod
-    def _get_rule(user, element_name):
-        """
-        Safely retrieves the AccessRoleRule instance for the given user and business element.
-
-        Args:
-            user: The user whose role is checked.
-            element_name: The name of the business element.
-        Returns:
-            AccessRoleRule instance if found and user is authenticated with a role; otherwise None.
-        """
-        if not user.is_authenticated or not getattr(user, 'role', None):
-            return None
-        try:
-            element = BusinessElement.objects.get(name=element_name)
-            return AccessRoleRule.objects.get(role=user.role, element=element)
-        except (BusinessElement.DoesNotExist, AccessRoleRule.DoesNotExist):
-            return None
-
     def has_permission(self, request, view):
         """
         Checks if the user has general permission to perform the request method on the view.
@@ -43,17 +35,7 @@ class RoleBasedPermission(BasePermission):
             True if permission is granted, False otherwise.
         """
         element_name = getattr(view, 'business_element_name', None)
-        rule = self._get_rule(request.user, element_name)
-        if not rule:
-            return False
-
-        own_perm, all_perm = self.action_map.get(request.method, (None, None))
-
-        if all_perm and getattr(rule, all_perm, False):
-            return True
-
-        if own_perm and getattr(rule, own_perm, False):
-            return True
+        return self.get_scope(get_permissions(request.user, element_name), request.method) is not None
 
     def has_object_permission(self, request, view, obj):
         """
@@ -67,20 +49,54 @@ class RoleBasedPermission(BasePermission):
             True if permission is granted, False otherwise.
         """
         element_name = getattr(view, 'business_element_name', None)
-        rule = self._get_rule(request.user, element_name)
-        if not rule:
-            return False
-
-        own_perm, all_perm = self.action_map.get(request.method, (None, None))
-
-        if all_perm and getattr(rule, all_perm, False):
-            return True
-
-        if own_perm and getattr(rule, own_perm, False):
-            owner_id = obj.get('owner') if isinstance(obj, dict) else getattr(obj, 'owner', None)
-            return owner_id == request.user.id
+        scope = self.get_scope(get_permissions(request.user, element_name), request.method)
+        if scope == ACCESS_OWN:
+            owner_field = getattr(view, 'owner_field', 'owner')
+            return getattr(obj, f'{owner_field}_id', None) == request.user.id
+        return scope == ACCESS_ALL
+
+    @classmethod
+    def get_scope(cls, mask: int | None, method: str) -> str | None:
+        """
+        Resolves which objects the permission bitmask grants access to for the request method.
 
-        return False
+        Args:
+            mask: Permission bitmask of the user's role, None if there is no rule.
+            method: The HTTP method of the request.
+        Returns:
+            ACCESS_ALL, ACCESS_OWN, or None if the method is not allowed at all.
+        """
+        own_perm, all_perm = cls.action_map.get(method, (None, None))
+        if has_flag(mask, all_perm):
+            return ACCESS_ALL
+        if has_flag(mask, own_perm):
+            return ACCESS_OWN
+        return None
+
+
+def evaluate_permissions(user, checks) -> list[bool]:
+    """
+    Answers a batch of permission checks with the same rules as RoleBasedPermission.
+
+    Every element is looked up once in the cached permission matrix, so the number of
+    queries does not depend on the size of the batch.
+
+    Args:
+        user: The user whose permissions are checked.
+        checks: Iterable of dicts with 'element', 'action' and an optional 'owner_id'.
+    Returns:
+        List of booleans in the order of the checks.
+    """
+    masks = {}
+    results = []
+    for check in checks:
+        element = check['element']
+        if element not in masks:
+            masks[element] = get_permissions(user, element)
+        scope = RoleBasedPermission.get_scope(masks[element], ACTION_METHODS[check['action']])
+        owner_id = check.get('owner_id')
+        results.append(scope == ACCESS_ALL or (scope == ACCESS_OWN and owner_id in (None, user.id)))
+    return results
 
 
 class IsAdminUserRole(BasePermission):
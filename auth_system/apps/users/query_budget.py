@@ -0,0 +1,88 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+# An SQL statement repeated this many times with different parameters is reported as N+1
+REPEATED_QUERY_THRESHOLD = 3
+
+# Nested atomic blocks issue these inside test transactions, they are not queries of the view
+TRANSACTION_STATEMENTS = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+
+class QueryBudgetWarning(RuntimeWarning):
+    """Warning issued in DEBUG when a view exceeds its query budget or repeats a query."""
+
+
+@dataclass
+class QueryRecorder:
+    """Database execute wrapper recording the SQL templates and parameters of every query but savepoints."""
+
+    queries: list[tuple[str, tuple]] = field(default_factory=list)
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.startswith(TRANSACTION_STATEMENTS):
+            self.queries.append((sql, tuple(params) if params is not None and not many else ()))
+        return execute(sql, params, many, context)
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+
+def get_query_budget(view_class, method: str) -> int | None:
+    """
+    Returns the maximum number of queries a view may run for the request method.
+
+    The budget is declared with the view's max_queries attribute, either as one number
+    or as a dict mapping request methods to numbers.
+
+    Args:
+        view_class: The view class, None for function views.
+        method: The HTTP method of the request.
+    Returns:
+        Maximum number of queries, or None if the view has no budget.
+    """
+    budget = getattr(view_class, 'max_queries', None)
+    if isinstance(budget, dict):
+        return budget.get(method)
+    return budget
+
+
+def find_repeated_queries(queries: list[tuple[str, tuple]],
+                          threshold: int = REPEATED_QUERY_THRESHOLD) -> list[tuple[str, int]]:
+    """
+    Finds N+1 patterns: the same SQL statement run many times with different parameters.
+
+    Args:
+        queries: (sql, params) pairs recorded by QueryRecorder.
+        threshold: Number of runs from which a statement is reported.
+    Returns:
+        List of (sql, number of runs) pairs.
+    """
+    params_by_sql = defaultdict(list)
+    for sql, params in queries:
+        params_by_sql[sql].append(params)
+    return [
+        (sql, len(params))
+        for sql, params in params_by_sql.items()
+        if len(params) >= threshold and len({repr(value) for value in params}) > 1
+    ]
+
+
+def check_query_budget(view_class, method: str, queries: list[tuple[str, tuple]]) -> list[str]:
+    """
+    Checks the queries of a request against the view's budget.
+
+    Args:
+        view_class: The view class, None for function views.
+        method: The HTTP method of the request.
+        queries: (sql, params) pairs recorded by QueryRecorder.
+    Returns:
+        List of problem descriptions, empty if the request stayed within its budget.
+    """
+    name = getattr(view_class, '__name__', 'view')
+    problems = []
+    budget = get_query_budget(view_class, method)
+    if budget is not None and len(queries) > budget:
+        problems.append(f'{method} {name} ran {len(queries)} queries, the budget is {budget}.')
+    for sql, count in find_repeated_queries(queries):
+        problems.append(f'{method} {name} ran the same query {count} times: {sql}')
+    return problems
@@ -0,0 +1,344 @@
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+try:
+    import redis
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover - redis is an optional runtime dependency
+    redis = None
+    RedisError = Exception
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY_PREFIX = 'ratelimit:'
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+# Scopes cleared by a successful login, so they end up counting failed attempts only
+# and nobody is locked out by their own logins.
+FAILURE_SCOPES = frozenset({'email'})
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """
+    Parses a rate such as '5/m' or '100/h'.
+
+    Args:
+        rate: Number of requests and period, one of s, m, h or d.
+    Returns:
+        Tuple of the number of requests and the window in seconds.
+    """
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+def sliding_window_count(previous: int, current: int, elapsed: float, window: int) -> float:
+    """
+    Estimates the number of hits in the last window from two fixed windows.
+
+    The previous window is weighted by the part of it that still overlaps the sliding window.
+
+    Args:
+        previous: Hits in the previous fixed window.
+        current: Hits in the current fixed window.
+        elapsed: Seconds since the start of the current fixed window.
+        window: Window length in seconds.
+    Returns:
+        Estimated number of hits.
+    """
+    return previous * (window - elapsed) / window + current
+
+
+def retry_after(previous: int, current: int, elapsed: float, window: int, limit: int) -> float:
+    """
+    Returns the seconds until the estimated count drops to the limit again.
+
+    Args:
+        previous: Hits in the previous fixed window.
+        current: Hits in the current fixed window.
+        elapsed: Seconds since the start of the current fixed window.
+        window: Window length in seconds.
+        limit: Allowed hits per window.
+    Returns:
+        Seconds to wait.
+    """
+    if previous and current < limit:
+        # The weight of the previous window decays until the estimate reaches the limit.
+        return max(window - elapsed - (limit - current) * window / previous, 0.0)
+    return window - elapsed
+
+
+class LocalRateLimitBackend:
+    """
+    In-process sliding-window counters.
+
+    Counters live in an LRU-bounded dict, so a flood of distinct keys cannot exhaust memory.
+    Each worker process counts on its own; use the Redis backend to share the limits.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._counters = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window: int, now: float) -> float | None:
+        """
+        Counts a request and checks it against the limit.
+
+        Args:
+            key: Rate limit key.
+            limit: Allowed requests per window.
+            window: Window length in seconds.
+            now: Current UNIX time.
+        Returns:
+            None if the request is allowed, otherwise the seconds to wait.
+        """
+        index, elapsed = divmod(now, window)
+        with self._lock:
+            counter = self._counters.pop(key, None)
+            if counter is None or counter[0] < index - 1:
+                counter = [index, 0, 0]
+            elif counter[0] == index - 1:
+                counter = [index, counter[2], 0]
+            counter[2] += 1
+            self._counters[key] = counter
+            if len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+            _, previous, current = counter
+        if sliding_window_count(previous, current, elapsed, window) <= limit:
+            return None
+        return retry_after(previous, current, elapsed, window, limit)
+
+    def clear(self, key: str, window: int, now: float) -> None:
+        """
+        Drops the counter of a key.
+
+        Args:
+            key: Rate limit key.
+            window: Window length in seconds.
+            now: Current UNIX time.
+        """
+        with self._lock:
+            self._counters.pop(key, None)
+
+    def reset(self) -> None:
+        """Drops every counter."""
+        with self._lock:
+            self._counters.clear()
+
+
+class RedisRateLimitBackend:
+    """
+    Sliding-window counters shared by every worker through Redis.
+
+    One round trip per check; when Redis is unavailable requests are allowed.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    @staticmethod
+    def _window_keys(key: str, window: int, now: float) -> tuple[str, str]:
+        index = int(now // window)
+        return f'{RATE_LIMIT_KEY_PREFIX}{key}:{index}', f'{RATE_LIMIT_KEY_PREFIX}{key}:{index - 1}'
+
+    def hit(self, key: str, limit: int, window: int, now: float) -> float | None:
+        """
+        Counts a request and checks it against the limit.
+
+        INCR returns the count including this request, so concurrent requests cannot all pass
+        the check before any of them is counted.
+
+        Args:
+            key: Rate limit key.
+            limit: Allowed requests per window.
+            window: Window length in seconds.
+            now: Current UNIX time.
+        Returns:
+            None if the request is allowed, otherwise the seconds to wait.
+        """
+        current_key, previous_key = self._window_keys(key, window, now)
+        try:
+            pipe = self.client.pipeline()
+            pipe.incr(current_key)
+            pipe.expire(current_key, window * 2)
+            pipe.get(previous_key)
+            results = pipe.execute()
+        except RedisError:
+            logger.warning('Rate limit store is unavailable, allowing the request.', exc_info=True)
+            return None
+        current, previous = int(results[0]), int(results[2] or 0)
+        elapsed = now % window
+        if sliding_window_count(previous, current, elapsed, window) <= limit:
+            return None
+        return retry_after(previous, current, elapsed, window, limit)
+
+    def clear(self, key: str, window: int, now: float) -> None:
+        """
+        Drops the counters of a key.
+
+        Args:
+            key: Rate limit key.
+            window: Window length in seconds.
+            now: Current UNIX time.
+        """
+        try:
+            self.client.delete(*self._window_keys(key, window, now))
+        except RedisError:
+            logger.warning('Failed to clear a rate limit counter.', exc_info=True)
+
+
+_backend = None
+
+
+def get_rate_limit_backend():
+    """
+    Returns the process-wide rate limit backend configured by settings.RATE_LIMIT_CACHE_URL.
+
+    Return:
+        RedisRateLimitBackend if a Redis URL is configured, LocalRateLimitBackend otherwise.
+    """
+    global _backend
+    if _backend is None:
+        url = getattr(settings, 'RATE_LIMIT_CACHE_URL', '')
+        if url and redis is not None:
+            _backend = RedisRateLimitBackend(redis.Redis.from_url(url))
+        else:
+            _backend = LocalRateLimitBackend(getattr(settings, 'RATE_LIMIT_MAX_KEYS', 100_000))
+    return _backend
+
+
+def _configured_limits(view_name: str, values: dict, scopes=None):
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    for scope, rate in settings.RATE_LIMITS.get(view_name, {}).items():
+        value = values.get(scope)
+        if value and (scopes is None or scope in scopes):
+            limit, window = parse_rate(rate)
+            yield scope, f'{view_name}:{scope}:{value}', limit, window
+
+
+def check_rate_limits(view_name: str, values: dict) -> float | None:
+    """
+    Counts a request against every limit configured for the URL name.
+
+    Every scope is counted before the credentials are checked, in one atomic step per scope.
+    A successful login then clears the FAILURE_SCOPES counters with clear_failures().
+
+    Args:
+        view_name: Namespaced URL name, such as 'users:user-login'.
+        values: Dictionary of key types ('ip', 'email') to the values of the request.
+    Returns:
+        None if the request is allowed, otherwise the longest time to wait in seconds.
+    """
+    backend, now, wait = get_rate_limit_backend(), time.time(), None
+    for scope, key, limit, window in _configured_limits(view_name, values):
+        scope_wait = backend.hit(key, limit, window, now)
+        if scope_wait is not None:
+            wait = max(wait or 0.0, scope_wait)
+    return wait
+
+
+def clear_failures(view_name: str, values: dict) -> None:
+    """
+    Forgets the failed attempts counted in the FAILURE_SCOPES limits of the URL name.
+
+    Args:
+        view_name: Namespaced URL name.
+        values: Dictionary of key types to the values of the request.
+    """
+    backend, now = get_rate_limit_backend(), time.time()
+    for _, key, _, window in _configured_limits(view_name, values, FAILURE_SCOPES):
+        backend.clear(key, window, now)
+
+
+def get_rate_limit_values(request, data) -> dict:
+    """
+    Collects the values the limits are keyed by.
+
+    The client address comes from REMOTE_ADDR, or from X-Forwarded-For only as far as
+    REST_FRAMEWORK['NUM_PROXIES'] trusted proxies have appended to it.
+
+    Args:
+        request: The Django or DRF request object.
+        data: Request data with an optional 'email'.
+    Returns:
+        Dictionary of key types to values.
+    """
+    email = data.get('email') if hasattr(data, 'get') else None
+    return {
+        'ip': BaseThrottle().get_ident(request),
+        'email': email.strip().lower() if isinstance(email, str) else None,
+    }
+
+
+class SlidingWindowRateThrottle(BaseThrottle):
+    """
+    Throttle applying settings.RATE_LIMITS of the request's URL name, by client IP and by email.
+
+    Runs before the view handler, so rejected requests cost neither a database query nor a password hash.
+    """
+
+    def __init__(self):
+        self.retry_after = None
+
+    def allow_request(self, request, view) -> bool:
+        """
+        Checks the request against the limits of its URL name.
+
+        Args:
+            request: The DRF request object.
+            view: The view being accessed.
+        Returns:
+            True if the request is allowed, False otherwise.
+        """
+        match = request.resolver_match
+        if match is None:
+            return True
+        self.retry_after = check_rate_limits(match.view_name, get_rate_limit_values(request, request.data))
+        return self.retry_after is None
+
+    def wait(self) -> float | None:
+        """
+        Returns the seconds until the request would be allowed.
+
+        Return:
+            Seconds to wait, rounded up.
+        """
+        return math.ceil(self.retry_after) if self.retry_after is not None else None
+
+
+def enforce_rate_limits(request, data: dict) -> None:
+    """
+    Applies the rate limits in views that are not DRF views.
+
+    Args:
+        request: The Django request object.
+        data: Parsed request data.
+    Raises:
+        Throttled: If a limit is exceeded.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return
+    wait = check_rate_limits(match.view_name, get_rate_limit_values(request, data))
+    if wait is not None:
+        raise Throttled(wait=math.ceil(wait))
+
+
+def clear_failed_attempts(request, data) -> None:
+    """
+    Forgets the failed attempts after the credentials of the request were accepted.
+
+    Args:
+        request: The Django or DRF request object.
+        data: Request data.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is not None:
+        clear_failures(match.view_name, get_rate_limit_values(request, data))
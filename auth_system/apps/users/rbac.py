@@ -0,0 +1,218 @@
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from enum import IntFlag
+from types import MappingProxyType
+
+from apps.users.metrics import record_cache_lookup
+from apps.users.models import AccessRoleRule
+
+
+class Perm(IntFlag):
+    """Bit flags of the AccessRoleRule permission fields."""
+
+    READ = 1
+    READ_ALL = 2
+    CREATE = 4
+    UPDATE = 8
+    UPDATE_ALL = 16
+    DELETE = 32
+    DELETE_ALL = 64
+
+
+PERMISSION_FLAGS = {
+    'read_permission': Perm.READ,
+    'read_all_permission': Perm.READ_ALL,
+    'create_permission': Perm.CREATE,
+    'update_permission': Perm.UPDATE,
+    'update_all_permission': Perm.UPDATE_ALL,
+    'delete_permission': Perm.DELETE,
+    'delete_all_permission': Perm.DELETE_ALL,
+}
+
+
+def has_flag(mask: int | None, field_name: str | None) -> bool:
+    """
+    Checks if the permission field is granted by the mask.
+
+    Args:
+        mask: Permission bitmask of a rule, None if there is no rule.
+        field_name: Name of an AccessRoleRule permission field.
+    Returns:
+        True if the permission is granted, False otherwise.
+    """
+    if not mask or not field_name:
+        return False
+    return bool(mask & PERMISSION_FLAGS[field_name])
+
+
+@dataclass(frozen=True)
+class PermissionSnapshot:
+    """Effective permissions of a role: business element name mapped to the permission bitmask."""
+
+    permissions: MappingProxyType
+    etag: str
+
+    @classmethod
+    def build(cls, permissions: dict) -> 'PermissionSnapshot':
+        """
+        Builds the snapshot and derives its ETag from the content.
+
+        The ETag is a content hash rather than the rules version, because the version is
+        counted per process and would differ between workers serving the same rules.
+
+        Args:
+            permissions: Element name to bitmask mapping.
+        Returns:
+            PermissionSnapshot object.
+        """
+        encoded = json.dumps(permissions, sort_keys=True, separators=(',', ':')).encode()
+        return cls(MappingProxyType(dict(permissions)), hashlib.sha256(encoded).hexdigest()[:16])
+
+    def to_dict(self) -> dict:
+        """
+        Returns the representation sent to clients.
+
+        Return:
+            Dictionary with the version and the permissions.
+        """
+        return {'version': self.etag, 'permissions': dict(self.permissions)}
+
+
+class PermissionMatrix:
+    """
+    Immutable snapshot of every AccessRoleRule.
+
+    Maps (role_id, element_name) to the permission bitmask of the rule.
+    Per-role permission snapshots are built on first use and live as long as the matrix.
+    """
+
+    __slots__ = ('version', '_masks', '_snapshots')
+
+    def __init__(self, version: int, masks: dict):
+        self.version = version
+        self._masks = MappingProxyType(dict(masks))
+        self._snapshots = {}
+
+    @classmethod
+    def build(cls, version: int) -> 'PermissionMatrix':
+        """
+        Compiles the matrix from the database with a single query.
+
+        Args:
+            version: Rules version the matrix is built for.
+        Returns:
+            PermissionMatrix object.
+        """
+        fields = tuple(PERMISSION_FLAGS)
+        masks = {}
+        for role_id, element_name, *flags in AccessRoleRule.objects.values_list('role_id', 'element__name', *fields):
+            masks[(role_id, element_name)] = sum(
+                PERMISSION_FLAGS[field] for field, granted in zip(fields, flags) if granted
+            )
+        return cls(version, masks)
+
+    def get(self, role_id: int | None, element_name: str | None) -> int | None:
+        """
+        Returns the permission bitmask for the role and business element.
+
+        Args:
+            role_id: Primary key of the role.
+            element_name: Name of the business element.
+        Returns:
+            Permission bitmask, or None if no rule exists.
+        """
+        return self._masks.get((role_id, element_name))
+
+    def snapshot(self, role_id: int | None) -> PermissionSnapshot:
+        """
+        Returns the effective permissions of the role.
+
+        Args:
+            role_id: Primary key of the role, None for users without a role.
+        Returns:
+            PermissionSnapshot object.
+        """
+        snapshot = self._snapshots.get(role_id)
+        if snapshot is None:
+            snapshot = PermissionSnapshot.build({
+                element_name: mask for (rule_role_id, element_name), mask in self._masks.items()
+                if rule_role_id == role_id
+            })
+            self._snapshots[role_id] = snapshot
+        return snapshot
+
+
+_lock = threading.Lock()
+_rules_version = 0
+_matrix = None
+
+
+def get_rules_version() -> int:
+    """
+    Returns the current version of the access rules.
+
+    Return:
+        Rules version number.
+    """
+    return _rules_version
+
+
+def bump_rules_version() -> int:
+    """
+    Marks every compiled permission matrix as stale.
+
+    Return:
+        New rules version number.
+    """
+    global _rules_version
+    with _lock:
+        _rules_version += 1
+        return _rules_version
+
+
+def get_permission_matrix() -> PermissionMatrix:
+    """
+    Returns the permission matrix, rebuilding it if the rules version has changed.
+
+    Return:
+        PermissionMatrix object for the current rules version.
+    """
+    global _matrix
+    matrix = _matrix
+    version = get_rules_version()
+    stale = matrix is None or matrix.version != version
+    record_cache_lookup('rbac', not stale)
+    if stale:
+        matrix = PermissionMatrix.build(version)
+        _matrix = matrix
+    return matrix
+
+
+def get_permissions(user, element_name: str | None) -> int | None:
+    """
+    Returns the permission bitmask of the user's role for the business element.
+
+    Args:
+        user: The user whose role is checked.
+        element_name: The name of the business element.
+    Returns:
+        Permission bitmask if the user is authenticated and a rule exists for their role; otherwise None.
+    """
+    role_id = getattr(user, 'role_id', None)
+    if not user.is_authenticated or role_id is None:
+        return None
+    return get_permission_matrix().get(role_id, element_name)
+
+
+def get_permission_snapshot(user) -> PermissionSnapshot:
+    """
+    Returns the effective permissions of the user's role.
+
+    Args:
+        user: The authenticated user.
+    Returns:
+        PermissionSnapshot object, empty if the user has no role.
+    """
+    return get_permission_matrix().snapshot(getattr(user, 'role_id', None))
@@ -0,0 +1,294 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+
+from apps.users.models import RulesVersion
+from apps.users.rbac import bump_rules_version
+
+try:
+    import redis
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover - redis is an optional runtime dependency
+    redis = None
+    RedisError = OSError
+
+logger = logging.getLogger(__name__)
+
+RULES_CHANNEL = 'rbac:rules'
+RULES_VERSION_PK = 1
+
+
+class RedisBroker:
+    """Publishes rule change events over Redis pub/sub."""
+
+    def __init__(self, client, channel: str = RULES_CHANNEL):
+        self.client = client
+        self.channel = channel
+
+    def publish(self, message: str) -> None:
+        """
+        Sends the message to every subscribed worker.
+
+        Args:
+            message: Payload of the event.
+        """
+        self.client.publish(self.channel, message)
+
+    def subscribe(self) -> 'RedisSubscription':
+        """
+        Opens a subscription to the rules channel.
+
+        Return:
+            RedisSubscription object.
+        """
+        return RedisSubscription(self.client.pubsub(ignore_subscribe_messages=True), self.channel)
+
+
+class RedisSubscription:
+    """Subscription to a Redis pub/sub channel."""
+
+    def __init__(self, pubsub, channel: str):
+        self.pubsub = pubsub
+        self.pubsub.subscribe(channel)
+
+    def get_message(self, timeout: float) -> str | None:
+        """
+        Waits for the next message.
+
+        Args:
+            timeout: Maximum time to wait in seconds.
+        Returns:
+            Message payload, or None if nothing arrived in time.
+        """
+        message = self.pubsub.get_message(timeout=timeout)
+        if not message:
+            return None
+        data = message['data']
+        return data.decode() if isinstance(data, bytes) else data
+
+    def close(self) -> None:
+        self.pubsub.close()
+
+
+class InMemoryBroker:
+    """
+    Broker backed by multiprocessing queues, used for local testing.
+
+    Subscriptions must be opened before the worker processes are started.
+    """
+
+    def __init__(self, context=None):
+        self.context = context or multiprocessing.get_context()
+        self.queues = []
+
+    def publish(self, message: str) -> None:
+        """
+        Sends the message to every subscription.
+
+        Args:
+            message: Payload of the event.
+        """
+        for subscriber_queue in self.queues:
+            subscriber_queue.put(message)
+
+    def subscribe(self) -> 'QueueSubscription':
+        """
+        Opens a new subscription.
+
+        Return:
+            QueueSubscription object.
+        """
+        subscriber_queue = self.context.Queue()
+        self.queues.append(subscriber_queue)
+        return QueueSubscription(subscriber_queue)
+
+
+class QueueSubscription:
+    """Subscription to an InMemoryBroker."""
+
+    def __init__(self, subscriber_queue):
+        self.queue = subscriber_queue
+
+    def get_message(self, timeout: float) -> str | None:
+        """
+        Waits for the next message.
+
+        Args:
+            timeout: Maximum time to wait in seconds.
+        Returns:
+            Message payload, or None if nothing arrived in time.
+        """
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        pass
+
+
+def fetch_rules_version() -> int:
+    """
+    Reads the global rules version from the database.
+
+    Return:
+        Global rules version number.
+    """
+    version = RulesVersion.objects.filter(pk=RULES_VERSION_PK).values_list('version', flat=True).first()
+    return version or 0
+
+
+class RulesListener(threading.Thread):
+    """
+    Background thread that marks local permission caches stale when the access rules change.
+
+    Listens for version events on the broker. When no broker is configured or it becomes
+    unavailable, the listener falls back to polling the RulesVersion row.
+    """
+
+    def __init__(self, broker=None, subscription=None, on_change=bump_rules_version,
+                 version_source=fetch_rules_version, poll_interval: float = 5.0):
+        super().__init__(name='rules-listener', daemon=True)
+        self.broker = broker
+        self.subscription = subscription
+        self.on_change = on_change
+        self.version_source = version_source
+        self.poll_interval = poll_interval
+        self.last_version = None
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            if self.subscription is not None or self.broker is not None:
+                try:
+                    self._listen()
+                except (RedisError, OSError):
+                    logger.warning('Rules broadcast is unavailable, polling the rules version.', exc_info=True)
+            self._poll()
+
+    def _listen(self) -> None:
+        subscription = self.subscription or self.broker.subscribe()
+        try:
+            # Catch up on changes published while the subscription was down.
+            self._poll_once()
+            while not self._stop_event.is_set():
+                message = subscription.get_message(timeout=1.0)
+                if message is not None:
+                    self.handle(int(message))
+        finally:
+            subscription.close()
+
+    def _poll(self) -> None:
+        if not self._stop_event.wait(self.poll_interval):
+            self._poll_once()
+
+    def _poll_once(self) -> None:
+        if self.version_source is None:
+            return
+        try:
+            self.handle(self.version_source())
+        except Exception:
+            logger.warning('Failed to read the rules version.', exc_info=True)
+        finally:
+            close_old_connections()
+
+    def handle(self, version: int) -> None:
+        """
+        Invalidates local caches if the version differs from the last one seen.
+
+        Args:
+            version: Global rules version number.
+        """
+        if version != self.last_version:
+            self.last_version = version
+            self.on_change()
+
+
+_broker = None
+_listener = None
+
+
+def get_broker() -> RedisBroker | None:
+    """
+    Returns the broker configured by settings.RBAC_BROADCAST_URL.
+
+    Return:
+        RedisBroker object, or None if broadcasting is disabled.
+    """
+    global _broker
+    if _broker is None:
+        url = getattr(settings, 'RBAC_BROADCAST_URL', '')
+        if url and redis is not None:
+            _broker = RedisBroker(redis.Redis.from_url(url))
+    return _broker
+
+
+def _publish_rules_version() -> None:
+    broker = get_broker()
+    if broker is None:
+        return
+    try:
+        broker.publish(str(fetch_rules_version()))
+    except RedisError:
+        logger.warning('Failed to publish the rules version.', exc_info=True)
+
+
+def _rules_changed() -> None:
+    bump_rules_version()
+    _publish_rules_version()
+
+
+def record_rules_change() -> None:
+    """
+    Registers a change of the access rules.
+
+    Increments the global version within the current transaction. Once the transaction commits,
+    the caches of the current process are invalidated and the version is published to other workers,
+    so no request rebuilds a matrix from uncommitted rows under the new version.
+    Several changes in one transaction produce a single version increment and a single event.
+    """
+    connection = transaction.get_connection()
+    if any(func is _rules_changed for _, func, _ in connection.run_on_commit):
+        return
+    updated = RulesVersion.objects.filter(pk=RULES_VERSION_PK).update(version=F('version') + 1)
+    if not updated:
+        RulesVersion.objects.get_or_create(pk=RULES_VERSION_PK, defaults={'version': 1})
+    transaction.on_commit(_rules_changed)
+
+
+def start_listener() -> RulesListener:
+    """
+    Starts the rules listener of the current worker process.
+
+    The listener is restarted automatically in processes forked afterwards.
+
+    Return:
+        The running RulesListener.
+    """
+    global _listener
+    if _listener is not None and _listener.is_alive():
+        return _listener
+    if _listener is None:
+        os.register_at_fork(after_in_child=_restart_listener)
+    _listener = RulesListener(
+        broker=get_broker(),
+        poll_interval=getattr(settings, 'RBAC_RULES_POLL_INTERVAL', 5.0),
+    )
+    _listener.start()
+    return _listener
+
+
+def _restart_listener() -> None:
+    global _broker
+    # Redis connections must not be shared with the parent process.
+    _broker = None
+    start_listener()
@@ -1,9 +1,15 @@
-from django.contrib.auth.hashers import make_password
+from django.conf import settings
+from django.db import transaction
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 
-from apps.users.models import User, AccessRoleRule, Role
+from apps.users.hashing import get_hashing_pool
+from apps.users.models import User, AccessRoleRule, BusinessElement, Role
+from apps.users.permissions import ACTION_METHODS
+from apps.users.rbac import PERMISSION_FLAGS
+from apps.users.rules_broadcast import record_rules_change
 
 
 class UserCreateSerializer(serializers.ModelSerializer):
@@ -35,13 +41,17 @@ class UserCreateSerializer(serializers.ModelSerializer):
         """
         Creates a new user instance with the password hashed.
 
+        The password is hashed on the hashing pool unless an already encoded
+        'password_encoded' value is passed to save().
+
         Args:
             validated_data: Validated data for creating the user.
         Returns:
             The created user instance.
         """
         validated_data.pop('password_repeat')
-        validated_data['password'] = make_password(validated_data['password'])
+        encoded = validated_data.pop('password_encoded', None)
+        validated_data['password'] = encoded or get_hashing_pool().make_password(validated_data['password'])
 
         if 'role' not in validated_data or validated_data['role'] is None:
             user_role = Role.objects.get(name='Пользователь')
@@ -59,11 +69,167 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'role')
 
 
+class RoleSummarySerializer(serializers.ModelSerializer):
+    """Serializer for a role nested in an access rule."""
+
+    class Meta:
+        model = Role
+        fields = ('id', 'name')
+
+
+class BusinessElementSummarySerializer(serializers.ModelSerializer):
+    """Serializer for a business element nested in an access rule."""
+
+    class Meta:
+        model = BusinessElement
+        fields = ('id', 'name')
+
+
 class AccessRoleRuleSerializer(serializers.ModelSerializer):
-    """Serializer for assess role representation/updates and delete."""
+    """
+    Serializer for assess role representation/updates and delete.
+
+    Relations are written as ids. With ?expand=role,element they are represented as nested objects;
+    the querysets of the access rule views join both, so expanding takes no extra queries.
+    """
+    expand_query_param = 'expand'
+    expandable_fields = {
+        'role': RoleSummarySerializer,
+        'element': BusinessElementSummarySerializer,
+    }
 
     class Meta:
         model = AccessRoleRule
         fields = ('id', 'role', 'element', 'read_permission', 'read_all_permission', 'create_permission',
                   'update_permission', 'update_all_permission', 'delete_permission', 'delete_all_permission')
         read_only_fields = ('id',)
+
+    @classmethod
+    def get_expand_names(cls, request) -> list[str]:
+        """
+        Returns the expandable relations named in the expand query parameter.
+
+        Args:
+            request: The DRF request object.
+        Returns:
+            Field names in the order of expandable_fields.
+        """
+        names = request.query_params.get(cls.expand_query_param, '').split(',')
+        return [name for name in cls.expandable_fields if name in names]
+
+    @cached_property
+    def expanded_fields(self) -> dict:
+        """
+        Returns the relations the request asked to expand.
+
+        Return:
+            Dictionary of field names to nested serializer instances.
+        """
+        request = self.context.get('request')
+        if request is None:
+            return {}
+        return {name: self.expandable_fields[name]() for name in self.get_expand_names(request)}
+
+    def to_representation(self, instance: AccessRoleRule) -> dict:
+        """
+        Represents the rule, with the requested relations as nested objects.
+
+        Args:
+            instance: The access rule to represent.
+        Returns:
+            Dictionary of the rule fields.
+        """
+        data = super().to_representation(instance)
+        for name, serializer in self.expanded_fields.items():
+            data[name] = serializer.to_representation(getattr(instance, name))
+        return data
+
+
+class PermissionCheckSerializer(serializers.Serializer):
+    """Serializer for a single permission check."""
+    element = serializers.CharField(max_length=100)
+    action = serializers.ChoiceField(choices=list(ACTION_METHODS))
+    owner_id = serializers.IntegerField(required=False, allow_null=True)
+
+
+class PermissionCheckBatchSerializer(serializers.Serializer):
+    """Serializer for a batch of permission checks."""
+    checks = PermissionCheckSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=getattr(settings, 'PERMISSION_CHECK_MAX_ITEMS', 1000),
+    )
+
+
+class AccessRoleRuleBulkItemSerializer(serializers.Serializer):
+    """Serializer for one rule of a bulk update; relations are validated for the whole batch at once."""
+    role = serializers.IntegerField()
+    element = serializers.IntegerField()
+    read_permission = serializers.BooleanField(default=False)
+    read_all_permission = serializers.BooleanField(default=False)
+    create_permission = serializers.BooleanField(default=False)
+    update_permission = serializers.BooleanField(default=False)
+    update_all_permission = serializers.BooleanField(default=False)
+    delete_permission = serializers.BooleanField(default=False)
+    delete_all_permission = serializers.BooleanField(default=False)
+
+
+class AccessRoleRuleBulkSerializer(serializers.Serializer):
+    """Serializer for creating or replacing many access rules in one transaction."""
+    rules = AccessRoleRuleBulkItemSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=getattr(settings, 'ACCESS_RULES_BULK_MAX_ITEMS', 10000),
+    )
+
+    def validate_rules(self, rules: list[dict]) -> list[dict]:
+        """
+        Checks that every (role, element) pair is unique and refers to existing objects.
+
+        Args:
+            rules: Validated rule items.
+        Returns:
+            rules: The same items.
+        """
+        pairs = {(rule['role'], rule['element']) for rule in rules}
+        if len(pairs) != len(rules):
+            raise serializers.ValidationError(_('Each role and element pair may appear only once.'))
+
+        role_ids = {role_id for role_id, _element_id in pairs}
+        element_ids = {element_id for _role_id, element_id in pairs}
+        missing_roles = role_ids - set(Role.objects.filter(id__in=role_ids).values_list('id', flat=True))
+        missing_elements = element_ids - set(
+            BusinessElement.objects.filter(id__in=element_ids).values_list('id', flat=True)
+        )
+        if missing_roles or missing_elements:
+            raise serializers.ValidationError(_('Unknown roles: %(roles)s. Unknown elements: %(elements)s.') % {
+                'roles': sorted(missing_roles), 'elements': sorted(missing_elements),
+            })
+        return rules
+
+    def create(self, validated_data: dict) -> list[AccessRoleRule]:
+        """
+        Inserts the rules, overwriting the permissions of existing (role, element) pairs.
+
+        All rules are written in one transaction with INSERT ... ON CONFLICT DO UPDATE,
+        and the change is broadcast to the other workers once.
+
+        Args:
+            validated_data: Validated data with the 'rules' list.
+        Returns:
+            The written AccessRoleRule objects.
+        """
+        fields = list(PERMISSION_FLAGS)
+        rules = [
+            AccessRoleRule(role_id=rule['role'], element_id=rule['element'], **{field: rule[field] for field in fields})
+            for rule in validated_data['rules']
+        ]
+        with transaction.atomic():
+            AccessRoleRule.objects.bulk_create(
+                rules,
+                update_conflicts=True,
+                unique_fields=['role', 'element'],
+                update_fields=fields + ['updated_at'],
+            )
+            record_rules_change()
+        return rules
@@ -0,0 +1,177 @@
+import logging
+import math
+import threading
+from collections import defaultdict
+from datetime import UTC, datetime
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from apps.users.models import Session
+
+logger = logging.getLogger(__name__)
+
+
+class SessionWriteBuffer:
+    """
+    Collects session cleanup writes made on the read path and applies them in batches.
+
+    Writes are flushed by the SessionFlusher thread as single UPDATE ... WHERE id IN (...)
+    statements. Expiry extensions are coalesced per session and rounded up to bucket seconds,
+    so sessions refreshed around the same time share one UPDATE. The buffer is bounded: when
+    nothing flushes it, new entries are rejected instead of growing without limit.
+    """
+
+    def __init__(self, batch_size: int = 500, max_size: int = 10000, bucket: int = 60):
+        self.batch_size = batch_size
+        self.max_size = max_size
+        self.bucket = bucket
+        self._deactivate = set()
+        self._extend = {}
+        self._lock = threading.Lock()
+
+    def deactivate(self, session_id: int) -> None:
+        """
+        Schedules the session to be marked inactive.
+
+        Args:
+            session_id: Primary key of the session.
+        """
+        with self._lock:
+            if len(self._deactivate) < self.max_size:
+                self._deactivate.add(session_id)
+
+    def extend(self, session_id: int, expire_at: datetime) -> datetime | None:
+        """
+        Schedules the expiry of the session to be moved forward.
+
+        Args:
+            session_id: Primary key of the session.
+            expire_at: The earliest new expiry time.
+        Returns:
+            The expiry time that will be written, or None if the buffer is full.
+        """
+        bucketed = datetime.fromtimestamp(math.ceil(expire_at.timestamp() / self.bucket) * self.bucket, tz=UTC)
+        with self._lock:
+            current = self._extend.get(session_id)
+            if current is None and len(self._extend) >= self.max_size:
+                return None
+            if current is None or current < bucketed:
+                self._extend[session_id] = bucketed
+            return self._extend[session_id]
+
+    def pending(self) -> int:
+        """
+        Returns the number of buffered writes.
+
+        Return:
+            Number of sessions waiting to be written.
+        """
+        return len(self._deactivate) + len(self._extend)
+
+    def flush(self) -> int:
+        """
+        Writes every buffered change to the database.
+
+        If a write fails, the taken changes go back into the buffer for the next flush. The writes
+        are idempotent, so rows updated before the error are simply updated again.
+
+        Return:
+            Number of updated rows.
+        """
+        with self._lock:
+            deactivate, self._deactivate = list(self._deactivate), set()
+            extend, self._extend = self._extend, {}
+
+        try:
+            return self._write(deactivate, extend)
+        except Exception:
+            self._restore(deactivate, extend)
+            raise
+
+    def _write(self, deactivate: list[int], extend: dict) -> int:
+        updated = 0
+        for ids in self._chunks(deactivate):
+            updated += Session.objects.filter(id__in=ids).update(is_active=False)
+
+        by_expiry = defaultdict(list)
+        for session_id, expire_at in extend.items():
+            by_expiry[expire_at].append(session_id)
+        for expire_at, session_ids in by_expiry.items():
+            for ids in self._chunks(session_ids):
+                # Never shorten a session or revive a deactivated one.
+                updated += Session.objects.filter(
+                    id__in=ids, is_active=True, expire_at__lt=expire_at
+                ).update(expire_at=expire_at)
+        return updated
+
+    def _restore(self, deactivate: list[int], extend: dict) -> None:
+        # The restored changes may take the buffer past max_size once, at most to twice its size.
+        with self._lock:
+            self._deactivate.update(deactivate)
+            for session_id, expire_at in extend.items():
+                current = self._extend.get(session_id)
+                if current is None or current < expire_at:
+                    self._extend[session_id] = expire_at
+
+    def _chunks(self, ids: list[int]):
+        for start in range(0, len(ids), self.batch_size):
+            yield ids[start:start + self.batch_size]
+
+
+class SessionFlusher(threading.Thread):
+    """Background thread that periodically flushes the session write buffer."""
+
+    def __init__(self, buffer: SessionWriteBuffer, interval: float):
+        super().__init__(name='session-flusher', daemon=True)
+        self.buffer = buffer
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            if not self.buffer.pending():
+                continue
+            try:
+                self.buffer.flush()
+            except Exception:
+                logger.warning('Failed to flush session writes.', exc_info=True)
+            finally:
+                close_old_connections()
+
+
+_buffer = None
+_flusher = None
+
+
+def get_write_buffer() -> SessionWriteBuffer:
+    """
+    Returns the process-wide session write buffer.
+
+    Return:
+        SessionWriteBuffer object.
+    """
+    global _buffer
+    if _buffer is None:
+        _buffer = SessionWriteBuffer(
+            batch_size=getattr(settings, 'SESSION_WRITE_BATCH_SIZE', 500),
+            bucket=getattr(settings, 'SESSION_REFRESH_BUCKET', 60),
+        )
+    return _buffer
+
+
+def start_session_flusher() -> SessionFlusher:
+    """
+    Starts the flusher of the session write buffer in the current worker process.
+
+    Return:
+        The running SessionFlusher.
+    """
+    global _flusher
+    if _flusher is None or not _flusher.is_alive():
+        _flusher = SessionFlusher(get_write_buffer(), getattr(settings, 'SESSION_WRITE_FLUSH_INTERVAL', 1.0))
+        _flusher.start()
+    return _flusher
@@ -0,0 +1,116 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.users.models import Session
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PurgeStats:
+    """Statistics of a purge run."""
+
+    deleted: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+    lock_times: list[float] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.deleted / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def max_lock_time(self) -> float:
+        return max(self.lock_times, default=0.0)
+
+    @property
+    def avg_lock_time(self) -> float:
+        return sum(self.lock_times) / len(self.lock_times) if self.lock_times else 0.0
+
+
+def purge_sessions(batch_size: int = 5000, max_batches: int | None = None) -> PurgeStats:
+    """
+    Deletes expired and inactive sessions in bounded batches.
+
+    Every batch runs in its own transaction, so row locks are held only for one batch.
+    Rows locked by a concurrent purge are skipped on databases that support it.
+
+    Args:
+        batch_size: Maximum number of rows deleted per transaction.
+        max_batches: Stop after this many batches, None to purge everything.
+    Returns:
+        PurgeStats object.
+    """
+    stats = PurgeStats()
+    stale = Q(is_active=False) | Q(expire_at__lte=timezone.now())
+    started = time.perf_counter()
+
+    while max_batches is None or stats.batches < max_batches:
+        batch_started = time.perf_counter()
+        with transaction.atomic():
+            ids = list(
+                Session.objects.filter(stale).select_for_update(skip_locked=True)
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if ids:
+                deleted, _ = Session.objects.filter(id__in=ids).delete()
+        if not ids:
+            break
+        stats.lock_times.append(time.perf_counter() - batch_started)
+        stats.deleted += deleted
+        stats.batches += 1
+
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+class SessionReaper(threading.Thread):
+    """Background thread that periodically purges expired and inactive sessions."""
+
+    def __init__(self, interval: float, batch_size: int = 5000):
+        super().__init__(name='session-reaper', daemon=True)
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                stats = purge_sessions(self.batch_size)
+                if stats.deleted:
+                    logger.info('Purged %s sessions in %s batches (%.0f rows/s, max lock %.1f ms).',
+                                stats.deleted, stats.batches, stats.rows_per_second, stats.max_lock_time * 1000)
+            except Exception:
+                logger.warning('Failed to purge sessions.', exc_info=True)
+            finally:
+                close_old_connections()
+
+
+_reaper = None
+
+
+def start_session_reaper() -> SessionReaper | None:
+    """
+    Starts the session reaper if settings.SESSION_PURGE_INTERVAL is set.
+
+    Return:
+        The running SessionReaper, or None if the reaper is disabled.
+    """
+    global _reaper
+    interval = getattr(settings, 'SESSION_PURGE_INTERVAL', 0)
+    if not interval:
+        return None
+    if _reaper is None or not _reaper.is_alive():
+        _reaper = SessionReaper(interval, getattr(settings, 'SESSION_PURGE_BATCH_SIZE', 5000))
+        _reaper.start()
+    return _reaper
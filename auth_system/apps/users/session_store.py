@@ -0,0 +1,202 @@
+import json
+import logging
+from dataclasses import asdict, dataclass
+from datetime import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+try:
+    import redis
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover - redis is an optional runtime dependency
+    redis = None
+    RedisError = Exception
+
+logger = logging.getLogger(__name__)
+
+SESSION_KEY_PREFIX = 'session:'
+USER_INDEX_PREFIX = 'session:user:'
+
+
+@dataclass(frozen=True)
+class CachedSession:
+    """Minimal snapshot of a Session row needed to authenticate a request."""
+
+    session_id: int
+    user_id: int
+    role_id: int | None
+    expire_at: datetime
+    is_active: bool
+
+    @classmethod
+    def from_session(cls, session) -> 'CachedSession':
+        """
+        Builds a snapshot from a Session instance.
+
+        Args:
+            session: Session instance with the related user loaded.
+        Returns:
+            CachedSession object.
+        """
+        return cls(
+            session_id=session.id,
+            user_id=session.user_id,
+            role_id=session.user.role_id,
+            expire_at=session.expire_at,
+            is_active=session.is_active,
+        )
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> 'CachedSession':
+        """
+        Restores a snapshot from its JSON representation.
+
+        Args:
+            raw: JSON produced by to_json().
+        Returns:
+            CachedSession object.
+        """
+        data = json.loads(raw)
+        data['expire_at'] = datetime.fromisoformat(data['expire_at'])
+        return cls(**data)
+
+    def to_json(self) -> str:
+        """
+        Serializes the snapshot to JSON.
+
+        Return:
+            JSON string.
+        """
+        data = asdict(self)
+        data['expire_at'] = self.expire_at.isoformat()
+        return json.dumps(data)
+
+    def ttl(self) -> int:
+        """
+        Calculates the remaining lifetime of the session.
+
+        Return:
+            Remaining lifetime in whole seconds, 0 if the session has expired.
+        """
+        return max(int((self.expire_at - timezone.now()).total_seconds()), 0)
+
+    def is_expired(self) -> bool:
+        """
+        Checks if the session has expired.
+
+        Return:
+            True if the session has expired or is inactive, False otherwise.
+        """
+        return (not self.is_active) or timezone.now() >= self.expire_at
+
+
+class SessionStore:
+    """
+    Redis cache in front of the Session table.
+
+    Entries live exactly as long as the session itself. Every session key is also registered in a
+    per-user index, so all sessions of a user can be invalidated without touching the database.
+    When no client is configured, every lookup is a miss and writes are no-ops.
+    """
+
+    def __init__(self, client=None):
+        self.client = client
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Checks if a Redis client is configured.
+
+        Return:
+            True if the cache is used, False otherwise.
+        """
+        return self.client is not None
+
+    def get(self, session_key: str) -> CachedSession | None:
+        """
+        Returns the cached session for the given key.
+
+        Args:
+            session_key: Value of the session cookie.
+        Returns:
+            CachedSession object, or None on a cache miss or Redis failure.
+        """
+        if not self.enabled:
+            return None
+        try:
+            raw = self.client.get(SESSION_KEY_PREFIX + session_key)
+        except RedisError:
+            logger.warning('Session cache is unavailable, falling back to the database.', exc_info=True)
+            return None
+        return CachedSession.from_json(raw) if raw else None
+
+    def set(self, session_key: str, session: CachedSession) -> None:
+        """
+        Caches the session with a TTL equal to its remaining lifetime.
+
+        Args:
+            session_key: Value of the session cookie.
+            session: Snapshot to cache.
+        """
+        ttl = session.ttl()
+        if not self.enabled or ttl <= 0 or not session.is_active:
+            return
+        user_index = f'{USER_INDEX_PREFIX}{session.user_id}'
+        try:
+            pipe = self.client.pipeline()
+            pipe.set(SESSION_KEY_PREFIX + session_key, session.to_json(), ex=ttl)
+            pipe.sadd(user_index, session_key)
+            pipe.expire(user_index, ttl)
+            pipe.execute()
+        except RedisError:
+            logger.warning('Failed to cache session.', exc_info=True)
+
+    def invalidate(self, *session_keys: str) -> None:
+        """
+        Removes the given sessions from the cache.
+
+        Args:
+            session_keys: Values of the session cookies.
+        """
+        if not self.enabled or not session_keys:
+            return
+        try:
+            self.client.delete(*(SESSION_KEY_PREFIX + key for key in session_keys))
+        except RedisError:
+            logger.warning('Failed to invalidate cached sessions.', exc_info=True)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """
+        Removes every cached session of the given user.
+
+        Args:
+            user_id: Primary key of the user.
+        """
+        if not self.enabled:
+            return
+        user_index = f'{USER_INDEX_PREFIX}{user_id}'
+        try:
+            session_keys = [key.decode() if isinstance(key, bytes) else key
+                            for key in self.client.smembers(user_index)]
+            self.client.delete(user_index, *(SESSION_KEY_PREFIX + key for key in session_keys))
+        except RedisError:
+            logger.warning('Failed to invalidate cached sessions.', exc_info=True)
+
+
+_store = None
+
+
+def get_session_store() -> SessionStore:
+    """
+    Returns the process-wide session store configured by settings.SESSION_CACHE_URL.
+
+    Return:
+        SessionStore object (disabled if no Redis URL is configured).
+    """
+    global _store
+    if _store is None:
+        url = getattr(settings, 'SESSION_CACHE_URL', '')
+        client = redis.Redis.from_url(url) if url and redis is not None else None
+        _store = SessionStore(client)
+    return _store
@@ -0,0 +1,317 @@
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections, router, transaction
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+
+from apps.users.metrics import record_cache_lookup
+from apps.users.models import Session, User
+from apps.users.session_flusher import get_write_buffer
+from apps.users.session_store import CachedSession, get_session_store
+from apps.users.tokens import get_denylist, is_jwt_mode
+
+SESSION_COOKIE_NAME = 'session_key'
+REQUEST_CONTEXT_ATTR = '_session_context'
+
+
+class CachedSessionUser(SimpleLazyObject):
+    """
+    User proxy built from a cached session.
+
+    Identity and role are answered from the cache; the User row is loaded only when
+    any other attribute is accessed.
+    """
+
+    def __init__(self, session: CachedSession):
+        super().__init__(lambda: User.objects.select_related('role').get(pk=session.user_id))
+        self.__dict__['_session'] = session
+
+    @property
+    def id(self) -> int:
+        return self._session.user_id
+
+    pk = id
+
+    @property
+    def role_id(self) -> int | None:
+        return self._session.role_id
+
+    @property
+    def is_active(self) -> bool:
+        return True
+
+    @property
+    def is_authenticated(self) -> bool:
+        return True
+
+    @property
+    def is_anonymous(self) -> bool:
+        return False
+
+    def __bool__(self) -> bool:
+        return True
+
+
+@dataclass(frozen=True)
+class SessionContext:
+    """Result of resolving the session cookie of a single request."""
+
+    session: CachedSession | None = None
+    user: object = field(default_factory=AnonymousUser)
+    expired: bool = False
+    refreshed: bool = False
+
+    @property
+    def is_authenticated(self) -> bool:
+        """
+        Checks if the request carries a valid session.
+
+        Return:
+            True if a live session was found for the cookie, False otherwise.
+        """
+        return self.session is not None and not self.expired
+
+
+def load_session_context(session_key: str | None) -> SessionContext:
+    """
+    Looks up the live session for the given key.
+
+    The session cache is consulted first; the database is queried only on a miss.
+    Expiry is part of the query predicate, so validation never writes: sessions of
+    deactivated users are handed to the background write buffer instead.
+
+    Args:
+        session_key: Value of the session cookie.
+    Returns:
+        SessionContext describing the lookup result.
+    """
+    if not session_key:
+        return SessionContext()
+
+    store = get_session_store()
+    cached = store.get(session_key)
+    if store.enabled:
+        record_cache_lookup('session', cached is not None)
+    if cached is not None and not cached.is_expired():
+        refreshed = refresh_expiry(session_key, cached)
+        if refreshed is not None:
+            return SessionContext(session=refreshed, user=CachedSessionUser(refreshed), refreshed=True)
+        return SessionContext(session=cached, user=CachedSessionUser(cached))
+
+    try:
+        session = Session.objects.select_related('user__role').get(
+            session_key=session_key,
+            is_active=True,
+            expire_at__gt=timezone.now()
+        )
+    except Session.DoesNotExist:
+        if cached is not None:
+            store.invalidate(session_key)
+        return SessionContext(expired=True)
+
+    if not session.user.is_active:
+        get_write_buffer().deactivate(session.id)
+        store.invalidate(session_key)
+        return SessionContext(session=CachedSession.from_session(session), expired=True)
+
+    cached = CachedSession.from_session(session)
+    refreshed = refresh_expiry(session_key, cached)
+    if refreshed is not None:
+        return SessionContext(session=refreshed, user=session.user, refreshed=True)
+    store.set(session_key, cached)
+    return SessionContext(session=cached, user=session.user)
+
+
+def refresh_expiry(session_key: str, session: CachedSession) -> CachedSession | None:
+    """
+    Extends the session by a full lifetime if sliding expiry is on and the session is close to expiring.
+
+    The new expiry is written to the session cache right away and to the database in batches
+    by the session write buffer, so most requests do not extend anything.
+
+    Args:
+        session_key: Value of the session cookie.
+        session: The live session.
+    Returns:
+        The extended session, or None if the expiry did not move.
+    """
+    if not settings.SESSION_SLIDING_EXPIRY:
+        return None
+    lifetime = timedelta(seconds=settings.SESSION_LIFETIME)
+    now = timezone.now()
+    if session.expire_at - now > lifetime * settings.SESSION_REFRESH_FRACTION:
+        return None
+
+    expire_at = get_write_buffer().extend(session.session_id, now + lifetime)
+    if expire_at is None or expire_at <= session.expire_at:
+        return None
+    refreshed = replace(session, expire_at=expire_at)
+    get_session_store().set(session_key, refreshed)
+    return refreshed
+
+
+def set_session_cookie(response, session_key: str, expire_at: datetime) -> None:
+    """
+    Sets the session cookie on the response.
+
+    Args:
+        response: The HTTP response object.
+        session_key: Value of the session cookie.
+        expire_at: Expiry time of the session.
+    """
+    response.set_cookie(SESSION_COOKIE_NAME, session_key, expires=expire_at, httponly=True,
+                        secure=True, samesite='Lax')
+
+
+def resolve_session(request) -> SessionContext:
+    """
+    Resolves the session of the request once and caches the result on the request.
+
+    Both CustomSessionMiddleware and CookieSessionAuthentication go through this function,
+    so the session is looked up at most once per request. In JWT mode session keys are refresh
+    tokens and are not accepted as cookies.
+
+    Args:
+        request: The Django HttpRequest object (not the DRF wrapper).
+    Returns:
+        SessionContext shared by every caller within the same request.
+    """
+    context = getattr(request, REQUEST_CONTEXT_ATTR, None)
+    if context is None:
+        context = load_session_context(None if is_jwt_mode() else request.COOKIES.get(SESSION_COOKIE_NAME))
+        setattr(request, REQUEST_CONTEXT_ATTR, context)
+    return context
+
+
+def start_session(user: User) -> Session:
+    """
+    Creates a new session for the user and deactivates the sessions over the concurrency limit.
+
+    The user keeps at most SESSION_MAX_CONCURRENT active sessions, the new one included; the
+    sessions that expire first are deactivated. 0 disables the limit. Concurrent logins of the same
+    user are serialized by a lock on the user row, so the limit also holds under parallel requests.
+    On PostgreSQL the rotation is a single statement after the lock, on other databases it runs in
+    the same transaction as the lock.
+
+    Args:
+        user: The user who logs in.
+    Returns:
+        The created Session object.
+    """
+    max_concurrent = settings.SESSION_MAX_CONCURRENT
+    if max_concurrent <= 0:
+        return Session.create_session(user)
+
+    session = Session.build_session(user)
+    using = router.db_for_write(Session)
+    with transaction.atomic(using=using):
+        _lock_user(session.user_id, using)
+        if connections[using].vendor == 'postgresql':
+            evicted = _rotate_in_one_statement(session, using, keep=max_concurrent - 1)
+        else:
+            evicted = _rotate_in_transaction(session, using, keep=max_concurrent - 1)
+
+    if evicted:
+        session_ids, session_keys = zip(*evicted)
+        if is_jwt_mode():
+            get_denylist().revoke(session_ids)
+        get_session_store().invalidate(*session_keys)
+    return session
+
+
+def _lock_user(user_id: int, using: str) -> None:
+    """
+    Locks the user row until the end of the transaction, where the database supports row locks.
+
+    FOR NO KEY UPDATE is used where available, so inserting sessions that reference the user is not blocked.
+
+    Args:
+        user_id: ID of the user.
+        using: Alias of the database.
+    """
+    features = connections[using].features
+    if features.has_select_for_update:
+        list(
+            User.objects.using(using).select_for_update(no_key=features.has_select_for_no_key_update)
+            .filter(pk=user_id).values_list('pk')
+        )
+
+
+# The sessions to deactivate are the active ones after the first `keep` by expiry. The new row is
+# not visible to the UPDATE, both run on the statement's snapshot. The caller holds the user lock,
+# so under READ COMMITTED the snapshot includes the sessions of the logins that ran before.
+ROTATE_SESSIONS_SQL = """
+WITH evicted AS (
+    UPDATE {table} SET is_active = false, updated_at = %(now)s
+    WHERE id IN (
+        SELECT id FROM {table}
+        WHERE user_id = %(user_id)s AND is_active
+        ORDER BY expire_at DESC, id DESC
+        OFFSET %(keep)s
+    )
+    RETURNING id, session_key
+), created AS (
+    INSERT INTO {table} (created_at, updated_at, user_id, session_key, expire_at, is_active)
+    VALUES (%(now)s, %(now)s, %(user_id)s, %(session_key)s, %(expire_at)s, true)
+    RETURNING id
+)
+SELECT created.id, evicted.id, evicted.session_key FROM created LEFT JOIN evicted ON true
+"""
+
+
+def _rotate_in_one_statement(session: Session, using: str, keep: int) -> list[tuple[int, str]]:
+    """
+    Deactivates the sessions over the limit and inserts the new one with a single PostgreSQL statement.
+
+    Args:
+        session: The unsaved new session, saved in place.
+        using: Alias of the database.
+        keep: Number of existing active sessions to keep.
+    Returns:
+        List of (id, session_key) pairs of the deactivated sessions.
+    """
+    connection = connections[using]
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(ROTATE_SESSIONS_SQL.format(table=connection.ops.quote_name(Session._meta.db_table)), {
+            'now': now,
+            'user_id': session.user_id,
+            'session_key': session.session_key,
+            'expire_at': session.expire_at,
+            'keep': keep,
+        })
+        rows = cursor.fetchall()
+
+    session.id = rows[0][0]
+    session.created_at = session.updated_at = now
+    session._state.adding = False
+    session._state.db = using
+    return [(session_id, session_key) for _, session_id, session_key in rows if session_id is not None]
+
+
+def _rotate_in_transaction(session: Session, using: str, keep: int) -> list[tuple[int, str]]:
+    """
+    Deactivates the sessions over the limit and saves the new one.
+
+    Args:
+        session: The unsaved new session, saved in place.
+        using: Alias of the database.
+        keep: Number of existing active sessions to keep.
+    Returns:
+        List of (id, session_key) pairs of the deactivated sessions.
+    """
+    evicted = list(
+        Session.objects.using(using).select_for_update()
+        .filter(user_id=session.user_id, is_active=True)
+        .order_by('-expire_at', '-id')
+        .values_list('id', 'session_key')[keep:]
+    )
+    if evicted:
+        Session.objects.using(using).filter(id__in=[session_id for session_id, _ in evicted]).update(
+            is_active=False
+        )
+    session.save(force_insert=True, using=using)
+    return evicted
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.users.models import AccessRoleRule, BusinessElement, Role, User
+from apps.users.rules_broadcast import record_rules_change
+from apps.users.session_store import get_session_store
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_sessions(sender, instance, **kwargs):
+    """Drops cached sessions of a saved user, so role and activity changes apply immediately."""
+    get_session_store().invalidate_user(instance.id)
+
+
+@receiver(post_save, sender=AccessRoleRule)
+@receiver(post_delete, sender=AccessRoleRule)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=BusinessElement)
+@receiver(post_delete, sender=BusinessElement)
+def invalidate_permission_matrix(sender, **kwargs):
+    """Marks compiled permission matrices of every worker as stale whenever access rules change."""
+    record_rules_change()
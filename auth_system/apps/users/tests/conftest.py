@@ -1,7 +1,16 @@
+from contextlib import contextmanager
+
+import fakeredis
 import pytest
+from django.db import connection
+from django.urls import resolve
 from rest_framework.test import APIClient
 
+from apps.users import ratelimit, session_store as session_store_module
 from apps.users.models import User, Session, AccessRoleRule, Role, BusinessElement
+from apps.users.query_budget import QueryRecorder, check_query_budget
+from apps.users.rbac import bump_rules_version
+from apps.users.session_store import SessionStore
 
 
 @pytest.fixture
@@ -33,6 +42,18 @@ def admin_user():
     return user
 
 
+@pytest.fixture(autouse=True)
+def reset_permission_matrix():
+    # Rows created by earlier tests are rolled back without signals.
+    bump_rules_version()
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits(monkeypatch):
+    # Every test logs in from the same address, counters must not leak between tests.
+    monkeypatch.setattr(ratelimit, '_backend', ratelimit.LocalRateLimitBackend())
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -75,3 +96,37 @@ def access_rule(element):
         role=Role.objects.get(name='Пользователь'),
         element=element
     )
+
+
+@pytest.fixture
+def session_store(monkeypatch):
+    store = SessionStore(fakeredis.FakeRedis())
+    monkeypatch.setattr(session_store_module, '_store', store)
+    return store
+
+
+@pytest.fixture
+def commit_callbacks():
+    """Runs the on_commit callbacks queued in the test transaction, as if it had committed."""
+
+    def run():
+        callbacks, connection.run_on_commit = connection.run_on_commit, []
+        for _, func, _ in callbacks:
+            func()
+
+    return run
+
+
+@pytest.fixture
+def assert_query_budget():
+    """Fails the test if the request exceeds the max_queries budget of its view or repeats a query."""
+
+    @contextmanager
+    def check(method: str, url: str):
+        queries = QueryRecorder()
+        with connection.execute_wrapper(queries):
+            yield queries
+        problems = check_query_budget(getattr(resolve(url).func, 'view_class', None), method, queries.queries)
+        assert not problems, '\n'.join(problems + [sql for sql, _ in queries.queries])
+
+    return check
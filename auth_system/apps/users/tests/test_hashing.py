@@ -0,0 +1,136 @@
+import threading
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework import status
+from django.contrib.auth.hashers import identify_hasher
+from rest_framework.exceptions import Throttled
+
+from apps.users import async_views, hashing
+from apps.users.hashing import PasswordHashingPool, VerificationCache, schedule_rehash
+from apps.users.models import User
+
+
+@pytest.fixture
+def full_pool(monkeypatch):
+    pool = PasswordHashingPool(max_workers=0, queue_size=0, retry_after=3)
+    pool._slots.acquire()
+    monkeypatch.setattr(hashing, '_pool', pool)
+    return pool
+
+
+def test_pool_rejects_jobs_when_queue_is_full():
+    pool = PasswordHashingPool(max_workers=1, queue_size=0)
+    running = pool.submit(time.sleep, 0.5)
+
+    with pytest.raises(Throttled):
+        pool.submit(time.sleep, 0)
+
+    running.result()
+    assert pool.submit(time.sleep, 0).result() is None
+
+
+@pytest.mark.django_db
+def test_login_returns_429_when_pool_is_full(api_client, regular_user, full_pool):
+    data = {'email': regular_user.email, 'password': 'testpass123'}
+
+    response = api_client.post(reverse('users:user-login'), data)
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response['Retry-After'] == '3'
+
+
+@pytest.mark.django_db
+def test_async_login(regular_user):
+    request = RequestFactory().post('/users/login/', {'email': regular_user.email, 'password': 'testpass123'},
+                                    content_type='application/json')
+
+    response = async_to_sync(async_views.login)(request)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert 'session_key' in response.cookies
+
+
+@pytest.mark.django_db
+def test_async_register(user_registration_data):
+    request = RequestFactory().post('/users/register/', user_registration_data, content_type='application/json')
+
+    response = async_to_sync(async_views.register)(request)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    user = User.objects.get(email=user_registration_data['email'])
+    assert user.check_password(user_registration_data['password'])
+
+
+@pytest.mark.django_db
+def test_async_register_returns_429_when_pool_is_full(user_registration_data, full_pool):
+    request = RequestFactory().post('/users/register/', user_registration_data, content_type='application/json')
+
+    response = async_to_sync(async_views.register)(request)
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert not User.objects.filter(email=user_registration_data['email']).exists()
+
+
+def test_verification_cache_evicts_least_recently_used():
+    cache = VerificationCache(ttl=60, max_size=2)
+    cache.add(1, 'first', 'hash')
+    cache.add(2, 'second', 'hash')
+    assert cache.contains(1, 'first', 'hash')
+
+    cache.add(3, 'third', 'hash')
+
+    assert cache.contains(1, 'first', 'hash')
+    assert not cache.contains(2, 'second', 'hash')
+    assert not cache.contains(1, 'first', 'changed-hash')
+
+
+@pytest.mark.django_db
+def test_cached_login_skips_hashing(api_client, regular_user, monkeypatch):
+    monkeypatch.setattr(hashing, '_verification_cache', VerificationCache(ttl=60, max_size=10))
+    data = {'email': regular_user.email, 'password': 'testpass123'}
+    api_client.post(reverse('users:user-login'), data)
+
+    pool = PasswordHashingPool(max_workers=0, queue_size=0)
+    pool._slots.acquire()
+    monkeypatch.setattr(hashing, '_pool', pool)
+    response = api_client.post(reverse('users:user-login'), data)
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db(transaction=True)
+def test_outdated_hash_is_upgraded(regular_user, settings, monkeypatch):
+    monkeypatch.setattr(hashing, '_pool', PasswordHashingPool(max_workers=0, queue_size=1))
+    settings.BCRYPT_ROUNDS = 4
+
+    assert schedule_rehash(regular_user, 'testpass123').result()
+
+    regular_user.refresh_from_db()
+    assert identify_hasher(regular_user.password).decode(regular_user.password)['work_factor'] == 4
+    assert regular_user.check_password('testpass123')
+    assert schedule_rehash(regular_user, 'testpass123') is None
+
+
+@pytest.mark.django_db
+def test_rehash_is_queued_once_per_user_and_bounded(regular_user, settings, monkeypatch):
+    other_user = User.objects.create_user(email='other@example.com', username='other', password='testpass123')
+    third_user = User.objects.create_user(email='third@example.com', username='third', password='testpass123')
+    settings.BCRYPT_ROUNDS = 4
+    settings.PASSWORD_REHASH_QUEUE_SIZE = 2
+    release = threading.Event()
+    monkeypatch.setattr(hashing, '_rehash_password', lambda *args: release.wait(5))
+    monkeypatch.setattr(hashing, '_rehash_pending', set())
+
+    first = schedule_rehash(regular_user, 'testpass123')
+    duplicate = schedule_rehash(regular_user, 'testpass123')
+    second = schedule_rehash(other_user, 'testpass123')
+    over_limit = schedule_rehash(third_user, 'testpass123')
+    release.set()
+
+    assert first.result() and second.result()
+    assert duplicate is None and over_limit is None
+    assert schedule_rehash(regular_user, 'testpass123').result()
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from apps.users.metrics import MetricsRegistry, registry
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    registry.reset()
+
+
+def test_registry_sums_threads():
+    metrics = MetricsRegistry(buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            metrics.inc('jobs_total', (('kind', 'a'),))
+        metrics.observe('job_seconds', (), 0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    text = metrics.render()
+
+    assert 'jobs_total{kind="a"} 4000' in text
+    assert 'job_seconds_bucket{le="0.1"} 0' in text
+    assert 'job_seconds_bucket{le="1.0"} 4' in text
+    assert 'job_seconds_bucket{le="+Inf"} 4' in text
+    assert 'job_seconds_sum 2' in text
+    assert 'job_seconds_count 4' in text
+
+
+@pytest.mark.django_db
+def test_requests_are_recorded_per_url_name(api_client, user_session):
+    api_client.cookies['session_key'] = user_session.session_key
+
+    api_client.get(reverse('users:user-profile'))
+    api_client.get('/missing/')
+    counters, histograms = registry.collect()
+
+    labels = (('view', 'users:user-profile'), ('method', 'GET'))
+    assert counters[('http_requests_total', labels + (('status', 200),))] == 1
+    assert counters[('db_queries_total', labels)] >= 1
+    assert counters[('db_query_duration_seconds_total', labels)] > 0
+    assert histograms[('http_request_duration_seconds', labels)][-1] > 0
+    assert counters[('http_requests_total', (('view', 'unmatched'), ('method', 'GET'), ('status', 404)))] == 1
+
+
+@pytest.mark.django_db
+def test_session_cache_lookups_are_recorded(api_client, user_session, session_store):
+    api_client.cookies['session_key'] = user_session.session_key
+
+    api_client.get(reverse('users:user-profile'))
+    api_client.get(reverse('users:user-profile'))
+    counters, _ = registry.collect()
+
+    assert counters[('cache_lookups_total', (('cache', 'session'), ('result', 'miss')))] == 1
+    assert counters[('cache_lookups_total', (('cache', 'session'), ('result', 'hit')))] == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('session, status_result', [
+    ('admin_session', status.HTTP_200_OK),
+    ('user_session', status.HTTP_403_FORBIDDEN),
+])
+def test_metrics_endpoint_is_admin_only(request, api_client, session, status_result):
+    api_client.cookies['session_key'] = request.getfixturevalue(session).session_key
+    api_client.get(reverse('users:user-profile'))
+
+    response = api_client.get(reverse('users:metrics'))
+
+    assert response.status_code == status_result
+    if response.status_code == status.HTTP_200_OK:
+        assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+        assert 'http_requests_total{view="users:user-profile",method="GET",status="200"} 1' in \
+            response.content.decode()
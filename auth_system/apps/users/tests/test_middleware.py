@@ -0,0 +1,61 @@
+import pytest
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from apps.users.middleware.admin_middleware import AdminAuthenticationMiddleware, AdminSessionMiddleware
+from apps.users.models import AccessRoleRule, BusinessElement, Role, User
+
+
+@pytest.mark.parametrize('path, has_session', [
+    ('/admin/login/', True),
+    ('/users/profile/', False),
+    ('/products/', False),
+])
+def test_django_session_stack_runs_only_for_admin(path, has_session):
+    seen = {}
+
+    def view(request):
+        seen['session'] = hasattr(request, 'session')
+        seen['user'] = hasattr(request, 'user')
+        return HttpResponse()
+
+    middleware = AdminSessionMiddleware(AdminAuthenticationMiddleware(view))
+    middleware(RequestFactory().get(path))
+
+    assert seen == {'session': has_session, 'user': has_session}
+
+
+@pytest.mark.django_db
+def test_admin_site_works(client):
+    admin = User.objects.create_superuser(email='admin@example.com', username='admin', password='adminpass123',
+                                          first_name='Admin', last_name='Admin')
+    client.force_login(admin)
+
+    response = client.get('/admin/')
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_admin_access_rule_changelist_queries_do_not_grow_with_rules(client):
+    admin = User.objects.create_superuser(email='admin@example.com', username='admin', password='adminpass123',
+                                          first_name='Admin', last_name='Admin')
+    client.force_login(admin)
+    url = reverse('admin:users_accessrolerule_changelist')
+    role = Role.objects.get(name='Пользователь')
+
+    counts = []
+    for rules in (1, 20):
+        AccessRoleRule.objects.bulk_create([
+            AccessRoleRule(role=role, element=BusinessElement.objects.create(name=f'Element {rules}-{i}'))
+            for i in range(rules)
+        ])
+        with CaptureQueriesContext(connection) as queries:
+            assert client.get(url).status_code == status.HTTP_200_OK
+        counts.append(len(queries))
+
+    assert counts[0] == counts[1]
@@ -0,0 +1,157 @@
+import warnings
+
+import pytest
+from django.test import RequestFactory
+from django.urls import URLPattern, resolve, reverse
+from rest_framework import status
+
+from apps.resources import urls as resources_urls
+from apps.resources.models import Product
+from apps.users import urls as users_urls
+from apps.users.middleware.query_budget_middleware import QueryBudgetMiddleware
+from apps.users.models import AccessRoleRule, BusinessElement, Role, Session, User
+from apps.users.query_budget import QueryBudgetWarning, find_repeated_queries
+from apps.users.rbac import get_permission_matrix
+
+PASSWORD = 'testpass123'
+
+
+def _rule_fields(rule: AccessRoleRule) -> dict:
+    return {'role': rule.role_id, 'element': rule.element_id, 'read_permission': True}
+
+
+# (URL name, method, caller, URL kwargs, request data); the caller is 'admin', 'user' or None for anonymous.
+CASES = [
+    ('users:user-register', 'post', None, None, lambda data: {
+        'email': 'new@example.com', 'username': 'new', 'password': PASSWORD, 'password_repeat': PASSWORD,
+        'first_name': 'New', 'last_name': 'User',
+    }),
+    ('users:user-login', 'post', None, None, lambda data: {'email': data['user'].email, 'password': PASSWORD}),
+    ('users:user-logout', 'post', 'user', None, None),
+    ('users:token-refresh', 'post', None, None, lambda data: {'refresh_token': data['user_session'].session_key}),
+    ('users:user-profile', 'get', 'user', None, None),
+    ('users:user-profile', 'patch', 'user', None, lambda data: {'first_name': 'Ivan'}),
+    ('users:user-profile', 'delete', 'user', None, None),
+    ('users:user-permissions', 'get', 'user', None, None),
+    ('users:permissions-check', 'post', 'user', None, lambda data: {'checks': [
+        {'element': 'Товары', 'action': action, 'owner_id': data['user'].id} for action in ('read', 'delete')
+    ]}),
+    ('users:metrics', 'get', 'admin', None, None),
+    ('users:access_rule_list', 'get', 'admin', None, None),
+    ('users:access_rule_bulk', 'put', 'admin', None, lambda data: {
+        'rules': [_rule_fields(rule) for rule in data['rules']],
+    }),
+    ('users:access_rule_detail', 'get', 'admin', lambda data: {'pk': data['rules'][0].pk}, None),
+    ('users:access_rule_detail', 'patch', 'admin', lambda data: {'pk': data['rules'][0].pk},
+     lambda data: {'read_permission': True}),
+    ('users:access_rule_detail', 'delete', 'admin', lambda data: {'pk': data['rules'][-1].pk}, None),
+    ('resources:products', 'get', 'user', None, None),
+    ('resources:products', 'post', 'user', None, lambda data: {'name': 'Pear'}),
+    ('resources:product-detail', 'get', 'user', lambda data: {'pk': data['products'][0].pk}, None),
+    ('resources:product-detail', 'patch', 'user', lambda data: {'pk': data['products'][0].pk},
+     lambda data: {'name': 'Plum'}),
+    ('resources:product-detail', 'delete', 'user', lambda data: {'pk': data['products'][0].pk}, None),
+]
+
+
+@pytest.fixture
+def budget_data(admin_user, regular_user):
+    user_role, admin_role = Role.objects.get(name='Пользователь'), Role.objects.get(name='Администратор')
+    regular_user.role = user_role
+    regular_user.save()
+
+    flags = ('read', 'create', 'update', 'delete')
+    rules = []
+    for name in ['Товары', 'Заказы', 'Магазины', 'Отчёты']:
+        element = BusinessElement.objects.create(name=name)
+        rules.append(AccessRoleRule.objects.create(
+            role=user_role, element=element, **{f'{flag}_permission': True for flag in flags}
+        ))
+        rules.append(AccessRoleRule.objects.create(
+            role=admin_role, element=element, **{f'{flag}_permission': True for flag in flags},
+            **{f'{flag}_all_permission': True for flag in ('read', 'update', 'delete')}
+        ))
+
+    products = Product.objects.bulk_create(
+        [Product(name=f'Product {i}', owner=owner) for i in range(5) for owner in (regular_user, admin_user)]
+    )
+    return {
+        'user': regular_user,
+        'admin': admin_user,
+        'user_session': Session.create_session(regular_user),
+        'admin_session': Session.create_session(admin_user),
+        'rules': rules,
+        'products': [product for product in products if product.owner_id == regular_user.id],
+    }
+
+
+def _url_patterns() -> list[tuple[str, URLPattern]]:
+    return [
+        (f'{module.app_name}:{pattern.name}', pattern)
+        for module in (users_urls, resources_urls)
+        for pattern in module.urlpatterns if isinstance(pattern, URLPattern)
+    ]
+
+
+def test_every_url_has_a_budget_case():
+    missing = {name for name, _ in _url_patterns()} - {name for name, *_ in CASES}
+
+    assert not missing, f'Add a query budget case for {sorted(missing)}.'
+
+
+def test_class_based_views_declare_a_budget():
+    missing = [
+        name for name, pattern in _url_patterns()
+        if hasattr(pattern.callback, 'view_class') and getattr(pattern.callback.view_class, 'max_queries', None) is None
+    ]
+
+    assert not missing, f'Set max_queries on the views of {missing}.'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name, method, caller, url_kwargs, payload', CASES,
+                         ids=[f'{name}-{method}' for name, method, *_ in CASES])
+def test_query_budget(api_client, budget_data, assert_query_budget, name, method, caller, url_kwargs, payload):
+    url = reverse(name, kwargs=url_kwargs(budget_data) if url_kwargs else None)
+    if caller:
+        api_client.cookies['session_key'] = budget_data[f'{caller}_session'].session_key
+    # Budgets describe the steady state, with the permission matrix already built.
+    get_permission_matrix()
+
+    with assert_query_budget(method.upper(), url):
+        response = getattr(api_client, method)(url, payload(budget_data) if payload else None, format='json')
+
+    assert response.status_code < status.HTTP_400_BAD_REQUEST, response.content
+
+
+def test_repeated_queries_are_reported():
+    queries = [('SELECT * FROM role WHERE id = %s', (i,)) for i in range(3)]
+    queries.append(('SELECT 1', ()))
+
+    assert find_repeated_queries(queries) == [('SELECT * FROM role WHERE id = %s', 3)]
+    assert find_repeated_queries(queries[:2]) == []
+    assert find_repeated_queries([('SELECT 1', ())] * 5) == []
+
+
+@pytest.mark.django_db
+def test_middleware_warns_over_budget(settings, regular_user):
+    settings.QUERY_BUDGET_WARNINGS = True
+
+    def view(request):
+        for i in range(3):
+            User.objects.filter(pk=i).exists()
+
+    view.view_class = type('BudgetView', (), {'max_queries': 1})
+    request = RequestFactory().get('/users/profile/')
+    request.resolver_match = resolve('/users/profile/')
+    request.resolver_match.func = view
+    middleware = QueryBudgetMiddleware(view)
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        middleware(request)
+
+    messages = [str(warning.message) for warning in caught if warning.category is QueryBudgetWarning]
+    assert len(messages) == 2
+    assert 'ran 3 queries, the budget is 1' in messages[0]
+    assert 'ran the same query 3 times' in messages[1]
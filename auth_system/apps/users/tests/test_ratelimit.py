@@ -0,0 +1,210 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import fakeredis
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from rest_framework import status
+
+from apps.users import async_views, ratelimit
+from apps.users.models import User
+from apps.users.ratelimit import LocalRateLimitBackend, RedisRateLimitBackend, parse_rate
+
+
+def test_parse_rate():
+    assert parse_rate('5/m') == (5, 60)
+    assert parse_rate('100/hour') == (100, 3600)
+    assert parse_rate('1/s') == (1, 1)
+
+
+def test_local_backend_sliding_window():
+    backend = LocalRateLimitBackend()
+
+    assert backend.hit('key', 2, 60, 0) is None
+    assert backend.hit('key', 2, 60, 1) is None
+    assert backend.hit('key', 2, 60, 2) == 58
+    # Half of the previous window still counts: 3 * 0.5 + 1.
+    assert backend.hit('key', 2, 60, 90) == 10
+    assert backend.hit('other', 2, 60, 90) is None
+    assert backend.hit('key', 2, 60, 180) is None
+
+
+def test_local_backend_evicts_least_recently_used_keys():
+    backend = LocalRateLimitBackend(max_keys=2)
+    backend.hit('a', 1, 60, 0)
+    backend.hit('b', 1, 60, 0)
+    backend.hit('a', 1, 60, 0)
+
+    backend.hit('c', 1, 60, 0)
+
+    assert list(backend._counters) == ['a', 'c']
+
+
+def test_redis_backend_sliding_window():
+    client = fakeredis.FakeRedis()
+    backend = RedisRateLimitBackend(client)
+
+    assert backend.hit('key', 2, 60, 0) is None
+    assert backend.hit('key', 2, 60, 1) is None
+    assert backend.hit('key', 2, 60, 2) == 58
+    assert backend.hit('key', 2, 60, 90) == 10
+    assert 0 < client.ttl('ratelimit:key:1') <= 120
+
+
+@pytest.mark.parametrize('backend', [LocalRateLimitBackend(), RedisRateLimitBackend(fakeredis.FakeRedis())],
+                         ids=['local', 'redis'])
+def test_backend_clears_a_key(backend):
+    backend.hit('clear', 1, 60, 0)
+    assert backend.hit('clear', 1, 60, 1) == 59
+
+    backend.clear('clear', 60, 1)
+
+    assert backend.hit('clear', 1, 60, 1) is None
+
+
+@pytest.mark.parametrize('backend', [LocalRateLimitBackend(), RedisRateLimitBackend(fakeredis.FakeRedis())],
+                         ids=['local', 'redis'])
+def test_concurrent_attempts_cannot_pass_before_being_counted(backend, settings, monkeypatch):
+    settings.RATE_LIMITS = {'users:user-login': {'email': '3/m'}}
+    monkeypatch.setattr(ratelimit, '_backend', backend)
+    barrier = threading.Barrier(10)
+
+    def attempt():
+        barrier.wait()
+        return ratelimit.check_rate_limits('users:user-login', {'email': 'victim@example.com'})
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        waits = list(executor.map(lambda _: attempt(), range(10)))
+
+    assert waits.count(None) == 3
+
+
+def test_redis_backend_allows_requests_when_unavailable():
+    server = fakeredis.FakeServer()
+    server.connected = False
+    backend = RedisRateLimitBackend(fakeredis.FakeRedis(server=server))
+
+    assert all(backend.hit('key', 1, 60, 0) is None for _ in range(3))
+
+
+@pytest.mark.django_db
+def test_login_is_limited_by_email(api_client, regular_user, settings, django_assert_num_queries):
+    settings.RATE_LIMITS = {'users:user-login': {'email': '2/m'}}
+    url = reverse('users:user-login')
+    for _ in range(2):
+        response = api_client.post(url, {'email': regular_user.email, 'password': 'wrongpass'})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    with django_assert_num_queries(0):
+        response = api_client.post(url, {'email': regular_user.email.upper(), 'password': 'testpass123'})
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert 0 < int(response['Retry-After']) <= 60
+    response = api_client.post(url, {'email': 'other@example.com', 'password': 'testpass123'})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_successful_logins_do_not_lock_the_email(api_client, regular_user, settings):
+    settings.RATE_LIMITS = {'users:user-login': {'email': '2/m'}}
+    url, data = reverse('users:user-login'), {'email': regular_user.email, 'password': 'testpass123'}
+
+    responses = [api_client.post(url, data) for _ in range(3)]
+
+    assert [response.status_code for response in responses] == [status.HTTP_200_OK] * 3
+
+
+@pytest.mark.django_db
+def test_successful_login_clears_failed_attempts(api_client, regular_user, settings):
+    settings.RATE_LIMITS = {'users:user-login': {'email': '2/m'}}
+    url = reverse('users:user-login')
+    valid, invalid = {'email': regular_user.email, 'password': 'testpass123'}, {'email': regular_user.email}
+
+    codes = [api_client.post(url, data).status_code for data in (invalid, valid, invalid, valid)]
+
+    assert codes == [status.HTTP_401_UNAUTHORIZED, status.HTTP_200_OK, status.HTTP_401_UNAUTHORIZED,
+                     status.HTTP_200_OK]
+
+
+@pytest.mark.django_db
+def test_forwarded_for_header_does_not_bypass_ip_limit(api_client, settings):
+    settings.RATE_LIMITS = {'users:user-login': {'ip': '2/m'}}
+    url = reverse('users:user-login')
+
+    codes = [
+        api_client.post(url, {'email': 'guess@example.com'}, HTTP_X_FORWARDED_FOR=f'10.0.0.{i}').status_code
+        for i in range(3)
+    ]
+
+    assert codes[-1] == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+@pytest.mark.django_db
+def test_ip_limit_behind_trusted_proxy(api_client, settings):
+    settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}
+    settings.RATE_LIMITS = {'users:user-login': {'ip': '1/m'}}
+    url = reverse('users:user-login')
+
+    first = api_client.post(url, {'email': 'guess@example.com'}, HTTP_X_FORWARDED_FOR='10.0.0.1')
+    other_client = api_client.post(url, {'email': 'guess@example.com'}, HTTP_X_FORWARDED_FOR='10.0.0.2')
+    repeated = api_client.post(url, {'email': 'guess@example.com'}, HTTP_X_FORWARDED_FOR='10.0.0.1')
+
+    assert first.status_code == other_client.status_code == status.HTTP_401_UNAUTHORIZED
+    assert repeated.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+@pytest.mark.django_db
+def test_login_is_limited_by_ip(api_client, regular_user, settings):
+    settings.RATE_LIMITS = {'users:user-login': {'ip': '2/m'}}
+    url = reverse('users:user-login')
+    for i in range(2):
+        api_client.post(url, {'email': f'guess{i}@example.com', 'password': 'testpass123'})
+
+    response = api_client.post(url, {'email': regular_user.email, 'password': 'testpass123'})
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    response = api_client.post(url, {'email': regular_user.email, 'password': 'testpass123'},
+                               REMOTE_ADDR='10.0.0.2')
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_registration_is_limited_by_ip(api_client, user_registration_data, settings):
+    settings.RATE_LIMITS = {'users:user-register': {'ip': '1/h'}}
+    url = reverse('users:user-register')
+    assert api_client.post(url, user_registration_data).status_code == status.HTTP_201_CREATED
+
+    response = api_client.post(url, {**user_registration_data, 'email': 'second@example.com'})
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert not User.objects.filter(email='second@example.com').exists()
+
+
+@pytest.mark.django_db
+def test_rate_limits_can_be_disabled(api_client, regular_user, settings):
+    settings.RATE_LIMIT_ENABLED = False
+    settings.RATE_LIMITS = {'users:user-login': {'email': '1/m'}}
+    data = {'email': regular_user.email, 'password': 'testpass123'}
+
+    responses = [api_client.post(reverse('users:user-login'), data) for _ in range(3)]
+
+    assert all(response.status_code == status.HTTP_200_OK for response in responses)
+    assert ratelimit.get_rate_limit_backend()._counters == {}
+
+
+@pytest.mark.django_db
+def test_async_login_is_limited(regular_user, settings):
+    settings.RATE_LIMITS = {'users:user-login': {'email': '1/m'}}
+    url = reverse('users:user-login')
+    responses = []
+    for _ in range(2):
+        request = RequestFactory().post(url, {'email': regular_user.email, 'password': 'wrongpass'},
+                                        content_type='application/json')
+        request.resolver_match = resolve(url)
+        responses.append(async_to_sync(async_views.login)(request))
+
+    assert responses[0].status_code == status.HTTP_401_UNAUTHORIZED
+    assert responses[1].status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert 'Retry-After' in responses[1]
@@ -0,0 +1,209 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from apps.users import rules_broadcast
+from apps.users import serializers as serializers_module
+from apps.users.models import AccessRoleRule, Role
+from apps.users.permissions import RoleBasedPermission
+from apps.users.rbac import Perm, get_permission_matrix, get_rules_version
+
+
+class _View:
+    business_element_name = 'Товары'
+
+
+class _Request:
+    method = 'GET'
+
+    def __init__(self, user):
+        self.user = user
+
+
+@pytest.mark.django_db
+def test_permission_matrix_holds_rule_bitmask(access_rule):
+    access_rule.read_permission = True
+    access_rule.update_all_permission = True
+    access_rule.save()
+
+    mask = get_permission_matrix().get(access_rule.role_id, access_rule.element.name)
+
+    assert mask == Perm.READ | Perm.UPDATE_ALL
+
+
+@pytest.mark.django_db
+def test_warm_permission_check_makes_no_queries(regular_user, access_rule, django_assert_num_queries):
+    access_rule.read_permission = True
+    access_rule.save()
+    regular_user.role = access_rule.role
+    regular_user.save()
+    get_permission_matrix()
+
+    with django_assert_num_queries(0):
+        allowed = RoleBasedPermission().has_permission(_Request(regular_user), _View())
+
+    assert allowed
+
+
+@pytest.mark.django_db
+def test_access_rule_update_rebuilds_matrix(api_client, admin_session, access_rule, commit_callbacks):
+    api_client.cookies['session_key'] = admin_session.session_key
+    assert not get_permission_matrix().get(access_rule.role_id, access_rule.element.name)
+    version = get_rules_version()
+
+    response = api_client.patch(reverse('users:access_rule_detail', args=[access_rule.id]),
+                                {'read_permission': True})
+    commit_callbacks()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert get_rules_version() > version
+    assert get_permission_matrix().get(access_rule.role_id, access_rule.element.name) == Perm.READ
+
+
+@pytest.mark.django_db
+def test_bulk_permission_check(api_client, regular_user, user_session, access_rule):
+    access_rule.read_permission = True
+    access_rule.update_permission = True
+    access_rule.delete_all_permission = True
+    access_rule.save()
+    regular_user.role = access_rule.role
+    regular_user.save()
+    api_client.cookies['session_key'] = user_session.session_key
+    checks = [
+        {'element': 'Товары', 'action': 'read'},
+        {'element': 'Товары', 'action': 'update', 'owner_id': regular_user.id},
+        {'element': 'Товары', 'action': 'update', 'owner_id': regular_user.id + 1},
+        {'element': 'Товары', 'action': 'delete', 'owner_id': regular_user.id + 1},
+        {'element': 'Товары', 'action': 'create'},
+        {'element': 'Магазины', 'action': 'read'},
+    ]
+
+    response = api_client.post(reverse('users:permissions-check'), {'checks': checks}, format='json')
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [result['allowed'] for result in response.data['results']] == [True, True, False, True, False, False]
+    assert response.data['results'][2]['owner_id'] == regular_user.id + 1
+
+
+@pytest.mark.django_db
+def test_bulk_permission_check_query_count(api_client, user_session, access_rule, django_assert_num_queries):
+    api_client.cookies['session_key'] = user_session.session_key
+    checks = [{'element': f'Element {i % 50}', 'action': 'read'} for i in range(1000)]
+    api_client.post(reverse('users:permissions-check'), {'checks': checks[:1]}, format='json')
+
+    # The session lookup only, the rules come from the cached matrix.
+    with django_assert_num_queries(1):
+        response = api_client.post(reverse('users:permissions-check'), {'checks': checks}, format='json')
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data['results']) == 1000
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('checks', [
+    [],
+    [{'element': 'Товары', 'action': 'approve'}],
+    [{'element': 'Товары', 'action': 'read'}] * 1001,
+])
+def test_bulk_permission_check_validation(api_client, user_session, checks):
+    api_client.cookies['session_key'] = user_session.session_key
+
+    response = api_client.post(reverse('users:permissions-check'), {'checks': checks}, format='json')
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_login_returns_permission_snapshot(api_client, regular_user, access_rule):
+    access_rule.read_permission = True
+    access_rule.create_permission = True
+    access_rule.save()
+    regular_user.role = access_rule.role
+    regular_user.save()
+
+    response = api_client.post(reverse('users:user-login'), {'email': regular_user.email, 'password': 'testpass123'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['permissions']['permissions'] == {'Товары': Perm.READ | Perm.CREATE}
+    assert response.data['permissions']['version']
+
+
+@pytest.mark.django_db
+def test_permission_snapshot_etag(api_client, regular_user, user_session, access_rule, django_assert_num_queries,
+                                  commit_callbacks):
+    regular_user.role = access_rule.role
+    regular_user.save()
+    api_client.cookies['session_key'] = user_session.session_key
+    url = reverse('users:user-permissions')
+
+    response = api_client.get(url)
+    etag = response['ETag']
+    assert response.data == {'version': etag.strip('"'), 'permissions': {'Товары': 0}}
+
+    # The session lookup only, the snapshot comes from the cached matrix.
+    with django_assert_num_queries(1):
+        not_modified = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not not_modified.content
+
+    access_rule.read_permission = True
+    access_rule.save()
+    commit_callbacks()
+    changed = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == status.HTTP_200_OK
+    assert changed['ETag'] != etag
+    assert changed.data['permissions'] == {'Товары': Perm.READ}
+
+
+@pytest.mark.django_db
+def test_bulk_access_rules_upsert(api_client, admin_session, access_rule, monkeypatch, commit_callbacks):
+    api_client.cookies['session_key'] = admin_session.session_key
+    roles = list(Role.objects.all())
+    rules = [
+        {'role': role.id, 'element': access_rule.element_id, 'read_permission': True, 'update_permission': True}
+        for role in roles
+    ]
+    changes = []
+    monkeypatch.setattr(serializers_module, 'record_rules_change',
+                        lambda: changes.append(rules_broadcast.record_rules_change()))
+    version = get_rules_version()
+
+    response = api_client.put(reverse('users:access_rule_bulk'), {'rules': rules}, format='json')
+    commit_callbacks()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {'count': len(roles)}
+    assert len(changes) == 1
+    assert get_rules_version() == version + 1
+    assert AccessRoleRule.objects.count() == len(roles)
+    access_rule.refresh_from_db()
+    assert access_rule.read_permission and access_rule.update_permission
+    assert get_permission_matrix().get(roles[0].id, access_rule.element.name) == Perm.READ | Perm.UPDATE
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('make_rules', [
+    lambda role, element: [{'role': role, 'element': element}, {'role': role, 'element': element}],
+    lambda role, element: [{'role': role + 1000, 'element': element}],
+    lambda role, element: [{'role': role, 'element': element + 1000}],
+    lambda role, element: [],
+])
+def test_bulk_access_rules_validation(api_client, admin_session, access_rule, make_rules):
+    api_client.cookies['session_key'] = admin_session.session_key
+    rules = make_rules(access_rule.role_id, access_rule.element_id)
+
+    response = api_client.put(reverse('users:access_rule_bulk'), {'rules': rules}, format='json')
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_bulk_access_rules_requires_admin(api_client, user_session, access_rule):
+    api_client.cookies['session_key'] = user_session.session_key
+    rules = [{'role': access_rule.role_id, 'element': access_rule.element_id, 'read_all_permission': True}]
+
+    response = api_client.put(reverse('users:access_rule_bulk'), {'rules': rules}, format='json')
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    access_rule.refresh_from_db()
+    assert not access_rule.read_all_permission
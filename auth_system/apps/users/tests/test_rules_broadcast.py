@@ -0,0 +1,96 @@
+import multiprocessing
+import threading
+import time
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.users import rules_broadcast
+from apps.users.models import AccessRoleRule, BusinessElement, Role, RulesVersion
+from apps.users.rbac import get_rules_version
+from apps.users.rules_broadcast import InMemoryBroker, RulesListener
+
+WORKERS = 4
+
+
+class _RecordingBroker:
+    def __init__(self):
+        self.messages = []
+
+    def publish(self, message):
+        self.messages.append(message)
+
+
+def _run_worker(subscription, results):
+    listener = RulesListener(
+        subscription=subscription,
+        on_change=lambda: results.put(time.time()),
+        version_source=None,
+    )
+    listener.start()
+    listener.join(timeout=10)
+
+
+@pytest.mark.django_db
+def test_rule_changes_bump_the_version_once_after_commit(monkeypatch, django_capture_on_commit_callbacks):
+    broker = _RecordingBroker()
+    monkeypatch.setattr(rules_broadcast, '_broker', broker)
+
+    local_version = get_rules_version()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        element = BusinessElement.objects.create(name='Заказы')
+        rule = AccessRoleRule.objects.create(role=Role.objects.first(), element=element)
+        rule.read_permission = True
+        rule.save()
+        assert broker.messages == []
+        # Uncommitted rows must not be compiled into a matrix under a new version.
+        assert get_rules_version() == local_version
+
+    assert broker.messages == [str(RulesVersion.objects.get().version)]
+    assert RulesVersion.objects.get().version == 1
+    assert get_rules_version() == local_version + 1
+
+
+@pytest.mark.django_db
+def test_cascade_delete_updates_the_version_once(commit_callbacks):
+    element = BusinessElement.objects.create(name='Заказы')
+    AccessRoleRule.objects.bulk_create([AccessRoleRule(role=role, element=element) for role in Role.objects.all()])
+    commit_callbacks()
+
+    with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+        element.delete()
+
+    version_updates = [query for query in queries if RulesVersion._meta.db_table in query['sql']]
+    assert len(version_updates) == 1
+
+
+def test_listener_falls_back_to_polling():
+    versions = iter(range(100))
+    changed = threading.Event()
+    listener = RulesListener(on_change=changed.set, version_source=lambda: next(versions), poll_interval=0.01)
+    listener.last_version = 0
+
+    listener.start()
+
+    assert changed.wait(timeout=2)
+    listener.stop()
+
+
+def test_rule_change_reaches_every_worker():
+    context = multiprocessing.get_context('fork')
+    broker = InMemoryBroker(context)
+    results = context.Queue()
+    workers = [context.Process(target=_run_worker, args=(broker.subscribe(), results), daemon=True)
+               for _ in range(WORKERS)]
+    for worker in workers:
+        worker.start()
+
+    published_at = time.time()
+    broker.publish('1')
+    delays = [results.get(timeout=5) - published_at for _ in range(WORKERS)]
+
+    for worker in workers:
+        worker.terminate()
+    assert max(delays) < 1
@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+import pytest
+from django.db import DatabaseError, connection, transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from apps.users import session_flusher
+from apps.users.models import Session
+from apps.users.session_flusher import SessionWriteBuffer
+
+
+@pytest.fixture
+def write_buffer(monkeypatch):
+    buffer = SessionWriteBuffer(bucket=60)
+    monkeypatch.setattr(session_flusher, '_buffer', buffer)
+    return buffer
+
+
+@pytest.fixture
+def sliding_expiry(settings):
+    settings.SESSION_SLIDING_EXPIRY = True
+    settings.SESSION_LIFETIME = 3600
+    settings.SESSION_REFRESH_FRACTION = 0.5
+
+
+@pytest.mark.django_db
+def test_extensions_are_coalesced_into_one_update(regular_user, write_buffer, django_assert_num_queries):
+    now = timezone.now()
+    sessions = Session.objects.bulk_create([
+        Session(user=regular_user, session_key=f'key-{i}', expire_at=now + timedelta(minutes=5)) for i in range(5)
+    ])
+    new_expire_at = now.replace(second=0, microsecond=0) + timedelta(hours=1)
+    for i, session in enumerate(sessions):
+        write_buffer.extend(session.id, new_expire_at + timedelta(seconds=i + 1))
+        write_buffer.extend(session.id, new_expire_at)
+
+    with django_assert_num_queries(1):
+        assert write_buffer.flush() == 5
+
+    expire_at = set(Session.objects.values_list('expire_at', flat=True))
+    assert expire_at == {new_expire_at + timedelta(minutes=1)}
+
+
+@pytest.mark.django_db
+def test_failed_flush_keeps_the_writes(user_session, write_buffer):
+    other_session = Session.create_session(user_session.user)
+    expire_at = other_session.expire_at.replace(second=0, microsecond=0) + timedelta(hours=1)
+    write_buffer.deactivate(user_session.id)
+    write_buffer.extend(other_session.id, expire_at)
+
+    def fail(execute, sql, params, many, context):
+        # A request extends the session again while the flush is running.
+        write_buffer.extend(other_session.id, expire_at + timedelta(hours=1))
+        raise DatabaseError('connection lost')
+
+    with pytest.raises(DatabaseError), transaction.atomic(), connection.execute_wrapper(fail):
+        write_buffer.flush()
+
+    assert write_buffer.pending() == 2
+    assert write_buffer.flush() == 2
+    user_session.refresh_from_db()
+    other_session.refresh_from_db()
+    assert not user_session.is_active
+    assert other_session.expire_at == expire_at + timedelta(hours=1)
+
+
+@pytest.mark.django_db
+def test_extension_never_shortens_a_session(user_session, write_buffer):
+    original = user_session.expire_at
+    write_buffer.extend(user_session.id, timezone.now())
+
+    assert write_buffer.flush() == 0
+    user_session.refresh_from_db()
+    assert user_session.expire_at == original
+
+
+@pytest.mark.django_db
+def test_session_is_not_extended_without_sliding_expiry(api_client, user_session, write_buffer):
+    Session.objects.filter(pk=user_session.pk).update(expire_at=timezone.now() + timedelta(minutes=5))
+    api_client.cookies['session_key'] = user_session.session_key
+
+    response = api_client.get(reverse('users:user-profile'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert 'session_key' not in response.cookies
+    assert not write_buffer.pending()
+
+
+@pytest.mark.django_db
+def test_fresh_session_is_not_extended(api_client, user_session, write_buffer, sliding_expiry):
+    api_client.cookies['session_key'] = user_session.session_key
+
+    response = api_client.get(reverse('users:user-profile'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert 'session_key' not in response.cookies
+    assert not write_buffer.pending()
+
+
+@pytest.mark.django_db
+def test_session_close_to_expiry_is_extended(api_client, user_session, write_buffer, sliding_expiry):
+    Session.objects.filter(pk=user_session.pk).update(expire_at=timezone.now() + timedelta(minutes=5))
+    api_client.cookies['session_key'] = user_session.session_key
+
+    response = api_client.get(reverse('users:user-profile'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.cookies['session_key'].value == user_session.session_key
+    assert write_buffer.pending() == 1
+
+    write_buffer.flush()
+    user_session.refresh_from_db()
+    assert user_session.expire_at >= timezone.now() + timedelta(minutes=59)
@@ -0,0 +1,46 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.users.models import Session
+from apps.users.session_reaper import purge_sessions
+
+
+@pytest.fixture
+def stale_sessions(regular_user):
+    now = timezone.now()
+    expired = [Session(user=regular_user, session_key=f'expired-{i}', expire_at=now - timedelta(minutes=1))
+               for i in range(15)]
+    inactive = [Session(user=regular_user, session_key=f'inactive-{i}', expire_at=now + timedelta(hours=1),
+                        is_active=False) for i in range(10)]
+    Session.objects.bulk_create(expired + inactive)
+
+
+@pytest.mark.django_db
+def test_purge_deletes_only_stale_sessions(user_session, stale_sessions):
+    stats = purge_sessions(batch_size=10)
+
+    assert stats.deleted == 25
+    assert stats.batches == 3
+    assert list(Session.objects.values_list('id', flat=True)) == [user_session.id]
+
+
+@pytest.mark.django_db
+def test_purge_stops_after_max_batches(stale_sessions):
+    stats = purge_sessions(batch_size=10, max_batches=1)
+
+    assert stats.deleted == 10
+    assert Session.objects.count() == 15
+
+
+@pytest.mark.django_db
+def test_purge_sessions_command(user_session, stale_sessions):
+    out = StringIO()
+
+    call_command('purge_sessions', batch_size=20, stdout=out)
+
+    assert 'Deleted 25 sessions in 2 batches' in out.getvalue()
+    assert Session.objects.count() == 1
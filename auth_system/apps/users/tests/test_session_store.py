@@ -0,0 +1,86 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from apps.users.models import User
+from apps.users.session_store import SESSION_KEY_PREFIX
+
+
+@pytest.mark.django_db
+def test_session_is_cached_after_first_request(api_client, user_session, session_store):
+    api_client.cookies['session_key'] = user_session.session_key
+
+    api_client.get(reverse('users:user-profile'))
+
+    cached = session_store.get(user_session.session_key)
+    assert cached is not None
+    assert cached.user_id == user_session.user_id
+    assert 0 < session_store.client.ttl(SESSION_KEY_PREFIX + user_session.session_key) <= 3600
+
+
+@pytest.mark.django_db
+def test_cached_session_skips_session_query(api_client, user_session, session_store,
+                                            django_assert_num_queries):
+    api_client.cookies['session_key'] = user_session.session_key
+    api_client.get(reverse('users:user-profile'))
+
+    with django_assert_num_queries(1):
+        response = api_client.get(reverse('users:user-profile'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['email'] == user_session.user.email
+
+
+@pytest.mark.django_db
+def test_logout_invalidates_cached_session(api_client, user_session, session_store):
+    api_client.cookies['session_key'] = user_session.session_key
+    api_client.get(reverse('users:user-profile'))
+
+    api_client.post(reverse('users:user-logout'))
+
+    assert session_store.get(user_session.session_key) is None
+    api_client.cookies['session_key'] = user_session.session_key
+    response = api_client.get(reverse('users:user-profile'))
+    assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
+
+
+@pytest.mark.django_db
+def test_login_invalidates_previous_sessions(api_client, regular_user, user_session, session_store):
+    api_client.cookies['session_key'] = user_session.session_key
+    api_client.get(reverse('users:user-profile'))
+
+    api_client.post(reverse('users:user-login'), {'email': regular_user.email, 'password': 'testpass123'})
+
+    assert session_store.get(user_session.session_key) is None
+
+
+@pytest.mark.django_db
+def test_profile_delete_invalidates_cached_session(api_client, user_session, session_store):
+    api_client.cookies['session_key'] = user_session.session_key
+    api_client.get(reverse('users:user-profile'))
+
+    api_client.delete(reverse('users:user-profile'))
+
+    assert session_store.get(user_session.session_key) is None
+
+
+@pytest.mark.django_db
+def test_bulk_deactivation_invalidates_cached_session(api_client, user_session, session_store):
+    api_client.cookies['session_key'] = user_session.session_key
+    api_client.get(reverse('users:user-profile'))
+
+    User.objects.filter(pk=user_session.user_id).update(is_active=False)
+
+    assert session_store.get(user_session.session_key) is None
+    response = api_client.get(reverse('users:user-profile'))
+    assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
+
+
+@pytest.mark.django_db
+def test_unrelated_bulk_update_keeps_cached_session(user_session, session_store, django_assert_num_queries):
+    session_store.client.sadd(f'session:user:{user_session.user_id}', user_session.session_key)
+
+    with django_assert_num_queries(1):
+        User.objects.filter(pk=user_session.user_id).update(first_name='Renamed')
+
+    assert session_store.client.exists(f'session:user:{user_session.user_id}')
@@ -0,0 +1,141 @@
+import fakeredis
+import jwt
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+
+from apps.users import session_store as session_store_module
+from apps.users import tokens
+from apps.users.authentication import JWTAuthentication
+from apps.users.session_store import SessionStore
+from apps.users.tokens import TokenDenylist, check_auth_mode, get_denylist
+
+
+@pytest.fixture(autouse=True)
+def jwt_mode(settings, monkeypatch):
+    settings.AUTH_MODE = 'jwt'
+    monkeypatch.setattr(tokens, '_denylist', TokenDenylist(fakeredis.FakeRedis()))
+
+
+@pytest.fixture
+def login_data(api_client, regular_user):
+    response = api_client.post(reverse('users:user-login'), {'email': regular_user.email, 'password': 'testpass123'})
+    assert response.status_code == status.HTTP_200_OK
+    return response.data
+
+
+@pytest.mark.django_db
+def test_login_issues_tokens(api_client, regular_user, login_data):
+    assert 'session_key' not in login_data
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {login_data["access_token"]}')
+
+    response = api_client.get(reverse('users:user-profile'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['email'] == regular_user.email
+
+
+@pytest.mark.django_db
+def test_access_token_is_verified_without_queries(regular_user, login_data, django_assert_num_queries):
+    request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {login_data["access_token"]}')
+
+    with django_assert_num_queries(0):
+        user, session = JWTAuthentication().authenticate(request)
+
+    assert user.id == regular_user.id
+    assert user.role_id == regular_user.role_id
+
+
+@pytest.mark.django_db
+def test_forged_access_token_is_rejected(api_client, login_data):
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {login_data["access_token"]}x')
+
+    response = api_client.get(reverse('users:user-profile'))
+
+    assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
+
+
+@pytest.mark.django_db
+def test_logout_revokes_access_token(api_client, login_data):
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {login_data["access_token"]}')
+
+    api_client.post(reverse('users:user-logout'))
+    response = api_client.get(reverse('users:user-profile'))
+
+    assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
+    refresh = api_client.post(reverse('users:token-refresh'), {'refresh_token': login_data['refresh_token']})
+    assert refresh.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_logout_invalidates_cached_refresh_token(api_client, session_store, login_data):
+    refresh_url, refresh_data = reverse('users:token-refresh'), {'refresh_token': login_data['refresh_token']}
+    assert api_client.post(refresh_url, refresh_data).status_code == status.HTTP_200_OK
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {login_data["access_token"]}')
+
+    api_client.post(reverse('users:user-logout'))
+
+    assert session_store.get(login_data['refresh_token']) is None
+    assert api_client.post(refresh_url, refresh_data).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_refresh_reads_only_the_session(api_client, login_data, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        response = api_client.post(reverse('users:token-refresh'), {'refresh_token': login_data['refresh_token']})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert set(jwt.decode(response.data['access_token'], options={'verify_signature': False})) == {
+        'sub', 'role', 'sid', 'iat', 'exp',
+    }
+
+
+@pytest.mark.django_db
+def test_refresh_issues_new_access_token(api_client, login_data):
+    response = api_client.post(reverse('users:token-refresh'), {'refresh_token': login_data['refresh_token']})
+
+    assert response.status_code == status.HTTP_200_OK
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access_token"]}')
+    assert api_client.get(reverse('users:user-profile')).status_code == status.HTTP_200_OK
+
+
+def test_revocation_is_shared_between_workers():
+    server = fakeredis.FakeServer()
+    worker = TokenDenylist(fakeredis.FakeRedis(server=server))
+    other_worker = TokenDenylist(fakeredis.FakeRedis(server=server))
+
+    worker.revoke([1])
+
+    assert other_worker.is_revoked(1)
+    assert not other_worker.is_revoked(2)
+
+
+def test_jwt_mode_requires_redis(monkeypatch):
+    monkeypatch.setattr(session_store_module, '_store', SessionStore())
+    monkeypatch.setattr(tokens, '_denylist', None)
+
+    with pytest.raises(ImproperlyConfigured):
+        check_auth_mode()
+    with pytest.raises(ImproperlyConfigured):
+        get_denylist()
+
+
+@pytest.mark.django_db
+def test_refresh_token_is_not_accepted_as_cookie(api_client, login_data):
+    api_client.cookies['session_key'] = login_data['refresh_token']
+
+    response = api_client.get(reverse('users:user-profile'))
+
+    assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
+
+
+@pytest.mark.django_db
+def test_access_token_is_ignored_in_session_mode(api_client, login_data, settings):
+    settings.AUTH_MODE = 'session'
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {login_data["access_token"]}')
+
+    response = api_client.get(reverse('users:user-profile'))
+
+    assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
@@ -1,7 +1,17 @@
+import json
+import threading
+from datetime import timedelta
+
 import pytest
+from django.db import connection
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
-from apps.users.models import User, AccessRoleRule, Role
+from apps.users.models import User, AccessRoleRule, BusinessElement, Role
+from apps.users.session_flusher import get_write_buffer
+from apps.users.sessions import start_session
+
+requires_postgresql = pytest.mark.skipif(connection.vendor != 'postgresql', reason='Needs PostgreSQL row locks.')
 
 
 @pytest.mark.django_db
@@ -32,6 +42,60 @@ def test_user_login(api_client, regular_user):
     assert 'session_key' in response.cookies
 
 
+@pytest.mark.django_db
+@pytest.mark.parametrize('max_concurrent, active', [(1, 1), (2, 2), (0, 3)])
+def test_login_keeps_max_concurrent_sessions(api_client, regular_user, settings, max_concurrent, active):
+    settings.SESSION_MAX_CONCURRENT = max_concurrent
+    data = {'email': regular_user.email, 'password': 'testpass123'}
+
+    keys = [api_client.post(reverse('users:user-login'), data).cookies['session_key'].value for _ in range(3)]
+
+    sessions = regular_user.sessions.filter(is_active=True)
+    assert sessions.count() == active
+    # The sessions that expire first are deactivated.
+    assert set(sessions.values_list('session_key', flat=True)) == set(keys[-active:])
+
+
+@requires_postgresql
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('max_concurrent', [1, 2])
+def test_concurrent_logins_keep_max_concurrent_sessions(regular_user, settings, max_concurrent):
+    settings.SESSION_MAX_CONCURRENT = max_concurrent
+    threads, barrier, errors = 8, threading.Barrier(8), []
+
+    def login():
+        try:
+            barrier.wait()
+            for _ in range(5):
+                start_session(regular_user)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    workers = [threading.Thread(target=login) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert not errors
+    assert regular_user.sessions.filter(is_active=True).count() == max_concurrent
+
+
+@pytest.mark.django_db
+def test_login_evicts_cached_sessions(api_client, regular_user, user_session, session_store):
+    api_client.cookies['session_key'] = user_session.session_key
+    api_client.get(reverse('users:user-profile'))
+    assert session_store.get(user_session.session_key) is not None
+
+    api_client.post(reverse('users:user-login'), {'email': regular_user.email, 'password': 'testpass123'})
+
+    assert session_store.get(user_session.session_key) is None
+    user_session.refresh_from_db()
+    assert not user_session.is_active
+
+
 @pytest.mark.django_db
 def test_user_login_invalid_credentials(api_client):
     data = {'email': 'wrong@gmail.com', 'password': 'wrongpass'}
@@ -105,11 +169,22 @@ def test_list_access_rules(api_client, admin_user, access_rule, admin_session, r
     assert response.status_code == status_result
 
     if response.status_code == status.HTTP_200_OK:
-        assert len(response.data) == AccessRoleRule.objects.count()
+        assert len(response.data['results']) == AccessRoleRule.objects.count()
     else:
         assert 'У вас недостаточно прав для выполнения данного действия.' in response.data['detail']
 
 
+@pytest.mark.django_db
+def test_stream_access_rules(api_client, admin_session, access_rule):
+    api_client.cookies['session_key'] = admin_session.session_key
+
+    response = api_client.get(reverse('users:access_rule_list'), {'stream': '1'})
+
+    assert response.status_code == status.HTTP_200_OK
+    data = json.loads(b''.join(response.streaming_content))
+    assert [rule['id'] for rule in data] == list(AccessRoleRule.objects.values_list('id', flat=True))
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize('role, status_result', [
     ('Администратор', status.HTTP_200_OK),
@@ -150,3 +225,165 @@ def test_access_rule_detail_delete(api_client, admin_user, access_rule, admin_se
         assert not AccessRoleRule.objects.filter(id=access_rule.id).exists()
     else:
         assert 'У вас недостаточно прав для выполнения данного действия.' in response.data['detail']
+
+
+@pytest.mark.django_db
+def test_expired_session_is_rejected_without_writes(api_client, user_session, django_assert_num_queries):
+    user_session.expire_at = timezone.now() - timedelta(minutes=1)
+    user_session.save()
+    api_client.cookies['session_key'] = user_session.session_key
+
+    with django_assert_num_queries(1):
+        response = api_client.get(reverse('users:user-profile'))
+
+    assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
+    user_session.refresh_from_db()
+    assert user_session.is_active
+    assert response.cookies['session_key'].value == ''
+
+
+@pytest.mark.django_db
+def test_unknown_session_cookie_is_dropped(api_client):
+    api_client.cookies['session_key'] = 'unknown'
+
+    response = api_client.get(reverse('users:user-profile'))
+
+    assert response.cookies['session_key'].value == ''
+
+
+@pytest.mark.django_db
+def test_inactive_user_session_is_deactivated_in_background(api_client, regular_user, user_session):
+    User.objects.filter(pk=regular_user.pk).update(is_active=False)
+    api_client.cookies['session_key'] = user_session.session_key
+
+    response = api_client.get(reverse('users:user-profile'))
+
+    assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
+    user_session.refresh_from_db()
+    assert user_session.is_active
+
+    assert get_write_buffer().flush() == 1
+    user_session.refresh_from_db()
+    assert not user_session.is_active
+
+
+@pytest.mark.django_db
+def test_profile_not_modified(api_client, user_session, django_assert_num_queries):
+    api_client.cookies['session_key'] = user_session.session_key
+    url = reverse('users:user-profile')
+    response = api_client.get(url)
+    etag = response['ETag']
+
+    # The session lookup and the updated_at lookup.
+    with django_assert_num_queries(2):
+        not_modified = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not_modified['ETag'] == etag
+    assert len(not_modified.content) == 0 < len(response.content)
+
+
+@pytest.mark.django_db
+def test_profile_if_match(api_client, regular_user, user_session):
+    api_client.cookies['session_key'] = user_session.session_key
+    url = reverse('users:user-profile')
+    etag = api_client.get(url)['ETag']
+
+    updated = api_client.patch(url, {'first_name': 'Ivan'}, HTTP_IF_MATCH=etag)
+    stale = api_client.patch(url, {'first_name': 'Petr'}, HTTP_IF_MATCH=etag)
+
+    assert updated.status_code == status.HTTP_200_OK
+    assert updated['ETag'] != etag
+    assert stale.status_code == status.HTTP_412_PRECONDITION_FAILED
+    regular_user.refresh_from_db()
+    assert regular_user.first_name == 'Ivan'
+
+
+@pytest.mark.django_db
+def test_access_rule_etag(api_client, admin_session, access_rule):
+    api_client.cookies['session_key'] = admin_session.session_key
+    url = reverse('users:access_rule_detail', args=[access_rule.id])
+    etag = api_client.get(url)['ETag']
+
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+    access_rule.read_permission = True
+    access_rule.save()
+
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+    assert api_client.patch(url, {'read_permission': False}, HTTP_IF_MATCH=etag).status_code == \
+        status.HTTP_412_PRECONDITION_FAILED
+
+
+@pytest.mark.django_db
+def test_access_rule_expanded_etag_follows_relations(api_client, admin_session, access_rule):
+    api_client.cookies['session_key'] = admin_session.session_key
+    url = reverse('users:access_rule_detail', args=[access_rule.id])
+    flat_etag = api_client.get(url)['ETag']
+    expanded_etag = api_client.get(url, {'expand': 'element'})['ETag']
+    assert api_client.get(url, {'expand': 'role'})['ETag'] not in (flat_etag, expanded_etag)
+
+    access_rule.element.name = 'Заказы'
+    access_rule.element.save()
+
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=flat_etag).status_code == status.HTTP_304_NOT_MODIFIED
+    response = api_client.get(url, {'expand': 'element'}, HTTP_IF_NONE_MATCH=expanded_etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['element']['name'] == 'Заказы'
+    assert api_client.get(url, {'expand': 'element'}, HTTP_IF_NONE_MATCH=response['ETag']).status_code == \
+        status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', [{}, {'expand': 'role,element'}, {'expand': 'role', 'stream': '1'}])
+def test_access_rule_list_queries_do_not_grow_with_rules(api_client, admin_session, params,
+                                                         django_assert_num_queries):
+    role = Role.objects.get(name='Пользователь')
+    AccessRoleRule.objects.bulk_create([
+        AccessRoleRule(role=role, element=BusinessElement.objects.create(name=f'Element {i}')) for i in range(20)
+    ])
+    api_client.cookies['session_key'] = admin_session.session_key
+
+    # The session lookup and one query for the rules with their roles and elements.
+    with django_assert_num_queries(2):
+        response = api_client.get(reverse('users:access_rule_list'), params)
+        if response.streaming:
+            b''.join(response.streaming_content)
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_access_rule_stream_runs_its_query_in_the_view(api_client, admin_session, django_assert_num_queries):
+    role = Role.objects.get(name='Пользователь')
+    AccessRoleRule.objects.bulk_create([
+        AccessRoleRule(role=role, element=BusinessElement.objects.create(name=f'Element {i}')) for i in range(5)
+    ])
+    api_client.cookies['session_key'] = admin_session.session_key
+
+    # The body is not read yet, the middleware still sees both queries.
+    with django_assert_num_queries(2):
+        response = api_client.get(reverse('users:access_rule_list'), {'stream': '1'})
+    with django_assert_num_queries(0):
+        data = json.loads(b''.join(response.streaming_content))
+
+    assert [rule['id'] for rule in data] == sorted(AccessRoleRule.objects.values_list('id', flat=True))
+
+
+@pytest.mark.django_db
+def test_access_rule_expand(api_client, admin_session, access_rule):
+    api_client.cookies['session_key'] = admin_session.session_key
+    url = reverse('users:access_rule_detail', args=[access_rule.id])
+
+    flat = api_client.get(url).data
+    expanded = api_client.get(url, {'expand': 'role,element,unknown'}).data
+
+    assert flat['role'] == access_rule.role_id
+    assert expanded['role'] == {'id': access_rule.role_id, 'name': access_rule.role.name}
+    assert expanded['element'] == {'id': access_rule.element_id, 'name': access_rule.element.name}
+
+    response = api_client.patch(f'{url}?expand=role', {'read_permission': True})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['role']['id'] == access_rule.role_id
+    assert response.data['element'] == access_rule.element_id
@@ -0,0 +1,179 @@
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import jwt
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from apps.users.session_store import CachedSession, RedisError, get_session_store
+
+logger = logging.getLogger(__name__)
+
+AUTH_MODE_SESSION = 'session'
+AUTH_MODE_JWT = 'jwt'
+JWT_ALGORITHM = 'HS256'
+
+
+def is_jwt_mode() -> bool:
+    """
+    Checks if login issues signed access tokens instead of session cookies.
+
+    Return:
+        True if settings.AUTH_MODE is 'jwt', False otherwise.
+    """
+    return getattr(settings, 'AUTH_MODE', AUTH_MODE_SESSION) == AUTH_MODE_JWT
+
+
+def get_access_token_lifetime() -> int:
+    """
+    Returns the lifetime of access tokens.
+
+    Return:
+        Lifetime in seconds.
+    """
+    return getattr(settings, 'ACCESS_TOKEN_LIFETIME', 300)
+
+
+class TokenDenylist:
+    """
+    Session ids whose access tokens must be rejected.
+
+    Entries live in Redis, so a revocation on one worker applies to every worker, and are kept
+    only as long as a token issued for the session can still be valid.
+    """
+
+    KEY_PREFIX = 'jwt:revoked:'
+
+    def __init__(self, client):
+        self.client = client
+
+    def revoke(self, session_ids) -> None:
+        """
+        Rejects every access token issued for the given sessions.
+
+        Args:
+            session_ids: Primary keys of the revoked sessions.
+        """
+        session_ids = list(session_ids)
+        if not session_ids:
+            return
+        ttl = get_access_token_lifetime()
+        try:
+            pipe = self.client.pipeline()
+            for session_id in session_ids:
+                pipe.set(f'{self.KEY_PREFIX}{session_id}', 1, ex=ttl)
+            pipe.execute()
+        except RedisError:
+            # The sessions are already inactive, so their tokens can no longer be refreshed.
+            logger.error('Failed to store revoked sessions in Redis.', exc_info=True)
+
+    def is_revoked(self, session_id: int) -> bool:
+        """
+        Checks if the tokens of the session have been revoked.
+
+        Args:
+            session_id: Primary key of the session.
+        Returns:
+            True if the session is revoked or the denylist is unavailable, False otherwise.
+        """
+        try:
+            return bool(self.client.exists(f'{self.KEY_PREFIX}{session_id}'))
+        except RedisError:
+            logger.warning('Token denylist is unavailable, rejecting the token.', exc_info=True)
+            return True
+
+
+_denylist = None
+
+
+def check_auth_mode() -> None:
+    """
+    Refuses JWT mode without Redis.
+
+    Revoked sessions must be seen by every worker process, which a per-process denylist cannot do.
+
+    Raises:
+        ImproperlyConfigured: If AUTH_MODE is 'jwt' and no Redis URL is configured.
+    """
+    if is_jwt_mode() and get_session_store().client is None:
+        raise ImproperlyConfigured("AUTH_MODE='jwt' requires REDIS_URL for the token denylist.")
+
+
+def get_denylist() -> TokenDenylist:
+    """
+    Returns the process-wide token denylist, sharing the Redis client of the session store.
+
+    Return:
+        TokenDenylist object.
+    Raises:
+        ImproperlyConfigured: If no Redis URL is configured.
+    """
+    global _denylist
+    if _denylist is None:
+        client = get_session_store().client
+        if client is None:
+            raise ImproperlyConfigured('The token denylist requires REDIS_URL.')
+        _denylist = TokenDenylist(client)
+    return _denylist
+
+
+def issue_access_token(session: CachedSession) -> tuple[str, datetime]:
+    """
+    Issues a signed access token for the session.
+
+    The token carries the user id, role id and session id, so it can be verified without any
+    database access. Permissions are not part of the token, they are checked against the current
+    access rules on every request.
+
+    Args:
+        session: Snapshot of the session the token belongs to.
+    Returns:
+        Tuple of the encoded token and its expiration time.
+    """
+    now = timezone.now()
+    expires_at = min(now + timedelta(seconds=get_access_token_lifetime()), session.expire_at)
+    payload = {
+        'sub': str(session.user_id),
+        'role': session.role_id,
+        'sid': session.session_id,
+        'iat': int(now.timestamp()),
+        'exp': int(expires_at.timestamp()),
+    }
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=JWT_ALGORITHM), expires_at
+
+
+def decode_access_token(token: str) -> CachedSession:
+    """
+    Verifies the signature and expiration of an access token.
+
+    Args:
+        token: Encoded access token.
+    Returns:
+        CachedSession built from the token claims.
+    Raises:
+        jwt.InvalidTokenError: If the token is malformed, forged or expired.
+    """
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[JWT_ALGORITHM], options={'require': ['exp', 'sub']})
+    return CachedSession(
+        session_id=payload['sid'],
+        user_id=int(payload['sub']),
+        role_id=payload.get('role'),
+        expire_at=datetime.fromtimestamp(payload['exp'], tz=dt_timezone.utc),
+        is_active=True,
+    )
+
+
+def deactivate_sessions(sessions) -> int:
+    """
+    Deactivates the sessions and, in JWT mode, revokes the access tokens issued for them.
+
+    Args:
+        sessions: Session queryset.
+    Returns:
+        Number of deactivated sessions.
+    """
+    sessions = sessions.filter(is_active=True)
+    if is_jwt_mode():
+        get_denylist().revoke(sessions.values_list('id', flat=True))
+    return sessions.update(is_active=False)
@@ -1,15 +1,29 @@
+from django.conf import settings
 from django.urls import path
+
+from apps.users import async_views
 from apps.users.views import (UserRegistrationView, UserLoginView, UserLogoutView, UserProfileView,
-                              AccessRoleRuleDetailView, AccessRoleRuleListView)
+                              AccessRoleRuleDetailView, AccessRoleRuleListView, TokenRefreshView,
+                              PermissionCheckView, PermissionSnapshotView, AccessRoleRuleBulkView, MetricsView)
 
 app_name = 'users'
 
+if settings.ASYNC_AUTH_VIEWS:
+    login_view, register_view = async_views.login, async_views.register
+else:
+    login_view, register_view = UserLoginView.as_view(), UserRegistrationView.as_view()
+
 urlpatterns = [
-    path('register/', UserRegistrationView.as_view(), name='user-register'),
-    path('login/', UserLoginView.as_view(), name='user-login'),
+    path('register/', register_view, name='user-register'),
+    path('login/', login_view, name='user-login'),
     path('logout/', UserLogoutView.as_view(), name='user-logout'),
+    path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
     path('profile/', UserProfileView.as_view(), name='user-profile'),
+    path('profile/permissions/', PermissionSnapshotView.as_view(), name='user-permissions'),
+    path('permissions/check/', PermissionCheckView.as_view(), name='permissions-check'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 
     path('access-rules/', AccessRoleRuleListView.as_view(), name='access_rule_list'),
+    path('access-rules/bulk/', AccessRoleRuleBulkView.as_view(), name='access_rule_bulk'),
     path('access-rules/<int:pk>/', AccessRoleRuleDetailView.as_view(), name='access_rule_detail'),
 ]
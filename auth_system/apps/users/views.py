@@ -1,11 +1,55 @@
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
 from django.utils.translation import gettext_lazy as _
 
+from apps.users.conditional import ConditionalObjectMixin
+from apps.users.hashing import verify_user_password
+from apps.users.metrics import registry
 from apps.users.models import User, Session, AccessRoleRule
-from apps.users.permissions import IsAdminUserRole
-from apps.users.serializers import UserSerializer, UserCreateSerializer, AccessRoleRuleSerializer
+from apps.users.pagination import KeysetPagination
+from apps.users.permissions import IsAdminUserRole, evaluate_permissions
+from apps.users.ratelimit import SlidingWindowRateThrottle, clear_failed_attempts
+from apps.users.rbac import get_permission_snapshot
+from apps.users.session_store import CachedSession, get_session_store
+from apps.users.serializers import (UserSerializer, UserCreateSerializer, AccessRoleRuleSerializer,
+                                    AccessRoleRuleBulkSerializer, PermissionCheckBatchSerializer)
+from apps.users.sessions import load_session_context, set_session_cookie, start_session
+from apps.users.streaming import StreamingListMixin
+from apps.users.tokens import deactivate_sessions, get_denylist, is_jwt_mode, issue_access_token
+
+
+def login_response(session: Session, response_class=Response):
+    """
+    Builds the response of a successful login.
+
+    The response carries the effective permissions of the user's role, so clients
+    know what they are allowed to do without probing endpoints.
+
+    Args:
+        session: The session created for the user.
+        response_class: Response class to instantiate with the payload.
+    Returns:
+        response: A response with access and refresh tokens in JWT mode, or with a session cookie otherwise.
+    """
+    permissions = get_permission_snapshot(session.user).to_dict()
+    if is_jwt_mode():
+        access_token, expires_at = issue_access_token(CachedSession.from_session(session))
+        return response_class({
+            'detail': _('Logged in successfully.'),
+            'token_type': 'Bearer',
+            'access_token': access_token,
+            'expires_at': expires_at,
+            'refresh_token': session.session_key,
+            'permissions': permissions,
+        })
+
+    response = response_class({'detail': _('Logged in successfully.'), 'permissions': permissions})
+    set_session_cookie(response, session.session_key, session.expire_at)
+    return response
 
 
 class UserRegistrationView(generics.CreateAPIView):
@@ -16,6 +60,8 @@ class UserRegistrationView(generics.CreateAPIView):
     """
     serializer_class = UserCreateSerializer
     queryset = User.objects.all()
+    throttle_classes = [SlidingWindowRateThrottle]
+    max_queries = 4
 
 
 class UserLoginView(generics.GenericAPIView):
@@ -23,9 +69,14 @@ class UserLoginView(generics.GenericAPIView):
     API view for user login.
 
     Handles user authentication by email and password. If successful, creates a session and sets a cookie.
+    In JWT mode, returns a short-lived access token and a refresh token backed by the session instead.
     """
     serializer_class = UserSerializer
     http_method_names = ['post']
+    throttle_classes = [SlidingWindowRateThrottle]
+    # The user lookup and the session rotation: the user row lock and one statement on PostgreSQL, up to three
+    # statements elsewhere.
+    max_queries = 4
 
     def post(self, request, *args, **kwargs):
         """
@@ -43,16 +94,11 @@ class UserLoginView(generics.GenericAPIView):
         except User.DoesNotExist:
             return Response({'detail': _('Invalid credentials.')}, status=401)
 
-        if not user.check_password(password):
+        if not verify_user_password(user, password):
             return Response({'detail': _('Invalid credentials.')}, status=401)
 
-        Session.objects.filter(user=user, is_active=True).update(is_active=False)
-
-        session = Session.create_session(user)
-        response = Response({'detail': _('Logged in successfully.')})
-        response.set_cookie('session_key', session.session_key, expires=session.expire_at, httponly=True,
-                            secure=True, samesite='Lax')
-        return response
+        clear_failed_attempts(request, request.data)
+        return login_response(start_session(user))
 
 
 class UserLogoutView(generics.GenericAPIView):
@@ -63,6 +109,7 @@ class UserLogoutView(generics.GenericAPIView):
     """
     http_method_names = ['post']
     permission_classes = [IsAuthenticated]
+    max_queries = 2
 
     def post(self, request, *args, **kwargs):
         """
@@ -76,12 +123,127 @@ class UserLogoutView(generics.GenericAPIView):
         session_key = request.COOKIES.get('session_key')
         if session_key:
             Session.objects.filter(session_key=session_key, is_active=True).update(is_active=False)
+            get_session_store().invalidate(session_key)
+        if isinstance(request.auth, CachedSession):
+            sessions = Session.objects.filter(id=request.auth.session_id, is_active=True)
+            # The refresh token is the session key, its cache entry must go with the row.
+            refresh_keys = list(sessions.values_list('session_key', flat=True))
+            sessions.update(is_active=False)
+            get_denylist().revoke([request.auth.session_id])
+            get_session_store().invalidate(*refresh_keys)
         response = Response({'detail': _('Logged out successfully')})
         response.delete_cookie('session_key')
         return response
 
 
-class UserProfileView(generics.RetrieveUpdateDestroyAPIView):
+class TokenRefreshView(generics.GenericAPIView):
+    """
+    API view for refreshing access tokens.
+
+    Issues a new access token for an active session identified by the refresh token.
+    """
+    http_method_names = ['post']
+    authentication_classes = []
+    max_queries = 1
+
+    def post(self, request, *args, **kwargs):
+        """
+        Issues a new access token.
+
+        Args:
+            request: The HTTP request object containing 'refresh_token' in data.
+        Returns:
+            response: A response with a new access token, or an error response.
+        """
+        context = load_session_context(request.data.get('refresh_token'))
+        if not context.is_authenticated:
+            return Response({'detail': _('Invalid refresh token.')}, status=401)
+
+        access_token, expires_at = issue_access_token(context.session)
+        return Response({'token_type': 'Bearer', 'access_token': access_token, 'expires_at': expires_at})
+
+
+class PermissionCheckView(generics.GenericAPIView):
+    """
+    API view for checking many permissions in one request.
+
+    Lets clients decide which actions to offer without probing endpoints for 403 responses.
+    """
+    http_method_names = ['post']
+    permission_classes = [IsAuthenticated]
+    serializer_class = PermissionCheckBatchSerializer
+    max_queries = 1
+
+    def post(self, request, *args, **kwargs):
+        """
+        Evaluates every check against the access rules of the user's role.
+
+        Args:
+            request: The HTTP request object containing 'checks', a list of
+                {'element', 'action', 'owner_id'} objects.
+        Returns:
+            response: The checks in the same order, each with an 'allowed' flag.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        checks = serializer.validated_data['checks']
+        results = evaluate_permissions(request.user, checks)
+        return Response({'results': [{**check, 'allowed': allowed} for check, allowed in zip(checks, results)]})
+
+
+class PermissionSnapshotView(generics.GenericAPIView):
+    """
+    API view for the effective permissions of the current user.
+
+    Responses carry an ETag, so polling clients get a bodyless 304 until the rules change.
+    """
+    http_method_names = ['get']
+    permission_classes = [IsAuthenticated]
+    max_queries = 1
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns the element name to permission bitmask mapping of the user's role.
+
+        Args:
+            request: The HTTP request object.
+        Returns:
+            response: The permissions snapshot, or 304 if the client's copy is current.
+        """
+        snapshot = get_permission_snapshot(request.user)
+        etag = quote_etag(snapshot.etag)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(snapshot.to_dict())
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class MetricsView(generics.GenericAPIView):
+    """
+    API view for the request, database and cache metrics of this worker process.
+
+    The metrics are rendered in the Prometheus text exposition format.
+    """
+    http_method_names = ['get']
+    permission_classes = [IsAuthenticated, IsAdminUserRole]
+    max_queries = 1
+
+    def get(self, request, *args, **kwargs):
+        """
+        Renders the metrics collected since the process started.
+
+        Args:
+            request: The HTTP request object.
+        Returns:
+            response: A plain text response with the metrics.
+        """
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class UserProfileView(ConditionalObjectMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API view for user profile management.
 
@@ -90,6 +252,7 @@ class UserProfileView(generics.RetrieveUpdateDestroyAPIView):
     """
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    max_queries = {'GET': 2, 'PUT': 3, 'PATCH': 3, 'DELETE': 3}
 
     def get_object(self):
         """
@@ -98,7 +261,18 @@ class UserProfileView(generics.RetrieveUpdateDestroyAPIView):
         Returns:
             The authenticated user instance.
         """
-        return self.request.user
+        obj = self.request.user
+        self._etag_object = obj
+        return obj
+
+    def get_etag_queryset(self):
+        """
+        Returns the queryset with only the current user, for the ETag lookup.
+
+        Returns:
+            QuerySet of the authenticated user.
+        """
+        return User.objects.filter(pk=self.request.user.id)
 
     def perform_destroy(self, instance):
         """
@@ -110,27 +284,68 @@ class UserProfileView(generics.RetrieveUpdateDestroyAPIView):
         instance.is_active = False
         instance.save()
 
-        instance.sessions.filter(is_active=True).update(is_active=False)
+        deactivate_sessions(instance.sessions.all())
+        get_session_store().invalidate_user(instance.id)
 
         response = Response({'detail': _('Account was delete.')}, status=status.HTTP_204_NO_CONTENT)
         response.delete_cookie('session_key')
         return response
 
 
-class AccessRoleRuleListView(generics.ListAPIView):
+class AccessRoleRuleListView(StreamingListMixin, generics.ListAPIView):
     """API view for getting AccessRoleRule list."""
-    queryset = AccessRoleRule.objects.all()
+    queryset = AccessRoleRule.objects.with_relations()
     serializer_class = AccessRoleRuleSerializer
     permission_classes = [IsAuthenticated, IsAdminUserRole]
+    pagination_class = KeysetPagination
+    max_queries = 2
 
 
-class AccessRoleRuleDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AccessRoleRuleDetailView(ConditionalObjectMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API view for AccessRoleRule instances.
 
     This view provides standard CRUD operations for AccessRoleRule objects, allowing
     authenticated admin users to manage access rules.
     """
-    queryset = AccessRoleRule.objects.all()
+    queryset = AccessRoleRule.objects.with_relations()
     serializer_class = AccessRoleRuleSerializer
     permission_classes = [IsAuthenticated, IsAdminUserRole]
+    max_queries = {'GET': 2, 'PUT': 4, 'PATCH': 4, 'DELETE': 4}
+
+    def get_etag_fields(self) -> list[str]:
+        """
+        Adds the timestamps of the expanded relations, whose names are part of the response.
+
+        Returns:
+            List of field lookups for the ETag.
+        """
+        expanded = self.serializer_class.get_expand_names(self.request)
+        return super().get_etag_fields() + [f'{name}__{self.etag_field}' for name in expanded]
+
+
+class AccessRoleRuleBulkView(generics.GenericAPIView):
+    """
+    API view for replacing many AccessRoleRule instances at once.
+
+    Provisioning a role takes one request and one transaction instead of a PATCH per rule.
+    """
+    http_method_names = ['put']
+    serializer_class = AccessRoleRuleBulkSerializer
+    permission_classes = [IsAuthenticated, IsAdminUserRole]
+    max_queries = 5
+
+    def put(self, request, *args, **kwargs):
+        """
+        Creates the given rules or overwrites the permissions of existing ones.
+
+        Args:
+            request: The HTTP request object containing 'rules', a list of rules with
+                'role', 'element' and the permission flags.
+        Returns:
+            response: The number of written rules, or validation errors.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        rules = serializer.save()
+        return Response({'count': len(rules)})
@@ -12,5 +12,14 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'auth_system.settings')
+os.environ.setdefault('ASYNC_AUTH_VIEWS', 'True')
 
 application = get_asgi_application()
+
+from apps.users.rules_broadcast import start_listener  # noqa: E402
+from apps.users.session_flusher import start_session_flusher  # noqa: E402
+from apps.users.session_reaper import start_session_reaper  # noqa: E402
+
+start_listener()
+start_session_flusher()
+start_session_reaper()
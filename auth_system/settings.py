@@ -52,13 +52,17 @@ INSTALLED_APPS += THIRD_PARTY_APPS
 INSTALLED_APPS += LOCAL_APPS
 
 MIDDLEWARE = [
+    # Outermost, so the recorded latency covers the whole middleware chain
+    'apps.users.middleware.metrics_middleware.MetricsMiddleware',
+    'apps.users.middleware.query_budget_middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    # Django's session stack is only needed by the admin site, the API uses CustomSessionMiddleware
+    'apps.users.middleware.admin_middleware.AdminSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.users.middleware.admin_middleware.AdminAuthenticationMiddleware',
     'apps.users.middleware.session_middleware.CustomSessionMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'apps.users.middleware.admin_middleware.AdminMessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -93,16 +97,27 @@ WSGI_APPLICATION = 'auth_system.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': config('POSTGRES_DB'),
-        'USER': config('POSTGRES_USER'),
-        'PASSWORD': config('POSTGRES_PASSWORD'),
-        'HOST': config('POSTGRES_HOST'),
-        'PORT': config('POSTGRES_PORT'),
+# 'sqlite' runs the tests and benchmarks without a PostgreSQL server
+DATABASE_ENGINE = config('DATABASE_ENGINE', default='postgresql')
+
+if DATABASE_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('POSTGRES_DB'),
+            'USER': config('POSTGRES_USER'),
+            'PASSWORD': config('POSTGRES_PASSWORD'),
+            'HOST': config('POSTGRES_HOST'),
+            'PORT': config('POSTGRES_PORT'),
+        }
     }
-}
 
 
 # Password validation
@@ -159,16 +174,97 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'apps.users.authentication.CookieSessionAuthentication',
+        'apps.users.authentication.JWTAuthentication',
+    ],
+    'DEFAULT_FILTER_BACKENDS': [
+        'apps.users.filters.RBACFilterBackend',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Reverse proxies in front of the app; 0 identifies clients by REMOTE_ADDR and ignores X-Forwarded-For
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
 }
 
+# Default page size of paginated listings and the upper bound of their page_size query parameter
+API_PAGE_SIZE = config('API_PAGE_SIZE', default=50, cast=int)
+API_MAX_PAGE_SIZE = config('API_MAX_PAGE_SIZE', default=500, cast=int)
+# Maximum number of rules in one PUT /users/access-rules/bulk/ request
+ACCESS_RULES_BULK_MAX_ITEMS = config('ACCESS_RULES_BULK_MAX_ITEMS', default=10000, cast=int)
+# Maximum number of checks in one POST /users/permissions/check/ request
+PERMISSION_CHECK_MAX_ITEMS = config('PERMISSION_CHECK_MAX_ITEMS', default=1000, cast=int)
+# Rows fetched per database round trip by streamed listings (?stream=1)
+API_STREAM_CHUNK_SIZE = config('API_STREAM_CHUNK_SIZE', default=2000, cast=int)
+# Warn when a view runs more queries than its max_queries attribute allows or repeats a query (N+1)
+QUERY_BUDGET_WARNINGS = config('QUERY_BUDGET_WARNINGS', default=DEBUG, cast=bool)
+
 AUTH_USER_MODEL = 'users.User'
 
+# 'session' sets a session cookie on login, 'jwt' issues signed access tokens
+AUTH_MODE = config('AUTH_MODE', default='session')
+ACCESS_TOKEN_LIFETIME = config('ACCESS_TOKEN_LIFETIME', default=300, cast=int)
+
+# Session lifetime in seconds. With sliding expiry the session is extended by a full lifetime
+# once less than SESSION_REFRESH_FRACTION of it remains; extensions are rounded up to
+# SESSION_REFRESH_BUCKET seconds so they can be written in batches.
+SESSION_LIFETIME = config('SESSION_LIFETIME', default=3600, cast=int)
+SESSION_SLIDING_EXPIRY = config('SESSION_SLIDING_EXPIRY', default=False, cast=bool)
+SESSION_REFRESH_FRACTION = config('SESSION_REFRESH_FRACTION', default=0.5, cast=float)
+SESSION_REFRESH_BUCKET = config('SESSION_REFRESH_BUCKET', default=60, cast=int)
+
+# Active sessions kept per user on login, the ones that expire first are deactivated; 0 is unlimited
+SESSION_MAX_CONCURRENT = config('SESSION_MAX_CONCURRENT', default=1, cast=int)
+
+# Background purge of expired and inactive sessions, 0 disables the in-process reaper
+SESSION_PURGE_INTERVAL = config('SESSION_PURGE_INTERVAL', default=0, cast=float)
+SESSION_PURGE_BATCH_SIZE = config('SESSION_PURGE_BATCH_SIZE', default=5000, cast=int)
+
+# Session writes deferred from the read path are flushed in batches by a background thread
+SESSION_WRITE_FLUSH_INTERVAL = config('SESSION_WRITE_FLUSH_INTERVAL', default=1.0, cast=float)
+SESSION_WRITE_BATCH_SIZE = config('SESSION_WRITE_BATCH_SIZE', default=500, cast=int)
+
+# Redis cache in front of the Session table, disabled when empty
+SESSION_CACHE_URL = config('REDIS_URL', default='')
+
+# Access rule change broadcast between workers, the rules version row is polled when empty
+RBAC_BROADCAST_URL = config('REDIS_URL', default='')
+RBAC_RULES_POLL_INTERVAL = config('RBAC_RULES_POLL_INTERVAL', default=5, cast=float)
+
 PASSWORD_HASHERS = [
-    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'apps.users.hashers.ConfigurableBCryptSHA256PasswordHasher',
 ]
 
+# bcrypt work factor, hashes with another cost are upgraded on login
+BCRYPT_ROUNDS = config('BCRYPT_ROUNDS', default=12, cast=int)
+# Hash upgrades queued at once, further ones wait for a later login
+PASSWORD_REHASH_QUEUE_SIZE = config('PASSWORD_REHASH_QUEUE_SIZE', default=64, cast=int)
+
+# Successful password checks remembered for a few seconds, 0 disables the cache
+PASSWORD_VERIFY_CACHE_TTL = config('PASSWORD_VERIFY_CACHE_TTL', default=0, cast=float)
+PASSWORD_VERIFY_CACHE_SIZE = config('PASSWORD_VERIFY_CACHE_SIZE', default=1024, cast=int)
+
+# Process pool for password hashing, 0 workers hash on the request thread
+PASSWORD_HASHING_WORKERS = config('PASSWORD_HASHING_WORKERS', default=2, cast=int)
+PASSWORD_HASHING_QUEUE_SIZE = config('PASSWORD_HASHING_QUEUE_SIZE', default=16, cast=int)
+PASSWORD_HASHING_RETRY_AFTER = config('PASSWORD_HASHING_RETRY_AFTER', default=1, cast=int)
+
+# Brute-force protection of the login and registration endpoints: sliding-window limits per URL name,
+# keyed by client IP (every attempt) and by the submitted email (failed attempts only). Counters are
+# kept in Redis when configured, otherwise in an LRU-bounded dict of every worker process.
+RATE_LIMIT_ENABLED = config('RATE_LIMIT_ENABLED', default=True, cast=bool)
+RATE_LIMIT_CACHE_URL = config('REDIS_URL', default='')
+RATE_LIMIT_MAX_KEYS = config('RATE_LIMIT_MAX_KEYS', default=100000, cast=int)
+RATE_LIMITS = {
+    'users:user-login': {
+        'ip': config('LOGIN_RATE_LIMIT_IP', default='30/m'),
+        'email': config('LOGIN_RATE_LIMIT_EMAIL', default='5/m'),
+    },
+    'users:user-register': {
+        'ip': config('REGISTER_RATE_LIMIT_IP', default='10/h'),
+    },
+}
+
+# Serve async login and registration views, enabled by asgi.py
+ASYNC_AUTH_VIEWS = config('ASYNC_AUTH_VIEWS', default=False, cast=bool)
+
 APPEND_SLASH = False
 
 # DRF spectacular settings
@@ -0,0 +1,62 @@
+"""
+Applying a 50 role x 200 element access matrix: one bulk PUT against one PATCH per rule.
+
+Sequential PATCHes are timed on a sample of rules and extrapolated to the whole matrix.
+"""
+import time
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.users.models import AccessRoleRule, BusinessElement, Role, Session, User
+
+ROLES = 50
+ELEMENTS = 200
+PATCH_SAMPLE = 200
+
+
+@pytest.fixture
+def client(db):
+    admin_role = Role.objects.get(name='Администратор')
+    Role.objects.bulk_create([Role(name=f'Role {i}') for i in range(ROLES - Role.objects.count())])
+    BusinessElement.objects.bulk_create([BusinessElement(name=f'Element {i}') for i in range(ELEMENTS)])
+    admin = User.objects.create_user(email='bench@example.com', username='bench', password='benchpass123',
+                                     role=admin_role)
+    client = APIClient()
+    client.cookies['session_key'] = Session.create_session(admin).session_key
+    return client
+
+
+def matrix(flag: bool) -> list[dict]:
+    return [
+        {'role': role_id, 'element': element_id, 'read_permission': True, 'update_permission': flag}
+        for role_id in Role.objects.values_list('id', flat=True)
+        for element_id in BusinessElement.objects.values_list('id', flat=True)
+    ]
+
+
+def test_bulk_put_vs_sequential_patch(bench_record, bench_metric, client):
+    url = reverse('users:access_rule_bulk')
+    rules = matrix(False)
+    assert len(rules) == ROLES * ELEMENTS
+
+    samples = []
+    for flag in (False, True, False):
+        # The first run inserts every rule, the next ones update them all.
+        payload = matrix(flag)
+        start = time.perf_counter()
+        response = client.put(url, {'rules': payload}, format='json')
+        samples.append(time.perf_counter() - start)
+        assert response.status_code == 200
+    bench_record(f'access rules: bulk PUT of {len(rules)} rules', samples)
+
+    rule_ids = list(AccessRoleRule.objects.values_list('id', flat=True)[:PATCH_SAMPLE])
+    patch_samples = []
+    for rule_id in rule_ids:
+        start = time.perf_counter()
+        response = client.patch(reverse('users:access_rule_detail', args=[rule_id]), {'update_permission': True})
+        patch_samples.append(time.perf_counter() - start)
+        assert response.status_code == 200
+    patch = bench_record('access rules: single PATCH', patch_samples)
+    bench_metric(f'access rules: {len(rules)} sequential PATCHes (extrapolated)', patch.mean * len(rules), 's')
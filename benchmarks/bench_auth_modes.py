@@ -0,0 +1,37 @@
+import fakeredis
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.users import session_store as session_store_module
+from apps.users import tokens
+from apps.users.models import AccessRoleRule, BusinessElement, Role, Session, User
+from apps.users.session_store import CachedSession, SessionStore
+from apps.users.tokens import TokenDenylist, issue_access_token
+
+ROUNDS = 500
+
+
+@pytest.fixture
+def user(db, monkeypatch):
+    monkeypatch.setattr(session_store_module, '_store', SessionStore())
+    role = Role.objects.get(name='Пользователь')
+    element = BusinessElement.objects.create(name='Товары')
+    AccessRoleRule.objects.create(role=role, element=element, read_permission=True)
+    return User.objects.create_user(email='bench@example.com', username='bench', password='benchpass123', role=role)
+
+
+def test_products_cookie_session_vs_jwt(bench, user, settings, monkeypatch):
+    url = reverse('resources:products')
+    session = Session.create_session(user)
+
+    cookie_client = APIClient()
+    cookie_client.cookies['session_key'] = session.session_key
+    bench('GET /products/: cookie session', lambda: cookie_client.get(url), rounds=ROUNDS)
+
+    settings.AUTH_MODE = 'jwt'
+    monkeypatch.setattr(tokens, '_denylist', TokenDenylist(fakeredis.FakeRedis()))
+    access_token, _ = issue_access_token(CachedSession.from_session(session))
+    jwt_client = APIClient()
+    jwt_client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    bench('GET /products/: jwt access token', lambda: jwt_client.get(url), rounds=ROUNDS)
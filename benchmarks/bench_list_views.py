@@ -0,0 +1,96 @@
+"""
+Latency of the list endpoints on large tables: GET /products/ at 1k, 100k and 1M rows
+and GET /users/access-rules/ and its admin changelist with 10k rules.
+
+The product table sizes can be lowered with BENCH_PRODUCT_ROWS, for example ``BENCH_PRODUCT_ROWS=1000,100000``.
+"""
+import os
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.resources.models import Product
+from apps.resources.views import ProductListView
+from apps.users.models import AccessRoleRule, BusinessElement, Role, Session, User
+from apps.users.views import AccessRoleRuleListView
+
+PRODUCT_ROWS = [int(rows) for rows in os.environ.get('BENCH_PRODUCT_ROWS', '1000,100000,1000000').split(',')]
+OWNERS = 10
+RULES = 10000
+ROUNDS = 200
+
+
+def make_client(user) -> APIClient:
+    client = APIClient()
+    client.cookies['session_key'] = Session.create_session(user).session_key
+    return client
+
+
+@pytest.fixture
+def clients(db):
+    element = BusinessElement.objects.create(name=ProductListView.business_element_name)
+    admin_role, user_role = Role.objects.get(name='Администратор'), Role.objects.get(name='Пользователь')
+    AccessRoleRule.objects.create(role=admin_role, element=element, read_permission=True, read_all_permission=True)
+    AccessRoleRule.objects.create(role=user_role, element=element, read_permission=True)
+
+    admin = User.objects.create_user(email='admin@example.com', username='admin', password='benchpass123',
+                                     role=admin_role)
+    user = User.objects.create_user(email='user@example.com', username='user', password='benchpass123',
+                                    role=user_role)
+    for i in range(OWNERS - 2):
+        User.objects.create_user(email=f'owner{i}@example.com', username=f'owner{i}', password='benchpass123')
+    return {'all rows': make_client(admin), 'own rows': make_client(user)}
+
+
+def test_product_list(bench, clients):
+    url = reverse('resources:products')
+    created = 0
+    # The table grows between measurements, so every size is generated only once.
+    for rows in sorted(PRODUCT_ROWS):
+        call_command('generate_products', count=rows - created, batch_size=10000, stdout=open(os.devnull, 'w'))
+        created = rows
+        assert Product.objects.count() == rows
+
+        for scope, client in clients.items():
+            response = client.get(url)
+            assert response.status_code == 200
+            cursor_url = response.data['next']
+            bench(f'GET /products/ {rows} rows, {scope}: first page', lambda: client.get(url), rounds=ROUNDS)
+            bench(f'GET /products/ {rows} rows, {scope}: second page', lambda: client.get(cursor_url),
+                  rounds=ROUNDS)
+
+
+def test_access_rule_list(bench, clients, client, monkeypatch):
+    # One rule per role and element, the table is unique on the pair.
+    roles = list(Role.objects.all())
+    elements = BusinessElement.objects.bulk_create(
+        [BusinessElement(name=f'Element {i}') for i in range(-(-RULES // len(roles)))]
+    )
+    AccessRoleRule.objects.bulk_create([
+        AccessRoleRule(role=role, element=element, read_permission=True) for role in roles for element in elements
+    ][:RULES])
+    api_client, url = clients['all rows'], reverse('users:access_rule_list')
+    assert api_client.get(url).status_code == 200
+
+    for label, params, rounds in [
+        ('first page', {}, ROUNDS),
+        ('first page, expand', {'expand': 'role,element'}, ROUNDS),
+        ('page_size=500, expand', {'page_size': 500, 'expand': 'role,element'}, ROUNDS // 10),
+        ('stream=1, expand', {'stream': '1', 'expand': 'role,element'}, ROUNDS // 20),
+    ]:
+        bench(f'GET /users/access-rules/, {RULES} rules: {label}',
+              lambda: b''.join(api_client.get(url, params).streaming_content) if 'stream' in params
+              else api_client.get(url, params), rounds=rounds)
+
+    # The view queryset before the relations were joined: one query per expanded relation and row.
+    monkeypatch.setattr(AccessRoleRuleListView, 'queryset', AccessRoleRule.objects.all())
+    bench(f'GET /users/access-rules/, {RULES} rules: page_size=500, expand, no join',
+          lambda: api_client.get(url, {'page_size': 500, 'expand': 'role,element'}), rounds=ROUNDS // 10)
+
+    client.force_login(User.objects.create_superuser(email='super@example.com', username='super',
+                                                     password='benchpass123'))
+    admin_url = reverse('admin:users_accessrolerule_changelist')
+    assert client.get(admin_url).status_code == 200
+    bench(f'GET admin changelist, {RULES} rules', lambda: client.get(admin_url), rounds=ROUNDS // 10)
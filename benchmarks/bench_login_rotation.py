@@ -0,0 +1,59 @@
+"""
+Login throughput with password verification stubbed out, to isolate the database cost of the session rotation.
+
+Compares the rotation of start_session with the previous deactivate-everything-then-insert sequence.
+On PostgreSQL the rotation is one statement, on SQLite it falls back to a transaction.
+"""
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.users import session_store as session_store_module
+from apps.users import views
+from apps.users.models import Session, User
+from apps.users.query_budget import QueryRecorder
+from apps.users.session_store import SessionStore
+from apps.users.tokens import deactivate_sessions
+
+ROUNDS = 500
+
+
+def deactivate_then_create(user: User) -> Session:
+    deactivate_sessions(Session.objects.filter(user=user))
+    return Session.create_session(user)
+
+
+@pytest.fixture(autouse=True)
+def no_password_hashing(monkeypatch, settings):
+    settings.RATE_LIMIT_ENABLED = False
+    monkeypatch.setattr(views, 'verify_user_password', lambda user, password: True)
+    monkeypatch.setattr(session_store_module, '_store', SessionStore())
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('label, max_concurrent, rotation', [
+    ('deactivate all, then insert', 1, deactivate_then_create),
+    ('rotation, max 1 session', 1, None),
+    ('rotation, max 5 sessions', 5, None),
+])
+def test_login_throughput(bench, bench_metric, settings, monkeypatch, label, max_concurrent, rotation):
+    settings.SESSION_MAX_CONCURRENT = max_concurrent
+    if rotation is not None:
+        monkeypatch.setattr(views, 'start_session', rotation)
+    user = User.objects.create_user(email='bench@example.com', username='bench', password='benchpass123')
+    client, url = APIClient(), reverse('users:user-login')
+    data = {'email': user.email, 'password': 'benchpass123'}
+
+    def login():
+        assert client.post(url, data).status_code == 200
+
+    result = bench(f'POST /users/login/, bcrypt stubbed: {label}', login, rounds=ROUNDS)
+    # Savepoints of the test transaction are not counted, they are BEGIN and COMMIT outside tests.
+    statements = QueryRecorder()
+    with connection.execute_wrapper(statements):
+        login()
+
+    assert Session.objects.filter(user=user, is_active=True).count() == max_concurrent
+    bench_metric(f'{label}: logins per second', result.ops, 'logins/s')
+    bench_metric(f'{label}: statements per login', len(statements), 'statements')
@@ -0,0 +1,52 @@
+"""
+Cost of the request instrumentation: counter updates, the middleware around a view and a scrape.
+"""
+import pytest
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve
+
+from apps.users.metrics import MetricsRegistry
+from apps.users.middleware.metrics_middleware import MetricsMiddleware
+
+LABELS = (('view', 'users:user-profile'), ('method', 'GET'))
+
+
+def test_counter_update(bench):
+    metrics = MetricsRegistry()
+
+    bench('metrics: inc', lambda: metrics.inc('http_requests_total', LABELS), rounds=100_000)
+    bench('metrics: observe', lambda: metrics.observe('http_request_duration_seconds', LABELS, 0.003),
+          rounds=100_000)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('queries', [0, 3])
+def test_middleware_overhead(bench, queries):
+    def view(request):
+        with connection.cursor() as cursor:
+            for _ in range(queries):
+                cursor.execute('SELECT 1')
+        return HttpResponse()
+
+    def make_request():
+        request = RequestFactory().get('/users/profile/')
+        request.resolver_match = resolve('/users/profile/')
+        return request
+
+    middleware = MetricsMiddleware(view)
+
+    bench(f'view, {queries} queries: bare', lambda: view(make_request()), rounds=5000)
+    bench(f'view, {queries} queries: instrumented', lambda: middleware(make_request()), rounds=5000)
+
+
+def test_scrape(bench):
+    metrics = MetricsRegistry()
+    for view in range(50):
+        for status in (200, 400, 403):
+            labels = (('view', f'view-{view}'), ('method', 'GET'))
+            metrics.inc('http_requests_total', labels + (('status', status),))
+            metrics.observe('http_request_duration_seconds', labels, 0.01)
+
+    bench('metrics: render 150 series', metrics.render, rounds=200)
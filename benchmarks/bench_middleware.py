@@ -0,0 +1,80 @@
+"""
+Per-middleware cost of an API request with Django's session stack enabled globally and scoped to the admin site.
+"""
+import time
+
+import pytest
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils.module_loading import import_string
+
+from apps.users.models import Session, User
+
+GLOBAL_SESSION_STACK = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.users.middleware.session_middleware.CustomSessionMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+ROUNDS = 1000
+
+
+class Timed:
+    """Wraps a handler and records the duration of every call."""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.samples = []
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.handler(request)
+        self.samples.append(time.perf_counter() - start)
+        return response
+
+
+def build_chain(paths: list[str]) -> tuple[Timed, list[str], list[Timed]]:
+    # Every middleware gets a timer around its whole subtree; its own cost is the difference to the inner timer.
+    handler = Timed(lambda request: HttpResponse())
+    timers, loaded = [handler], []
+    for path in reversed(paths):
+        try:
+            middleware = import_string(path)(handler)
+        except MiddlewareNotUsed:
+            # Skipped like Django's handler does, for example QueryBudgetMiddleware without QUERY_BUDGET_WARNINGS.
+            continue
+        handler = Timed(middleware)
+        timers.append(handler)
+        loaded.append(path)
+    return handler, list(reversed(loaded)), list(reversed(timers))
+
+
+@pytest.fixture
+def session(db):
+    user = User.objects.create_user(email='bench@example.com', username='bench', password='benchpass123')
+    return Session.create_session(user)
+
+
+@pytest.mark.parametrize('label, paths', [
+    ('global', GLOBAL_SESSION_STACK),
+    ('admin-scoped', settings.MIDDLEWARE),
+])
+def test_middleware_overhead(bench_record, session, label, paths):
+    chain, paths, timers = build_chain(paths)
+    factory = RequestFactory()
+
+    for _ in range(ROUNDS):
+        request = factory.get('/users/profile/')
+        request.COOKIES['session_key'] = session.session_key
+        chain(request)
+
+    for path, outer, inner in zip(paths, timers, timers[1:]):
+        own = [total - nested for total, nested in zip(outer.samples, inner.samples)]
+        bench_record(f'{label}: {path.rsplit(".", 1)[-1]}', own)
+    bench_record(f'{label}: whole stack', [total - view for total, view in zip(timers[0].samples, timers[-1].samples)])
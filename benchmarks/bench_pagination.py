@@ -0,0 +1,51 @@
+"""
+Latency of deep pages: keyset (cursor) pagination against offset pagination.
+"""
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from rest_framework.pagination import Cursor, LimitOffsetPagination
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.resources.models import Product
+from apps.users.models import User
+from apps.users.pagination import KeysetPagination
+
+PAGE_SIZE = 10
+PAGES = (1, 100, 1000, 10000)
+ROUNDS = 200
+
+
+@pytest.fixture
+def products(db):
+    user = User.objects.create_user(email='bench@example.com', username='bench', password='benchpass123')
+    Product.objects.bulk_create(
+        [Product(name=f'Product {i}', owner=user) for i in range(PAGE_SIZE * max(PAGES))], batch_size=10000
+    )
+    return list(Product.objects.values_list('id', flat=True))
+
+
+def fetch_page(paginator, params: dict):
+    request = Request(APIRequestFactory().get('/products/', params))
+    return list(paginator.paginate_queryset(Product.objects.all(), request))
+
+
+def test_keyset_vs_offset_pagination(bench, products):
+    keyset = KeysetPagination()
+    keyset.page_size = PAGE_SIZE
+    keyset.base_url = 'http://testserver/products/'
+
+    for page in PAGES:
+        offset = (page - 1) * PAGE_SIZE
+        params = {}
+        if offset:
+            # The cursor of a page points at the last row of the previous one.
+            cursor = keyset.encode_cursor(Cursor(offset=0, reverse=False, position=products[offset - 1]))
+            params['cursor'] = parse_qs(urlparse(cursor).query)['cursor'][0]
+        assert fetch_page(keyset, params)[0].id == products[offset]
+        bench(f'page {page}: keyset', lambda: fetch_page(keyset, params), rounds=ROUNDS)
+
+        offset_params = {'limit': PAGE_SIZE, 'offset': offset}
+        assert fetch_page(LimitOffsetPagination(), offset_params)[0].id == products[offset]
+        bench(f'page {page}: offset', lambda: fetch_page(LimitOffsetPagination(), offset_params), rounds=ROUNDS)
@@ -0,0 +1,47 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.users import hashing, session_store as session_store_module
+from apps.users.hashing import PasswordHashingPool, VerificationCache
+from apps.users.models import User
+from apps.users.session_store import SessionStore
+
+ROUNDS_BY_COST = {4: 200, 8: 50, 10: 20, 12: 10}
+
+
+@pytest.fixture(autouse=True)
+def inline_hashing(monkeypatch, settings):
+    settings.RATE_LIMIT_ENABLED = False
+    # Hash on the benchmark thread, so the overridden BCRYPT_ROUNDS applies.
+    monkeypatch.setattr(hashing, '_pool', PasswordHashingPool(max_workers=0, queue_size=0))
+    monkeypatch.setattr(hashing, '_verification_cache', VerificationCache(ttl=0, max_size=0))
+    monkeypatch.setattr(session_store_module, '_store', SessionStore())
+
+
+def _login(client, url, data):
+    response = client.post(url, data)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('cost', sorted(ROUNDS_BY_COST))
+def test_login_throughput_by_cost(bench, settings, cost):
+    settings.BCRYPT_ROUNDS = cost
+    user = User.objects.create_user(email='bench@example.com', username='bench', password='benchpass123')
+    client, url = APIClient(), reverse('users:user-login')
+    data = {'email': user.email, 'password': 'benchpass123'}
+
+    bench(f'POST /users/login/: bcrypt cost {cost}', lambda: _login(client, url, data),
+          rounds=ROUNDS_BY_COST[cost], warmup=1)
+
+
+@pytest.mark.django_db
+def test_login_throughput_with_verification_cache(bench, settings, monkeypatch):
+    monkeypatch.setattr(hashing, '_verification_cache', VerificationCache(ttl=5, max_size=1024))
+    user = User.objects.create_user(email='bench@example.com', username='bench', password='benchpass123')
+    client, url = APIClient(), reverse('users:user-login')
+    data = {'email': user.email, 'password': 'benchpass123'}
+
+    bench(f'POST /users/login/: cost {settings.BCRYPT_ROUNDS}, verification cache',
+          lambda: _login(client, url, data), rounds=200, warmup=1)
@@ -0,0 +1,47 @@
+"""
+Cost of POST /users/permissions/check/ with 1,000 checks, against probing one endpoint per check.
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.users.models import AccessRoleRule, BusinessElement, Role, Session, User
+from apps.users.permissions import evaluate_permissions
+
+BATCH = 1000
+ELEMENTS = 20
+ROUNDS = 50
+
+
+@pytest.fixture
+def user(db):
+    role = Role.objects.get(name='Пользователь')
+    for i in range(ELEMENTS):
+        element = BusinessElement.objects.create(name=f'Element {i}')
+        AccessRoleRule.objects.create(role=role, element=element, read_permission=True, update_permission=i % 2 == 0)
+    return User.objects.create_user(email='bench@example.com', username='bench', password='benchpass123', role=role)
+
+
+def test_bulk_permission_check(bench, user):
+    client = APIClient()
+    client.cookies['session_key'] = Session.create_session(user).session_key
+    url = reverse('users:permissions-check')
+    actions = ('read', 'create', 'update', 'delete')
+    checks = [
+        {'element': f'Element {i % ELEMENTS}', 'action': actions[i % 4], 'owner_id': user.id if i % 3 else None}
+        for i in range(BATCH)
+    ]
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post(url, {'checks': checks}, format='json')
+    assert response.status_code == 200
+    assert len(queries) <= 2
+
+    bench(f'permissions check: {BATCH} items, evaluation only', lambda: evaluate_permissions(user, checks),
+          rounds=ROUNDS)
+    bench(f'permissions check: {BATCH} items, POST request',
+          lambda: client.post(url, {'checks': checks}, format='json'), rounds=ROUNDS)
+    bench('permissions check: 1 item, POST request',
+          lambda: client.post(url, {'checks': checks[:1]}, format='json'), rounds=ROUNDS)
@@ -0,0 +1,38 @@
+"""
+Payload size and server time of GET /users/profile/permissions/: full snapshot against a 304 revalidation.
+"""
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.users.models import AccessRoleRule, BusinessElement, Role, Session, User
+
+ELEMENTS = 200
+ROUNDS = 500
+
+
+@pytest.fixture
+def client(db):
+    role = Role.objects.get(name='Пользователь')
+    for i in range(ELEMENTS):
+        element = BusinessElement.objects.create(name=f'Element {i}')
+        AccessRoleRule.objects.create(role=role, element=element, read_permission=True, update_permission=i % 2 == 0)
+    user = User.objects.create_user(email='bench@example.com', username='bench', password='benchpass123', role=role)
+
+    client = APIClient()
+    client.cookies['session_key'] = Session.create_session(user).session_key
+    return client
+
+
+def test_permission_snapshot(bench, bench_metric, client):
+    url = reverse('users:user-permissions')
+    full = client.get(url)
+    etag = full['ETag']
+    not_modified = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == 304
+
+    bench_metric(f'permissions snapshot: {ELEMENTS} elements, 200 body', len(full.content), 'bytes')
+    bench_metric(f'permissions snapshot: {ELEMENTS} elements, 304 body', len(not_modified.content), 'bytes')
+    bench(f'permissions snapshot: {ELEMENTS} elements, 200', lambda: client.get(url), rounds=ROUNDS)
+    bench(f'permissions snapshot: {ELEMENTS} elements, 304',
+          lambda: client.get(url, HTTP_IF_NONE_MATCH=etag), rounds=ROUNDS)
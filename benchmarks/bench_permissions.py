@@ -0,0 +1,40 @@
+"""
+Cost of RoleBasedPermission.has_permission and has_object_permission on a warm permission matrix.
+"""
+import pytest
+from rest_framework.test import APIRequestFactory
+
+from apps.resources.models import Product
+from apps.resources.views import ProductDetailView
+from apps.users.models import AccessRoleRule, BusinessElement, Role, User
+from apps.users.permissions import RoleBasedPermission
+from apps.users.rbac import get_permission_matrix
+
+ROUNDS = 100_000
+
+
+@pytest.fixture
+def user(db):
+    role = Role.objects.get(name='Пользователь')
+    element = BusinessElement.objects.create(name=ProductDetailView.business_element_name)
+    AccessRoleRule.objects.create(role=role, element=element, read_permission=True, update_permission=True,
+                                  delete_all_permission=True)
+    return User.objects.create_user(email='bench@example.com', username='bench', password='benchpass123', role=role)
+
+
+@pytest.mark.parametrize('method', ['GET', 'PATCH', 'DELETE'])
+def test_role_based_permission(bench, user, method):
+    permission, view = RoleBasedPermission(), ProductDetailView()
+    request = getattr(APIRequestFactory(), method.lower())('/products/1/')
+    request.user = user
+    own, foreign = Product(owner_id=user.id), Product(owner_id=user.id + 1)
+    get_permission_matrix()
+
+    assert permission.has_permission(request, view)
+    assert permission.has_object_permission(request, view, own)
+
+    bench(f'{method}: has_permission', lambda: permission.has_permission(request, view), rounds=ROUNDS)
+    bench(f'{method}: has_object_permission, own object',
+          lambda: permission.has_object_permission(request, view, own), rounds=ROUNDS)
+    bench(f'{method}: has_object_permission, foreign object',
+          lambda: permission.has_object_permission(request, view, foreign), rounds=ROUNDS)
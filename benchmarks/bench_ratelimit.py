@@ -0,0 +1,56 @@
+"""
+Overhead of the login rate limiter: a counter update per backend and a rejected login request.
+"""
+import time
+
+import fakeredis
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.users import ratelimit
+from apps.users.ratelimit import LocalRateLimitBackend, RedisRateLimitBackend, check_rate_limits
+
+ROUNDS = 100_000
+KEYS = 100_000
+
+
+@pytest.fixture(autouse=True)
+def local_backend(monkeypatch):
+    backend = LocalRateLimitBackend(max_keys=KEYS)
+    monkeypatch.setattr(ratelimit, '_backend', backend)
+    return backend
+
+
+def test_backend_hit(bench):
+    backend = LocalRateLimitBackend(max_keys=KEYS)
+    bench('local backend: same key', lambda: backend.hit('key', 10 ** 9, 60, time.time()), rounds=ROUNDS)
+
+    keys = iter(range(10 ** 9))
+    bench(f'local backend: new key, {KEYS} keys, LRU eviction',
+          lambda: backend.hit(f'key-{next(keys)}', 5, 60, time.time()), rounds=ROUNDS)
+
+    # In-process fake: the Redis command cost without the network round trip.
+    redis_backend = RedisRateLimitBackend(fakeredis.FakeRedis())
+    bench('redis backend (fakeredis): same key', lambda: redis_backend.hit('key', 10 ** 9, 60, time.time()),
+          rounds=ROUNDS // 10)
+
+
+def test_check_rate_limits(bench, settings):
+    settings.RATE_LIMITS = {'users:user-login': {'ip': f'{10 ** 9}/m', 'email': f'{10 ** 9}/m'}}
+    values = {'ip': '127.0.0.1', 'email': 'bench@example.com'}
+
+    bench('check_rate_limits: ip and email', lambda: check_rate_limits('users:user-login', values), rounds=ROUNDS)
+
+
+@pytest.mark.django_db
+def test_rejected_login(bench, settings):
+    settings.RATE_LIMITS = {'users:user-login': {'email': '1/d'}}
+    client, url = APIClient(), reverse('users:user-login')
+    data = {'email': 'bench@example.com', 'password': 'benchpass123'}
+    client.post(url, data)
+
+    def login():
+        assert client.post(url, data).status_code == 429
+
+    bench('POST /users/login/: rejected by the rate limit', login, rounds=5000)
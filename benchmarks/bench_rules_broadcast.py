@@ -0,0 +1,39 @@
+import multiprocessing
+import time
+
+import pytest
+
+from apps.users.rules_broadcast import InMemoryBroker, RulesListener
+
+ROUNDS = 200
+
+
+def _run_worker(subscription, results):
+    listener = RulesListener(
+        subscription=subscription,
+        on_change=lambda: results.put(time.time()),
+        version_source=None,
+    )
+    listener.start()
+    listener.join()
+
+
+@pytest.mark.parametrize('workers', [4, 16])
+def test_rule_change_propagation(bench_record, workers):
+    context = multiprocessing.get_context('fork')
+    broker = InMemoryBroker(context)
+    results = context.Queue()
+    processes = [context.Process(target=_run_worker, args=(broker.subscribe(), results), daemon=True)
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+
+    samples = []
+    for version in range(1, ROUNDS + 1):
+        published_at = time.time()
+        broker.publish(str(version))
+        samples.append(max(results.get(timeout=5) for _ in range(workers)) - published_at)
+
+    for process in processes:
+        process.terminate()
+    bench_record(f'rules change reaches all {workers} workers', samples)
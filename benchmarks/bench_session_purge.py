@@ -0,0 +1,38 @@
+import os
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from apps.users.models import Session, User
+from apps.users.session_reaper import purge_sessions
+
+SESSION_ROWS = int(os.environ.get('BENCH_SESSION_ROWS', 1_000_000))
+SEED_BATCH_SIZE = 10_000
+
+
+def _seed_sessions(user: User, rows: int) -> None:
+    now = timezone.now()
+    for start in range(0, rows, SEED_BATCH_SIZE):
+        Session.objects.bulk_create([
+            Session(
+                user=user,
+                session_key=f'bench-{i}',
+                # Every other session is expired, every fourth live one is inactive.
+                expire_at=now - timedelta(minutes=1) if i % 2 else now + timedelta(hours=1),
+                is_active=i % 8 != 0,
+            )
+            for i in range(start, min(start + SEED_BATCH_SIZE, rows))
+        ])
+
+
+@pytest.mark.django_db
+def test_purge_sessions(bench_record, bench_metric):
+    user = User.objects.create_user(email='bench@example.com', username='bench', password='benchpass123')
+    _seed_sessions(user, SESSION_ROWS)
+
+    stats = purge_sessions(batch_size=5000)
+
+    bench_record(f'purge {stats.deleted} of {SESSION_ROWS} sessions: lock time per 5k batch', stats.lock_times)
+    bench_metric(f'purge {SESSION_ROWS} sessions: throughput', stats.rows_per_second, 'rows/s')
+    assert Session.objects.count() == SESSION_ROWS - stats.deleted
@@ -0,0 +1,70 @@
+"""
+Writes per request caused by sliding session expiry under a steady simulated workload.
+
+Every session makes a request each simulated minute; the write buffer is flushed every few seconds
+as the background flusher would do. The clock is simulated, so the run takes seconds, not hours.
+"""
+import random
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from apps.users import session_flusher
+from apps.users import session_store as session_store_module
+from apps.users.models import Session, User
+from apps.users.session_flusher import SessionWriteBuffer
+from apps.users.session_store import SessionStore
+from apps.users.sessions import load_session_context
+
+SESSIONS = 100
+SIMULATED_MINUTES = 120
+FLUSH_EVERY = 5
+
+
+@pytest.fixture
+def sessions(db):
+    user = User.objects.create_user(email='bench@example.com', username='bench', password='benchpass123')
+    now = timezone.now()
+    rng = random.Random(0)
+    return Session.objects.bulk_create([
+        Session(user=user, session_key=f'bench-{i}', expire_at=now + timedelta(seconds=rng.randint(60, 3600)))
+        for i in range(SESSIONS)
+    ])
+
+
+def test_writes_per_request_with_sliding_expiry(sessions, settings, monkeypatch, bench_metric):
+    settings.SESSION_SLIDING_EXPIRY = True
+    settings.SESSION_LIFETIME = 3600
+    settings.SESSION_REFRESH_FRACTION = 0.5
+    buffer = SessionWriteBuffer(bucket=60)
+    monkeypatch.setattr(session_flusher, '_buffer', buffer)
+    monkeypatch.setattr(session_store_module, '_store', SessionStore())
+
+    clock = timezone.now()
+    monkeypatch.setattr(timezone, 'now', lambda: clock)
+
+    writes = []
+
+    def count_writes(execute, sql, params, many, context):
+        if sql.startswith('UPDATE'):
+            writes.append(sql)
+        return execute(sql, params, many, context)
+
+    requests = authenticated = 0
+    with connection.execute_wrapper(count_writes):
+        for minute in range(SIMULATED_MINUTES):
+            for i, session in enumerate(sessions):
+                clock += timedelta(seconds=60 / SESSIONS)
+                authenticated += load_session_context(session.session_key).is_authenticated
+                requests += 1
+                if i % FLUSH_EVERY == 0:
+                    buffer.flush()
+        buffer.flush()
+
+    bench_metric('sliding expiry: writes per request', len(writes) / requests)
+    bench_metric('sliding expiry: writes per session hour', len(writes) / SESSIONS / (SIMULATED_MINUTES / 60))
+
+    assert authenticated == requests
+    assert len(writes) / requests < 0.05
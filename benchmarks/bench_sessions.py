@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+import fakeredis
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils import timezone
+
+from apps.users import session_store as session_store_module
+from apps.users.middleware.session_middleware import CustomSessionMiddleware
+from apps.users.models import Session, User
+from apps.users.session_store import SessionStore
+from apps.users.sessions import load_session_context
+
+
+@pytest.fixture
+def session(db):
+    user = User.objects.create_user(email='bench@example.com', username='bench', password='benchpass123')
+    return Session.create_session(user)
+
+
+def test_session_lookup_db_vs_cache(bench, session, monkeypatch):
+    monkeypatch.setattr(session_store_module, '_store', SessionStore())
+    db_only = bench('session lookup: database only', lambda: load_session_context(session.session_key))
+
+    monkeypatch.setattr(session_store_module, '_store', SessionStore(fakeredis.FakeRedis()))
+    cached = bench('session lookup: redis cache', lambda: load_session_context(session.session_key))
+
+    assert cached.rounds == db_only.rounds
+
+
+def test_expired_session_lookup(bench, session, monkeypatch, django_assert_num_queries):
+    monkeypatch.setattr(session_store_module, '_store', SessionStore())
+    Session.objects.filter(pk=session.pk).update(expire_at=timezone.now() - timedelta(minutes=1))
+
+    with django_assert_num_queries(1):
+        assert not load_session_context(session.session_key).is_authenticated
+    bench('session lookup: expired cookie', lambda: load_session_context(session.session_key))
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_middleware_session_resolution(bench, session, monkeypatch, cached):
+    monkeypatch.setattr(session_store_module, '_store', SessionStore(fakeredis.FakeRedis() if cached else None))
+
+    def view(request):
+        # The user is resolved lazily, touch it like an authenticated view does.
+        assert request.user.is_authenticated
+        return HttpResponse()
+
+    middleware, factory = CustomSessionMiddleware(view), RequestFactory()
+
+    def call():
+        request = factory.get('/users/profile/')
+        request.COOKIES['session_key'] = session.session_key
+        return middleware(request)
+
+    bench(f'CustomSessionMiddleware: {"redis cache" if cached else "database only"}', call)
@@ -0,0 +1,59 @@
+"""
+Peak memory of listing 100k products: streamed JSON array against a buffered response.
+
+Python allocations are traced with tracemalloc; process RSS never shrinks within one run,
+so it cannot compare two modes measured in the same process.
+"""
+import tracemalloc
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.resources.models import Product
+from apps.resources.views import ProductListView
+from apps.users.models import AccessRoleRule, BusinessElement, Role, User
+
+ROWS = 100_000
+
+
+@pytest.fixture
+def client(db):
+    role = Role.objects.get(name='Администратор')
+    user = User.objects.create_user(email='bench@example.com', username='bench', password='benchpass123', role=role)
+    element = BusinessElement.objects.create(name='Товары')
+    AccessRoleRule.objects.create(role=role, element=element, read_permission=True, read_all_permission=True)
+    Product.objects.bulk_create([Product(name=f'Product {i}', owner=user) for i in range(ROWS)], batch_size=10000)
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def peak_memory(func) -> tuple[int, int]:
+    tracemalloc.start()
+    try:
+        size = func()
+        return size, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_streamed_vs_buffered_list(client, monkeypatch, bench_metric):
+    url = reverse('resources:products')
+    monkeypatch.setattr(ProductListView, 'pagination_class', None)
+
+    def buffered():
+        return len(client.get(url).content)
+
+    def streamed():
+        return sum(len(chunk) for chunk in client.get(url, {'stream': '1'}).streaming_content)
+
+    buffered_size, buffered_peak = peak_memory(buffered)
+    streamed_size, streamed_peak = peak_memory(streamed)
+
+    bench_metric(f'list {ROWS} products: buffered peak memory', buffered_peak / 2 ** 20, 'MiB')
+    bench_metric(f'list {ROWS} products: streamed peak memory', streamed_peak / 2 ** 20, 'MiB')
+
+    assert streamed_size == buffered_size
+    assert streamed_peak < buffered_peak / 10
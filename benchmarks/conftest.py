@@ -0,0 +1,216 @@
+"""
+Shared fixtures for the performance benchmarks.
+
+Benchmarks live in ``bench_*.py`` files, so they are not collected by the regular test run.
+Run them with ``make bench``.
+
+``--bench-json results.json`` stores the results of a run. ``--bench-compare baseline.json``
+compares the run with a stored one and fails it when a median is slower than the baseline
+by more than ``--bench-threshold`` (a fraction, 0.2 by default).
+"""
+import json
+import os
+import platform
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+
+import pytest
+
+from apps.users.rbac import bump_rules_version
+
+RESULTS = []
+METRICS = []
+REGRESSIONS = []
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing statistics of a single benchmark."""
+
+    name: str
+    rounds: int
+    mean: float
+    median: float
+    p99: float
+
+    @classmethod
+    def from_samples(cls, name: str, samples: list[float]) -> 'BenchmarkResult':
+        """
+        Builds the statistics from raw timings.
+
+        Args:
+            name: Benchmark label.
+            samples: Duration of every round in seconds.
+        Returns:
+            BenchmarkResult object.
+        """
+        ordered = sorted(samples)
+        return cls(
+            name=name,
+            rounds=len(ordered),
+            mean=statistics.fmean(ordered),
+            median=statistics.median(ordered),
+            p99=ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)],
+        )
+
+    @property
+    def ops(self) -> float:
+        """Operations per second derived from the mean."""
+        return 1 / self.mean if self.mean else float('inf')
+
+
+def record_samples(name: str, samples: list[float]) -> BenchmarkResult:
+    """
+    Records timings measured by the benchmark itself.
+
+    Args:
+        name: Benchmark label.
+        samples: Duration of every round in seconds.
+    Returns:
+        BenchmarkResult object.
+    """
+    result = BenchmarkResult.from_samples(name, samples)
+    RESULTS.append(result)
+    return result
+
+
+def run_benchmark(name: str, func, rounds: int = 1000, warmup: int = 10) -> BenchmarkResult:
+    """
+    Times a callable and records the result for the terminal summary.
+
+    Args:
+        name: Benchmark label.
+        func: Callable without arguments to time.
+        rounds: Number of measured calls.
+        warmup: Number of calls made before measuring.
+    Returns:
+        BenchmarkResult object.
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    return record_samples(name, samples)
+
+
+def record_metric(name: str, value: float, unit: str = '') -> None:
+    """
+    Records a value that is not a timing, such as a ratio or a size.
+
+    Args:
+        name: Metric label.
+        value: Measured value.
+        unit: Unit shown next to the value.
+    """
+    METRICS.append((name, value, unit))
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmarks')
+    group.addoption('--bench-json', metavar='PATH', help='Write the benchmark results to a JSON file.')
+    group.addoption('--bench-compare', metavar='PATH', help='Compare the results with a JSON file of an earlier run.')
+    group.addoption(
+        '--bench-threshold',
+        type=float,
+        default=float(os.environ.get('BENCH_REGRESSION_THRESHOLD', 0.2)),
+        help='Allowed slowdown of a median against the baseline, 0.2 means 20%%.',
+    )
+
+
+def dump_results(path: str) -> None:
+    """
+    Writes the results of the run to a JSON file.
+
+    Args:
+        path: Path of the file.
+    """
+    data = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': [asdict(result) for result in RESULTS],
+        'metrics': [{'name': name, 'value': value, 'unit': unit} for name, value, unit in METRICS],
+    }
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=2)
+
+
+def find_regressions(path: str, threshold: float) -> list[tuple[str, float, float]]:
+    """
+    Compares the medians of the run with the ones stored in a JSON file.
+
+    Benchmarks missing from either run are skipped.
+
+    Args:
+        path: Path of the baseline file written with --bench-json.
+        threshold: Allowed slowdown as a fraction of the baseline median.
+    Returns:
+        List of (name, baseline median, current median) of the regressed benchmarks.
+    """
+    with open(path) as file:
+        baseline = {result['name']: result['median'] for result in json.load(file)['results']}
+    return [
+        (result.name, baseline[result.name], result.median)
+        for result in RESULTS
+        if result.name in baseline and result.median > baseline[result.name] * (1 + threshold)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def reset_permission_matrix():
+    # Rules created by earlier benchmarks are rolled back without a commit, so nothing bumped the version.
+    bump_rules_version()
+
+
+@pytest.fixture
+def bench():
+    return run_benchmark
+
+
+@pytest.fixture
+def bench_record():
+    return record_samples
+
+
+@pytest.fixture
+def bench_metric():
+    return record_metric
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if config.option.bench_json:
+        dump_results(config.option.bench_json)
+    if config.option.bench_compare:
+        REGRESSIONS.extend(find_regressions(config.option.bench_compare, config.option.bench_threshold))
+        if REGRESSIONS:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if RESULTS or METRICS:
+        terminalreporter.section('benchmarks')
+    if RESULTS:
+        terminalreporter.write_line(f'{"name":<60} {"rounds":>8} {"mean, us":>12} {"p99, us":>12} {"ops/s":>12}')
+    for result in RESULTS:
+        terminalreporter.write_line(
+            f'{result.name:<60} {result.rounds:>8} {result.mean * 1e6:>12.1f} '
+            f'{result.p99 * 1e6:>12.1f} {result.ops:>12.0f}'
+        )
+    for name, value, unit in METRICS:
+        terminalreporter.write_line(f'{name:<60} {value:>12.4f} {unit}')
+
+    if REGRESSIONS:
+        threshold = config.option.bench_threshold
+        terminalreporter.section(f'benchmark regressions, median slower by more than {threshold:.0%}', red=True)
+        for name, baseline, current in REGRESSIONS:
+            terminalreporter.write_line(
+                f'{name:<60} {baseline * 1e6:>12.1f} -> {current * 1e6:.1f} us (+{current / baseline - 1:.0%})'
+            )
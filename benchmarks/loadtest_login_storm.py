@@ -0,0 +1,91 @@
+"""
+Load test: latency of GET /products/ while a login storm runs against the same server.
+
+Run against a live server (WSGI or ASGI), for example:
+
+    python benchmarks/loadtest_login_storm.py --base-url http://127.0.0.1:8000 \\
+        --email ivanov@mail.ru --password <password> --login-threads 32 --duration 30
+
+Start the server with RATE_LIMIT_ENABLED=False, the storm logs in far above the login rate limits.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+def _request(url: str, data: dict | None = None, cookie: str | None = None) -> tuple[int, dict]:
+    body = json.dumps(data).encode() if data is not None else None
+    request = urllib.request.Request(url, data=body, method='POST' if body else 'GET')
+    request.add_header('Content-Type', 'application/json')
+    if cookie:
+        request.add_header('Cookie', f'session_key={cookie}')
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, dict(response.headers)
+    except urllib.error.HTTPError as exc:
+        return exc.code, dict(exc.headers)
+
+
+def _login(base_url: str, email: str, password: str) -> str:
+    body = json.dumps({'email': email, 'password': password}).encode()
+    request = urllib.request.Request(f'{base_url}/users/login/', data=body, method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        for header in response.headers.get_all('Set-Cookie') or []:
+            if header.startswith('session_key='):
+                return header.split(';', 1)[0].split('=', 1)[1]
+    raise RuntimeError('Login did not return a session cookie.')
+
+
+def _storm(base_url: str, email: str, password: str, stop: threading.Event, statuses: list) -> None:
+    while not stop.is_set():
+        # A wrong password still costs a full bcrypt check but keeps the reader's session alive.
+        status, _ = _request(f'{base_url}/users/login/', {'email': email, 'password': password + '-wrong'})
+        statuses.append(status)
+
+
+def _percentile(samples: list[float], percent: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * percent), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--email', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--login-threads', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=20)
+    args = parser.parse_args()
+
+    session_key = _login(args.base_url, args.email, args.password)
+    stop = threading.Event()
+    login_statuses = []
+    storm = [threading.Thread(target=_storm, args=(args.base_url, args.email, args.password, stop, login_statuses),
+                              daemon=True) for _ in range(args.login_threads)]
+    for thread in storm:
+        thread.start()
+
+    latencies = []
+    deadline = time.monotonic() + args.duration
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        _request(f'{args.base_url}/products/', cookie=session_key)
+        latencies.append(time.perf_counter() - start)
+
+    stop.set()
+    for thread in storm:
+        thread.join()
+
+    print(f'GET /products/: {len(latencies)} requests, '
+          f'median {statistics.median(latencies) * 1000:.1f} ms, p99 {_percentile(latencies, 0.99) * 1000:.1f} ms')
+    print(f'POST /users/login/: {len(login_statuses)} requests, '
+          f'{login_statuses.count(429)} rejected with 429')
+
+
+if __name__ == '__main__':
+    main()